@@ -0,0 +1,94 @@
+"""Per-row latency of the prediction API at several batch sizes.
+
+Fits the ``train_model`` logistic pipeline on synthetic features, serves it
+from a temporary models directory through the in-process test client and
+times three ways of scoring ``n`` rows:
+
+* ``dataframe``  - the old handler body, ``pd.DataFrame([row])`` plus
+  ``predict_proba`` per row, called directly without HTTP,
+* ``single``     - ``n`` requests to ``/predict``,
+* ``batch``      - one columnar request to ``/predict/batch``.
+"""
+
+import os
+import sys
+import tempfile
+import time
+from typing import Optional
+
+import argparse
+import joblib
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, REPO_ROOT)
+
+from fastapi.testclient import TestClient
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from src.api import app as app_module
+from src.models.train_model import FEATURE_COLS
+
+
+def _timed(fn, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark single vs columnar batch prediction")
+    parser.add_argument("--batches", default="1,100,10000", help="comma-separated batch sizes")
+    parser.add_argument("--max-single", type=int, default=100,
+                        help="skip per-row request loops above this batch size")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    train = pd.DataFrame(rng.normal(size=(500, len(FEATURE_COLS))), columns=FEATURE_COLS)
+    pipe = Pipeline([("scaler", StandardScaler()), ("clf", LogisticRegression(max_iter=1000))])
+    pipe.fit(train, (train[FEATURE_COLS[0]] > 0).astype(int))
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        joblib.dump(pipe, os.path.join(tmp, "model_bench.joblib"))
+        app_module.registry.models_dir = tmp
+        app_module.registry.settle_seconds = 0
+        with TestClient(app_module.app) as client:
+            for size in [int(b) for b in args.batches.split(",")]:
+                frame = pd.DataFrame(rng.normal(size=(size, len(FEATURE_COLS))), columns=FEATURE_COLS)
+                records = frame.to_dict("records")
+                columns = {c: frame[c].tolist() for c in FEATURE_COLS}
+                timings = {
+                    "dataframe": _timed(
+                        lambda: [pipe.predict_proba(pd.DataFrame([r]))[:, 1] for r in records],
+                        args.repeats,
+                    ),
+                    "batch": _timed(
+                        lambda: client.post("/predict/batch?market=bench", json=columns),
+                        args.repeats,
+                    ),
+                }
+                if size <= args.max_single:
+                    timings["single"] = _timed(
+                        lambda: [client.post("/predict?market=bench", json=r) for r in records],
+                        args.repeats,
+                    )
+                for mode, seconds in timings.items():
+                    rows.append({
+                        "batch": size,
+                        "mode": mode,
+                        "total_ms": seconds * 1000,
+                        "us_per_row": seconds / size * 1e6,
+                    })
+    print(pd.DataFrame(rows).to_string(index=False, float_format=lambda v: f"{v:.4g}"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Timing of the vectorized multi-strategy backtest vs. a per-strategy pandas loop.
+
+Random weekly prices and classifier outputs stand in for ``--years`` of
+history.  Every prediction column is crossed with long-only/long-short,
+overlay on/off and each commission.  All strategies are backtested in one
+:func:`backtest_matrix` call, and the full metrics table is timed separately.
+A sample of strategies also goes through the pandas column math of the old
+``run_backtest``, to time it and to check that the results agree.
+"""
+
+import os
+import sys
+import time
+from typing import Optional
+
+import argparse
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, REPO_ROOT)
+
+from src.eval.vector_backtest import backtest_matrix, signal_matrix, strategy_grid
+
+
+def _pandas_backtest(prices: pd.Series, predictions, extreme: pd.Series, allow_shorts, overlay, commission):
+    df = pd.DataFrame({"etf_close": prices, "extreme_spec_long": extreme})
+    df["signal"] = [1 if s == 1 else -1 for s in predictions] if allow_shorts else predictions
+    if overlay:
+        mask = df["extreme_spec_long"] == 1
+        df.loc[mask, "signal"] = -df.loc[mask, "signal"]
+    df["exit_price"] = df["etf_close"].shift(-1)
+    df["raw_ret"] = (df["exit_price"] - df["etf_close"]) / df["etf_close"]
+    df["strategy_ret"] = df["raw_ret"] * df["signal"] - 2 * commission
+    ret = df["strategy_ret"].dropna()
+    cum = (1 + ret).cumprod()
+    return cum.iloc[-1], ((cum.cummax() - cum) / cum.cummax()).max()
+
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the vectorized backtest")
+    parser.add_argument("--years", type=int, default=20)
+    parser.add_argument("--models", type=int, default=256, help="prediction columns")
+    parser.add_argument("--commissions", default="0,0.0002,0.0005,0.001")
+    parser.add_argument("--pandas-sample", type=int, default=64, help="strategies timed with pandas")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    weeks = 52 * args.years
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, weeks)))
+    predictions = rng.integers(0, 2, size=(weeks, args.models))
+    extreme = (rng.uniform(size=weeks) > 0.9).astype(int)
+    grid = strategy_grid(commissions=[float(c) for c in args.commissions.split(",")])
+    strategies = pd.concat({m: grid for m in range(args.models)}, names=["model"]).reset_index(0)
+    cols = predictions[:, strategies["model"].to_numpy()]
+
+    best = metrics_best = float("inf")
+    for _ in range(args.repeats):
+        start = time.perf_counter()
+        signals = signal_matrix(
+            cols, extreme, strategies["allow_shorts"].to_numpy(bool), strategies["overlay"].to_numpy(bool)
+        )
+        result = backtest_matrix(prices, signals, strategies["commission"].to_numpy(float))
+        best = min(best, time.perf_counter() - start)
+        start = time.perf_counter()
+        summary = result.summary()
+        metrics_best = min(metrics_best, time.perf_counter() - start)
+
+    sample = rng.choice(len(strategies), size=min(args.pandas_sample, len(strategies)), replace=False)
+    start = time.perf_counter()
+    reference = [
+        _pandas_backtest(
+            pd.Series(prices), cols[:, i], pd.Series(extreme),
+            strategies["allow_shorts"].iat[i], strategies["overlay"].iat[i], strategies["commission"].iat[i],
+        )
+        for i in sample
+    ]
+    per_strategy = (time.perf_counter() - start) / len(sample)
+    ref = np.array(reference)
+    diff = max(
+        np.abs(ref[:, 0] - summary["cum_return"].to_numpy()[sample]).max(),
+        np.abs(ref[:, 1] - summary["max_drawdown"].to_numpy()[sample]).max(),
+    )
+
+    print(f"{weeks} weeks x {len(strategies)} strategies")
+    print(f"vectorized: {best * 1000:.1f} ms ({best / len(strategies) * 1e6:.2f} us/strategy)")
+    print(f"all metrics (src.eval.metrics): {metrics_best * 1000:.1f} ms")
+    print(f"pandas loop: {per_strategy * 1000:.2f} ms/strategy, "
+          f"~{per_strategy * len(strategies):.1f} s for all ({per_strategy * len(strategies) / best:.0f}x)")
+    print(f"max abs diff vs pandas: {diff:.3g}")
+
+
+if __name__ == "__main__":
+    main()
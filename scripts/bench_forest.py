@@ -0,0 +1,72 @@
+"""Throughput benchmark: sklearn ``predict_proba`` vs :class:`FlatForest`.
+
+Fits a random forest on synthetic data, then scores batches of increasing size
+with both engines and reports rows per second and the largest probability
+difference.
+"""
+
+import os
+import sys
+import time
+from typing import Optional
+
+import argparse
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, REPO_ROOT)
+
+from sklearn.ensemble import RandomForestClassifier
+
+from src.models.flat_forest import FlatForest
+
+
+def _best_of(fn, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark flattened forest scoring")
+    parser.add_argument("--trees", type=int, default=100)
+    parser.add_argument("--max-depth", type=int, default=None)
+    parser.add_argument("--features", type=int, default=10)
+    parser.add_argument("--train-rows", type=int, default=1000)
+    parser.add_argument("--batches", default="1,10,100,1000,10000,100000", help="comma-separated batch sizes")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(args.train_rows, args.features))
+    y = (X[:, 0] - X[:, 1] + rng.normal(size=args.train_rows) > 0).astype(int)
+    rf = RandomForestClassifier(
+        n_estimators=args.trees, max_depth=args.max_depth, random_state=0
+    ).fit(X, y)
+
+    start = time.perf_counter()
+    flat = FlatForest.from_sklearn(rf)
+    print(f"flatten: {(time.perf_counter() - start) * 1000:.1f} ms, nodes={len(flat.feature)}")
+
+    rows = []
+    for size in [int(b) for b in args.batches.split(",")]:
+        batch = rng.normal(size=(size, args.features))
+        sk = _best_of(lambda: rf.predict_proba(batch), args.repeats)
+        fl = _best_of(lambda: flat.predict_proba(batch), args.repeats)
+        diff = np.abs(flat.predict_proba(batch) - rf.predict_proba(batch)).max()
+        rows.append({
+            "batch": size,
+            "sklearn_rows_per_s": size / sk,
+            "flat_rows_per_s": size / fl,
+            "speedup": sk / fl,
+            "max_abs_diff": diff,
+        })
+    print(pd.DataFrame(rows).to_string(index=False, float_format=lambda v: f"{v:.4g}"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""Memory and throughput of the prefork launcher vs ``uvicorn --workers``.
+
+A random forest pipeline is written to a temporary models directory and the
+API is started with ``python -m src.api.serve`` (models preloaded once, then
+forked) and with plain ``uvicorn --workers`` (every worker loads its own copy)
+at each worker count.  For every run the script reports
+
+* proportional set size (PSS) summed over all processes and per worker, read
+  from ``/proc/<pid>/smaps_rollup``, and each worker's private memory,
+* startup time until the first successful prediction,
+* requests per second and latency percentiles of ``/predict`` under a fixed
+  number of concurrent clients (the prediction cache is disabled).
+
+Linux only.  Requests/sec cannot scale past the number of cores available.
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+import joblib
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, REPO_ROOT)
+
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+FEATURES = [f"f{i}" for i in range(10)]
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def write_model(models_dir: Path, trees: int) -> float:
+    """Fit and store a forest pipeline; return its pickle size in MB."""
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(20000, len(FEATURES))), columns=FEATURES)
+    y = (X["f0"] + rng.normal(size=len(X)) > 0).astype(int)
+    pipe = Pipeline([
+        ("scaler", StandardScaler()),
+        ("clf", RandomForestClassifier(n_estimators=trees, random_state=0, n_jobs=-1)),
+    ]).fit(X, y)
+    pipe.steps[-1][1].n_jobs = None
+    path = models_dir / "model_bench.joblib"
+    joblib.dump(pipe, path)
+    # older than the registry's settle window so it loads immediately
+    stamp = time.time_ns() - 60 * 10**9
+    os.utime(path, ns=(stamp, stamp))
+    return path.stat().st_size / 1e6
+
+
+def _children(pid: int) -> List[int]:
+    out = []
+    for task in Path(f"/proc/{pid}/task").iterdir():
+        kids = (task / "children").read_text().split()
+        for kid in map(int, kids):
+            out.append(kid)
+            out.extend(_children(kid))
+    return out
+
+
+def _rollup(pid: int) -> Dict[str, int]:
+    fields = {}
+    for line in Path(f"/proc/{pid}/smaps_rollup").read_text().splitlines()[1:]:
+        name, value = line.split(":", 1)
+        fields[name] = int(value.split()[0])
+    return fields
+
+
+def memory(root: int, workers: int) -> dict:
+    procs = [root] + _children(root)
+    rollups = {pid: _rollup(pid) for pid in procs}
+    # workers are the processes that hold the model: the largest ones
+    worker_pids = sorted(rollups, key=lambda p: rollups[p]["Pss"])[-workers:]
+    private = [rollups[p]["Private_Clean"] + rollups[p]["Private_Dirty"] for p in worker_pids]
+    return {
+        "processes": len(procs),
+        "pss_total_mb": sum(r["Pss"] for r in rollups.values()) / 1024,
+        "pss_per_worker_mb": np.mean([rollups[p]["Pss"] for p in worker_pids]) / 1024,
+        "private_per_worker_mb": np.mean(private) / 1024,
+        "rss_per_worker_mb": np.mean([rollups[p]["Rss"] for p in worker_pids]) / 1024,
+    }
+
+
+def _payloads(n: int) -> List[dict]:
+    rng = np.random.default_rng(1)
+    return [dict(zip(FEATURES, row)) for row in rng.normal(size=(n, len(FEATURES))).tolist()]
+
+
+async def _load(url: str, concurrency: int, duration: float) -> dict:
+    payloads = _payloads(1000)
+    latencies: List[float] = []
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+
+        async def client_loop(i: int) -> None:
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                resp = await client.post("/predict?market=bench", json=payloads[i % len(payloads)])
+                resp.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+                i += concurrency
+
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop(i) for i in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    lat = np.array(latencies) * 1000
+    return {
+        "rps": len(lat) / elapsed,
+        "p50_ms": float(np.percentile(lat, 50)),
+        "p99_ms": float(np.percentile(lat, 99)),
+    }
+
+
+def _wait_ready(url: str, timeout: float = 120.0) -> float:
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        try:
+            resp = httpx.post(f"{url}/predict?market=bench", json=_payloads(1)[0], timeout=5)
+            if resp.status_code == 200:
+                return time.perf_counter() - start
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError(f"server at {url} did not become ready")
+
+
+def run(mode: str, workers: int, models_dir: str, args) -> dict:
+    port = _free_port()
+    env = {
+        **os.environ,
+        "MODELS_DIR": models_dir,
+        "PREDICTION_CACHE_SIZE": "0",
+        "PYTHONPATH": REPO_ROOT,
+    }
+    if mode == "prefork":
+        cmd = [sys.executable, "-m", "src.api.serve", "--port", str(port), "--workers", str(workers)]
+    else:
+        env["INFERENCE_THREADS"] = str(max(1, (os.cpu_count() or 1) // workers))
+        cmd = [sys.executable, "-m", "uvicorn", "src.api.app:app", "--port", str(port),
+               "--workers", str(workers), "--log-level", "warning"]
+    url = f"http://127.0.0.1:{port}"
+    proc = subprocess.Popen(cmd, cwd=REPO_ROOT, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        startup = _wait_ready(url)
+        # let every worker finish its own startup before measuring
+        time.sleep(args.settle)
+        row = {"mode": mode, "workers": workers, "startup_s": startup}
+        row.update(memory(proc.pid, workers))
+        row.update(asyncio.run(_load(url, args.concurrency, args.duration)))
+        return row
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark prefork serving memory and throughput")
+    parser.add_argument("--workers", default="1,4,8", help="comma-separated worker counts")
+    parser.add_argument("--modes", default="prefork,uvicorn")
+    parser.add_argument("--trees", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=5.0, help="load seconds per run")
+    parser.add_argument("--settle", type=float, default=3.0)
+    parser.add_argument("--out", default=None, help="optional CSV for the results")
+    args = parser.parse_args(argv)
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        size = write_model(Path(tmp), args.trees)
+        print(f"model pickle: {size:.1f} MB, cores: {os.cpu_count()}")
+        for workers in [int(w) for w in args.workers.split(",")]:
+            for mode in args.modes.split(","):
+                rows.append(run(mode, workers, tmp, args))
+                print(pd.DataFrame(rows[-1:]).to_string(index=False, float_format=lambda v: f"{v:.4g}"))
+    table = pd.DataFrame(rows)
+    print(table.to_string(index=False, float_format=lambda v: f"{v:.4g}"))
+    if args.out:
+        Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+        table.to_csv(args.out, index=False)
+
+
+if __name__ == "__main__":
+    main()
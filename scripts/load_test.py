@@ -0,0 +1,278 @@
+"""Load generator and latency regression check for the prediction API.
+
+Drives the FastAPI app in-process (``httpx.ASGITransport``, no sockets) or a
+running server given by ``--url``.  A fixed number of concurrent clients send
+requests for ``--duration`` seconds; each request picks a scenario from the
+``--mix`` weights:
+
+* ``single`` - one row drawn from a pool of 1000 vectors,
+* ``batch``  - ``--batch-size`` rows to ``/predict/batch``,
+* ``hot``    - one of 10 vectors, so almost every request is a cache hit,
+* ``cold``   - a vector never sent before, so every request misses the cache.
+
+Results are printed (and optionally written) as JSON with requests/sec and
+p50/p95/p99 latency per scenario and overall.  With ``--baseline`` the run
+fails (exit code 1) when a scenario's p99 grows or its throughput drops by
+more than ``--tolerance`` relative to the stored results;
+``--save-baseline`` stores the current run instead.
+
+    python scripts/load_test.py --synthetic --duration 10 --concurrency 32 \\
+        --mix single=4,batch=1,hot=4,cold=1 --out reports/load_test.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+import joblib
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, REPO_ROOT)
+
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from src.models.train_model import FEATURE_COLS
+
+SCENARIOS = ("single", "batch", "hot", "cold")
+SYNTHETIC_MARKET = "loadtest"
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    mix = {}
+    for item in spec.split(","):
+        name, _, weight = item.partition("=")
+        if name not in SCENARIOS:
+            raise ValueError(f"unknown scenario {name!r}; choose from {SCENARIOS}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def write_synthetic_model(models_dir: Path) -> None:
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(2000, len(FEATURE_COLS))), columns=FEATURE_COLS)
+    y = (X[FEATURE_COLS[0]] > 0).astype(int)
+    pipe = Pipeline([("scaler", StandardScaler()), ("clf", LogisticRegression())]).fit(X, y)
+    path = models_dir / f"model_{SYNTHETIC_MARKET}.joblib"
+    joblib.dump(pipe, path)
+    # older than the registry's settle window so it loads immediately
+    stamp = time.time_ns() - 60 * 10**9
+    os.utime(path, ns=(stamp, stamp))
+
+
+class Payloads:
+    """Deterministic request bodies for each scenario."""
+
+    def __init__(self, features: List[str], batch_size: int, seed: int = 0):
+        self.features = features
+        self.batch_size = batch_size
+        self.rng = np.random.default_rng(seed)
+        self.pool = self.rng.normal(size=(1000, len(features)))
+        self.hot = self.pool[:10]
+        self.cold_counter = 0
+
+    def _row(self, values) -> dict:
+        return dict(zip(self.features, map(float, values)))
+
+    def make(self, scenario: str, i: int):
+        if scenario == "single":
+            return "/predict", self._row(self.pool[i % len(self.pool)])
+        if scenario == "hot":
+            return "/predict", self._row(self.hot[i % len(self.hot)])
+        if scenario == "cold":
+            self.cold_counter += 1
+            row = self.pool[i % len(self.pool)] + self.cold_counter * 1e-6
+            return "/predict", self._row(row)
+        rows = self.pool[(np.arange(self.batch_size) + i) % len(self.pool)]
+        return "/predict/batch", {c: rows[:, j].tolist() for j, c in enumerate(self.features)}
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> dict:
+    lat = np.asarray(latencies) * 1000
+    out = {"requests": int(len(lat)), "errors": int(errors), "rps": len(lat) / elapsed if elapsed else 0.0}
+    for name, q in (("p50_ms", 50), ("p95_ms", 95), ("p99_ms", 99)):
+        out[name] = float(np.percentile(lat, q)) if len(lat) else None
+    out["mean_ms"] = float(lat.mean()) if len(lat) else None
+    return out
+
+
+async def drive(
+    client: httpx.AsyncClient,
+    market: str,
+    features: List[str],
+    mix: Dict[str, float],
+    concurrency: int,
+    duration: float,
+    batch_size: int,
+    warmup: float = 0.5,
+    seed: int = 0,
+) -> dict:
+    payloads = Payloads(features, batch_size, seed)
+    names = list(mix)
+    weights = np.array([mix[n] for n in names], dtype=float)
+    weights /= weights.sum()
+    rng = np.random.default_rng(seed + 1)
+    latencies = {n: [] for n in names}
+    errors = {n: 0 for n in names}
+    start = time.perf_counter()
+    record_from = start + warmup
+    deadline = record_from + duration
+
+    async def worker(wid: int) -> None:
+        i = wid
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                return
+            scenario = names[rng.choice(len(names), p=weights)]
+            path, body = payloads.make(scenario, i)
+            i += concurrency
+            t0 = time.perf_counter()
+            try:
+                resp = await client.post(f"{path}?market={market}", json=body)
+                ok = resp.status_code == 200
+            except httpx.HTTPError:
+                ok = False
+            t1 = time.perf_counter()
+            if t0 < record_from:
+                continue
+            if ok:
+                latencies[scenario].append(t1 - t0)
+            else:
+                errors[scenario] += 1
+
+    await asyncio.gather(*(worker(w) for w in range(concurrency)))
+    elapsed = time.perf_counter() - record_from
+    every = [v for n in names for v in latencies[n]]
+    return {
+        "overall": summarize(every, sum(errors.values()), elapsed),
+        "scenarios": {n: summarize(latencies[n], errors[n], elapsed) for n in names},
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Return human-readable regressions of ``results`` against ``baseline``."""
+    problems = []
+    current = {"overall": results["overall"], **results["scenarios"]}
+    previous = {"overall": baseline["overall"], **baseline.get("scenarios", {})}
+    for name, base in previous.items():
+        now = current.get(name)
+        if now is None:
+            continue
+        if now["errors"] > base.get("errors", 0):
+            problems.append(f"{name}: {now['errors']} errors (baseline {base.get('errors', 0)})")
+        if base.get("p99_ms") and now["p99_ms"] and now["p99_ms"] > base["p99_ms"] * (1 + tolerance):
+            problems.append(f"{name}: p99 {now['p99_ms']:.2f} ms > baseline {base['p99_ms']:.2f} ms")
+        if base.get("rps") and now["rps"] < base["rps"] * (1 - tolerance):
+            problems.append(f"{name}: {now['rps']:.1f} req/s < baseline {base['rps']:.1f} req/s")
+    return problems
+
+
+@contextlib.asynccontextmanager
+async def _client(url: Optional[str], concurrency: int):
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    if url:
+        async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+            yield client
+        return
+    from src.api import app as app_module
+
+    # ASGITransport does not send lifespan events; run the app's own lifespan
+    async with app_module.app.router.lifespan_context(app_module.app):
+        transport = httpx.ASGITransport(app=app_module.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=30) as client:
+            yield client
+
+
+async def _features(client: httpx.AsyncClient, market: str) -> List[str]:
+    models = (await client.get("/models")).json()["models"]
+    for model in models:
+        if model["market"] == market:
+            return model["features"]
+    raise SystemExit(f"market {market!r} is not served; available: {sorted({m['market'] for m in models})}")
+
+
+async def run(args) -> dict:
+    async with _client(args.url, args.concurrency) as client:
+        features = await _features(client, args.market)
+        results = await drive(
+            client, args.market, features, parse_mix(args.mix), args.concurrency,
+            args.duration, args.batch_size, args.warmup, args.seed,
+        )
+    results["config"] = {
+        "target": args.url or "in-process",
+        "market": args.market,
+        "mix": args.mix,
+        "concurrency": args.concurrency,
+        "duration": args.duration,
+        "batch_size": args.batch_size,
+    }
+    return results
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Load-test the prediction API")
+    parser.add_argument("--url", default=None, help="running server; default drives the app in-process")
+    parser.add_argument("--market", default=None, help="market to query (default gc, or the synthetic one)")
+    parser.add_argument("--models-dir", default=None, help="models directory for in-process runs")
+    parser.add_argument("--synthetic", action="store_true",
+                        help="serve a synthetic logistic model in-process")
+    parser.add_argument("--mix", default="single=1,batch=1,hot=1,cold=1",
+                        help="scenario weights, e.g. single=4,batch=1,hot=4,cold=1")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=0.5, help="unrecorded seconds before measuring")
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=None, help="write the JSON results here")
+    parser.add_argument("--baseline", default=None, help="JSON results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed relative p99 increase / throughput drop")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="write this run to --baseline instead of comparing")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if not args.url:
+            models_dir = args.models_dir
+            if args.synthetic:
+                write_synthetic_model(Path(tmp))
+                models_dir = tmp
+            if models_dir:
+                from src.api import app as app_module
+
+                app_module.registry.models_dir = models_dir
+        args.market = args.market or (SYNTHETIC_MARKET if args.synthetic else "gc")
+        results = asyncio.run(run(args))
+
+    text = json.dumps(results, indent=2)
+    print(text)
+    if args.out:
+        Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.out).write_text(text + "\n")
+
+    if args.baseline and args.save_baseline:
+        Path(args.baseline).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.baseline).write_text(text + "\n")
+    elif args.baseline:
+        problems = compare(results, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        for problem in problems:
+            print(f"REGRESSION {problem}", file=sys.stderr)
+        if problems:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
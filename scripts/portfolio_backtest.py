@@ -0,0 +1,76 @@
+import os
+import sys
+from pathlib import Path
+from typing import Optional
+import argparse
+
+# ensure project root is on path so "src" is importable when running as script
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, REPO_ROOT)
+
+from src.eval.backtest import NO_REFIT_HELP
+from src.eval.portfolio import SIZING, run_portfolio
+from src.eval.rolling import parse_paths
+
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(description="Backtest several markets as one portfolio")
+    parser.add_argument("--features", required=True, nargs="+", help="MARKET=PATH per market")
+    parser.add_argument(
+        "--model",
+        required=True,
+        nargs="+",
+        help="joblib model file shared by all markets, or MARKET=PATH per market",
+    )
+    parser.add_argument("--test-start", required=True)
+    parser.add_argument("--sizing", choices=SIZING, default="inverse_vol")
+    parser.add_argument("--leverage", type=float, default=1.0, help="gross budget split across markets")
+    parser.add_argument("--max-gross", type=float, default=1.0, help="cap on sum of |weights|")
+    parser.add_argument(
+        "--turnover-cost",
+        type=float,
+        default=0.0005,
+        help="cost per unit of turnover (sum of |weight change|); unlike backtest's "
+        "--commission it is not charged twice every week",
+    )
+    parser.add_argument("--allow-shorts", action="store_true", help="Enable short trades")
+    parser.add_argument("--no-refit", action="store_true", help=NO_REFIT_HELP)
+    parser.add_argument("--out-dir", default="reports")
+
+    args = parser.parse_args(argv)
+
+    features = parse_paths(args.features)
+    models = parse_paths(args.model, list(features))
+    missing = sorted(set(features) - set(models))
+    if missing:
+        parser.error(f"no --model for markets {missing}")
+
+    result = run_portfolio(
+        features,
+        models,
+        args.test_start,
+        allow_shorts=args.allow_shorts,
+        refit=not args.no_refit,
+        sizing=args.sizing,
+        leverage=args.leverage,
+        max_gross=args.max_gross,
+        commission=args.turnover_cost,
+    )
+
+    stats = result.summary()
+    print(
+        f"Cumulative Return: {stats['cum_return']:.4f} MaxDD: {stats['max_drawdown']:.4f} "
+        f"Sharpe: {stats['sharpe']:.4f} Turnover: {stats['turnover']:.4f}"
+    )
+    attribution = result.attribution()
+    print(attribution.to_string(index=False, float_format=lambda v: f"{v:.4f}"))
+
+    out_dir = Path(args.out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    result.frame().to_csv(out_dir / "portfolio_returns.csv", index=False)
+    attribution.to_csv(out_dir / "portfolio_attribution.csv", index=False)
+    print(f"Portfolio returns and attribution saved to {out_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,7 +8,7 @@ sys.path.insert(0, REPO_ROOT)
 
 import argparse
 from pathlib import Path
-from src.eval.backtest import holdout_validation, run_backtest
+from src.eval.backtest import NO_REFIT_HELP, holdout_validation, run_backtest
 
 
 def main() -> None:
@@ -18,15 +18,17 @@ def main() -> None:
     parser.add_argument("--test-start", required=True, help="Test start date")
     parser.add_argument("--commission", type=float, default=0.0005)
     parser.add_argument("--allow-shorts", action="store_true", help="Enable short trades")
+    parser.add_argument("--no-refit", action="store_true", help=NO_REFIT_HELP)
     args = parser.parse_args()
 
-    holdout_validation(args.features, args.model, args.test_start)
+    holdout_validation(args.features, args.model, args.test_start, refit=not args.no_refit)
     df = run_backtest(
         args.features,
         args.model,
         args.test_start,
         args.commission,
         allow_shorts=args.allow_shorts,
+        refit=not args.no_refit,
     )
     Path("reports").mkdir(exist_ok=True)
     out_path = Path("reports/backtest_results.csv")
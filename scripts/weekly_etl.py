@@ -164,17 +164,20 @@ def main() -> int:
                 "0",
             ]
         )
+        # every other horizon and threshold comes from the label matrix
         subprocess.check_call(
             [
                 sys.executable,
                 "-m",
-                "src.data.build_classification_features",
+                "src.data.build_labels",
                 "--in",
                 str(processed_dir / "features_gc.csv"),
                 "--out",
-                str(processed_dir / "class_features_gc_extreme.csv"),
-                "--th",
-                "0.95",
+                str(processed_dir / "labels_gc.csv"),
+                "--horizons",
+                "1,2,4,13",
+                "--thresholds",
+                "0,0.01",
             ]
         )
         subprocess.check_call(
@@ -216,17 +219,48 @@ def main() -> int:
                 "0",
             ]
         )
+        # every other horizon and threshold comes from the label matrix
         subprocess.check_call(
             [
                 sys.executable,
                 "-m",
-                "src.data.build_classification_features",
+                "src.data.build_labels",
                 "--in",
                 str(processed_dir / "features_cl.csv"),
                 "--out",
-                str(processed_dir / "class_features_cl_extreme.csv"),
-                "--th",
-                "0.95",
+                str(processed_dir / "labels_cl.csv"),
+                "--horizons",
+                "1,2,4,13",
+                "--thresholds",
+                "0,0.01",
+            ]
+        )
+        for market in ("gc", "cl"):
+            subprocess.check_call(
+                [
+                    sys.executable,
+                    "-m",
+                    "src.models.online",
+                    "--features",
+                    str(processed_dir / f"features_{market}.csv"),
+                    "--market",
+                    market,
+                    "--batch-model",
+                    f"models/model_{market}.joblib",
+                    "--export-dir",
+                    "models",
+                ]
+            )
+        # no --out: the snapshot goes to SIGNALS_PATH, where the API reads it
+        subprocess.check_call(
+            [
+                sys.executable,
+                "-m",
+                "src.api.signals",
+                "--models-dir",
+                "models",
+                "--features-dir",
+                str(processed_dir),
             ]
         )
 
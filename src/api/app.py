@@ -1,18 +1,246 @@
-from fastapi import FastAPI
-from pydantic import BaseModel
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Union
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+import numpy as np
 import pandas as pd
-from ..models.predict_model import load_model, predict
 
-app = FastAPI()
-model = load_model("models/gold_crude_model.joblib")
+from . import backfill, metrics
+from .cache import PredictionCache
+from .registry import ModelRegistry
+from .signals import DEFAULT_SIGNALS_PATH, SignalStore
+from ..models.predict_model import predict
+
+MODELS_DIR = os.environ.get("MODELS_DIR", "models")
+DEFAULT_MARKET = os.environ.get("DEFAULT_MARKET", "gc")
+POLL_SECONDS = float(os.environ.get("MODEL_POLL_SECONDS", "30"))
+FEATURES_DIR = os.environ.get("FEATURES_DIR", "data/processed")
+SIGNALS_PATH = os.environ.get("SIGNALS_PATH", DEFAULT_SIGNALS_PATH)
+CACHE_SIZE = int(os.environ.get("PREDICTION_CACHE_SIZE", "10000"))
+CACHE_TTL = float(os.environ.get("PREDICTION_CACHE_TTL", "300"))
+INFERENCE_THREADS = int(os.environ.get("INFERENCE_THREADS", str(os.cpu_count() or 1)))
+
+registry = ModelRegistry(MODELS_DIR, poll_interval=POLL_SECONDS)
+signals = SignalStore(SIGNALS_PATH)
+cache = PredictionCache(CACHE_SIZE, CACHE_TTL)
+registry.on_swap(cache.clear)
+# created in lifespan so a forking launcher never forks live threads
+executor: Optional[ThreadPoolExecutor] = None
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global executor
+    executor = ThreadPoolExecutor(INFERENCE_THREADS, thread_name_prefix="inference")
+    # models preloaded by a forking parent are kept: their mtimes match
+    registry.refresh()
+    registry.start()
+    yield
+    registry.stop()
+    executor.shutdown(wait=True)
+    executor = None
+
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(metrics.MetricsMiddleware)
+
+
+def _entry(market: str, version: Optional[str]):
+    try:
+        return registry.get(market, version)
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail=exc.args[0])
+
+
+async def _offload(fn, *args):
+    """Run CPU-bound scoring in the inference executor, off the event loop."""
+    return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+
+
+def _timer(request: Request, route: str) -> metrics.StageTimer:
+    # start at the middleware's timestamp so parsing counts as validation
+    return metrics.StageTimer(route, request.scope.get("state", {}).get("t0"))
+
+
+def _check_columns(entry, columns: Mapping[str, Any], lengths: bool = True) -> None:
+    cols = entry.feature_names or tuple(columns)
+    missing = [c for c in cols if c not in columns]
+    if missing:
+        raise HTTPException(status_code=422, detail=f"missing features: {missing}")
+    if lengths and len({len(columns[c]) for c in cols}) > 1:
+        raise HTTPException(status_code=422, detail="feature columns differ in length")
+
+
+def _score_columns(entry, columns: Mapping[str, Sequence], timer: metrics.StageTimer) -> np.ndarray:
+    """Score checked columnar input (one sequence per feature) in a single call."""
+    cols = list(entry.feature_names) or list(columns)
+    try:
+        if entry.scorer is not None:
+            Xt = entry.scorer.transform_columns(columns)
+            timer.mark("build")
+            probs = entry.scorer.proba_transformed(Xt)[:, 1]
+        else:
+            df = pd.DataFrame({c: columns[c] for c in cols})
+            timer.mark("build")
+            probs = np.asarray(predict(entry.model, df))
+    except (TypeError, ValueError) as exc:
+        raise HTTPException(status_code=422, detail=f"invalid feature values: {exc}")
+    timer.mark("inference")
+    if not np.isfinite(probs).all():
+        raise HTTPException(status_code=422, detail="feature values must be finite numbers")
+    metrics.ROWS.inc(entry.market, amount=len(probs))
+    return probs
+
+
+@app.get("/models")
+def list_models():
+    return {
+        "default_market": DEFAULT_MARKET,
+        "markets": registry.markets(),
+        "models": [e.describe() for e in registry.entries()],
+    }
+
+
+@app.get("/metrics")
+def metrics_endpoint():
+    entries = registry.entries()
+    active = registry.markets()
+    extra = [
+        metrics.gauge(
+            "cot_model_load_seconds", "Time taken to load each served model.",
+            ("market", "version"),
+            [((e.market, e.version), e.load_seconds) for e in entries],
+        ),
+        metrics.gauge(
+            "cot_model_active", "1 for the version served by default for each market.",
+            ("market", "version"),
+            [((e.market, e.version), int(active.get(e.market) == e.version)) for e in entries],
+        ),
+        metrics.gauge(
+            "cot_model_artifact_mtime_seconds", "Modification time of each served artifact.",
+            ("market", "version"),
+            [((e.market, e.version), e.mtime_ns / 1e9) for e in entries],
+        ),
+    ]
+    stats = cache.stats()
+    for name in ("hits", "misses", "coalesced", "evictions", "expirations", "invalidations", "size"):
+        extra.append(metrics.gauge(
+            f"cot_api_cache_{name}", f"Prediction cache {name}.", (), [((), stats[name])]
+        ))
+    return Response(metrics.render(extra), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/cache/stats")
+def cache_stats():
+    return cache.stats()
+
+
+@app.post("/models/reload")
+def reload_models():
+    changed = registry.refresh()
+    return {"reloaded": [f"{m}@{v}" for m, v in changed]}
 
-class Features(BaseModel):
-    mm_net_pct_oi: float
-    pm_net_pct_oi: float
-    sd_net_pct_oi: float
 
 @app.post("/predict")
-def predict_endpoint(feat: Features):
-    df = pd.DataFrame([feat.dict()])
-    prob = float(predict(model, df))
-    return {"probability_up": prob}
+async def predict_endpoint(
+    request: Request,
+    feat: Dict[str, Union[float, str]],
+    market: str = DEFAULT_MARKET,
+    version: Optional[str] = None,
+):
+    timer = _timer(request, "/predict")
+    # resolve once: a swap during scoring does not affect this request
+    entry = _entry(market, version)
+    _check_columns(entry, feat, lengths=False)
+    key = cache.key(entry, feat)
+    timer.mark("validation")
+    computed = []
+
+    def compute() -> float:
+        computed.append(True)
+        return float(_score_columns(entry, {c: [v] for c, v in feat.items()}, timer)[0])
+
+    def run() -> Response:
+        prob = cache.get_or_compute(key, compute)
+        if not computed:
+            timer.mark("cache")
+        body = json.dumps({"market": entry.market, "version": entry.version, "probability_up": prob})
+        response = Response(body, media_type="application/json")
+        timer.mark("serialize")
+        return response
+
+    return await _offload(run)
+
+
+@app.post("/predict/batch")
+async def predict_batch_endpoint(
+    request: Request,
+    columns: Dict[str, List[Any]],
+    market: str = DEFAULT_MARKET,
+    version: Optional[str] = None,
+):
+    """Score many rows sent as one list per feature."""
+    timer = _timer(request, "/predict/batch")
+    entry = _entry(market, version)
+    _check_columns(entry, columns)
+    timer.mark("validation")
+
+    def run() -> Response:
+        probs = _score_columns(entry, columns, timer)
+        # plain json.dumps; the encoder walk of a 10k-element list is the slow part
+        response = JSONResponse({
+            "market": entry.market,
+            "version": entry.version,
+            "probability_up": probs.tolist(),
+        })
+        timer.mark("serialize")
+        return response
+
+    return await _offload(run)
+
+
+@app.get("/backfill/{market}")
+def backfill_endpoint(
+    market: str,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    version: Optional[str] = None,
+    chunk_rows: int = backfill.CHUNK_ROWS,
+):
+    """Stream historical probabilities for ``market`` as NDJSON."""
+    entry = _entry(market, version)
+    try:
+        path = backfill.feature_path(FEATURES_DIR, market)
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=404, detail=str(exc))
+    # fail before streaming starts; the status cannot change afterwards
+    missing = backfill.check_columns(path, list(entry.feature_names))
+    if missing:
+        raise HTTPException(status_code=422, detail=f"features file lacks columns: {missing}")
+    if chunk_rows < 1:
+        raise HTTPException(status_code=422, detail="chunk_rows must be positive")
+    return StreamingResponse(
+        backfill.ndjson_lines(entry, path, start, end, chunk_rows),
+        media_type="application/x-ndjson",
+    )
+
+
+@app.get("/signals/latest")
+def latest_signals():
+    body = signals.latest()
+    if body is None:
+        raise HTTPException(status_code=404, detail="no signal snapshot has been written")
+    return Response(body, media_type="application/json")
+
+
+@app.get("/signals/{market}")
+def market_signals(market: str):
+    body = signals.market(market)
+    if body is None:
+        raise HTTPException(status_code=404, detail=f"no signals for market {market!r}")
+    return Response(body, media_type="application/json")
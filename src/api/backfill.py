@@ -0,0 +1,99 @@
+"""Chunked historical scoring streamed back as NDJSON.
+
+The features CSV of a market is read ``chunk_rows`` rows at a time, rows
+outside ``[start, end]`` are dropped, each chunk is scored in one call and
+turned into newline-delimited JSON before the next chunk is read.  Only one
+chunk and its encoded lines are alive at any time, so the server's memory does
+not grow with the length of the history or the number of markets a client
+pulls.
+"""
+
+import json
+import math
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.models.predict_model import predict
+
+DATE_COL = "week"
+FEATURE_PATTERN = "features_{market}.csv"
+CHUNK_ROWS = 5000
+
+
+def feature_path(features_dir: str, market: str, pattern: str = FEATURE_PATTERN) -> Path:
+    """Features CSV of ``market``; raises ``FileNotFoundError`` when missing."""
+    path = Path(features_dir) / pattern.format(market=market)
+    if not path.is_file():
+        raise FileNotFoundError(f"no features file for market {market!r}")
+    return path
+
+
+def check_columns(path: Path, columns: List[str]) -> List[str]:
+    """Return the required columns missing from the CSV header."""
+    header = pd.read_csv(path, nrows=0).columns
+    return [c for c in [DATE_COL] + columns if c not in header]
+
+
+def iter_chunks(
+    path: Path,
+    columns: List[str],
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    chunk_rows: int = CHUNK_ROWS,
+) -> Iterator[pd.DataFrame]:
+    """Yield date-filtered chunks of ``path`` holding ``DATE_COL`` plus ``columns``."""
+    lo = pd.Timestamp(start) if start else None
+    hi = pd.Timestamp(end) if end else None
+    reader = pd.read_csv(path, usecols=[DATE_COL] + columns, chunksize=chunk_rows)
+    for chunk in reader:
+        dates = pd.to_datetime(chunk[DATE_COL])
+        mask = np.ones(len(chunk), dtype=bool)
+        if lo is not None:
+            mask &= (dates >= lo).to_numpy()
+        if hi is not None:
+            mask &= (dates <= hi).to_numpy()
+        if mask.any():
+            out = chunk[mask]
+            yield out.assign(**{DATE_COL: dates[mask].dt.strftime("%Y-%m-%d")})
+
+
+def score_chunk(entry, chunk: pd.DataFrame, columns: List[str]) -> np.ndarray:
+    """Positive-class probability per row; NaN where a feature is missing."""
+    probs = np.full(len(chunk), np.nan)
+    complete = chunk[columns].notna().all(axis=1).to_numpy()
+    if complete.any():
+        rows = chunk[complete]
+        if entry.scorer is not None:
+            probs[complete] = entry.scorer.predict_proba_columns(
+                {c: rows[c].to_numpy() for c in columns}
+            )[:, 1]
+        else:
+            probs[complete] = predict(entry.model, rows[columns])
+    return probs
+
+
+def ndjson_lines(
+    entry,
+    path: Path,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    chunk_rows: int = CHUNK_ROWS,
+) -> Iterator[bytes]:
+    """Yield one encoded NDJSON block per chunk.
+
+    ``entry`` is resolved by the caller once, so the whole stream is scored
+    by one model version even if the registry swaps while it runs.
+    """
+    columns = list(entry.feature_names)
+    prefix = f'{{"market": {json.dumps(entry.market)}, "version": {json.dumps(entry.version)}, '
+    for chunk in iter_chunks(path, columns, start, end, chunk_rows):
+        probs = score_chunk(entry, chunk, columns)
+        lines = [
+            f'{prefix}"{DATE_COL}": "{week}", "probability_up": '
+            f'{"null" if math.isnan(p) else repr(float(p))}}}\n'
+            for week, p in zip(chunk[DATE_COL], probs.tolist())
+        ]
+        yield "".join(lines).encode()
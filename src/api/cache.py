@@ -0,0 +1,116 @@
+"""In-process LRU + TTL prediction cache with request coalescing.
+
+Keys are ``(market, version, artifact mtime, quantized feature vector)`` so a
+retrained artifact never serves an old probability, and the registry also
+clears the cache on every snapshot swap.  When several threads ask for the
+same key at once only the first computes it; the others wait on its future.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Mapping, Tuple
+
+
+class PredictionCache:
+    """Thread-safe LRU cache whose entries expire after ``ttl`` seconds."""
+
+    def __init__(
+        self,
+        maxsize: int = 10000,
+        ttl: float = 300.0,
+        decimals: int = 8,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.decimals = decimals
+        self.clock = clock
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        # bumped by clear(); results computed before a clear are not stored
+        self._generation = 0
+        self._counts = dict.fromkeys(
+            ("hits", "misses", "coalesced", "evictions", "expirations", "invalidations"), 0
+        )
+
+    def key(self, entry, features: Mapping[str, Any]) -> Tuple:
+        """Cache key for ``features`` scored by a registry ``entry``.
+
+        Floats are rounded to ``decimals`` places so vectors that differ
+        only by serialization noise share a key.  Raises ``KeyError`` when a
+        model feature is missing.
+        """
+        cols = entry.feature_names or tuple(sorted(features))
+        values = tuple(
+            round(v, self.decimals) if isinstance(v, float) else v
+            for v in (features[c] for c in cols)
+        )
+        return (entry.market, entry.version, entry.mtime_ns, values)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Return the cached value for ``key`` or compute it exactly once."""
+        if self.maxsize <= 0:
+            return compute()
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                if self.clock() - item[0] <= self.ttl:
+                    self._data.move_to_end(key)
+                    self._counts["hits"] += 1
+                    return item[1]
+                del self._data[key]
+                self._counts["expirations"] += 1
+            future = self._inflight.get(key)
+            if future is not None:
+                self._counts["coalesced"] += 1
+                owner = False
+            else:
+                future = self._inflight[key] = Future()
+                self._counts["misses"] += 1
+                owner = True
+                generation = self._generation
+        if not owner:
+            return future.result()
+
+        try:
+            value = compute()
+        except BaseException as exc:
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_exception(exc)
+            raise
+        with self._lock:
+            self._inflight.pop(key, None)
+            if generation == self._generation:
+                self._data[key] = (self.clock(), value)
+                self._data.move_to_end(key)
+                while len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+                    self._counts["evictions"] += 1
+        future.set_result(value)
+        return value
+
+    def clear(self, *_) -> None:
+        """Drop every entry; accepts and ignores registry swap arguments."""
+        with self._lock:
+            self._data.clear()
+            self._generation += 1
+            self._counts["invalidations"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = dict(self._counts)
+            size = len(self._data)
+            inflight = len(self._inflight)
+        lookups = counts["hits"] + counts["misses"] + counts["coalesced"]
+        return {
+            **counts,
+            "size": size,
+            "inflight": inflight,
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hit_ratio": (counts["hits"] + counts["coalesced"]) / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,187 @@
+"""Low-overhead request instrumentation rendered in Prometheus text format.
+
+Every thread records into its own shard (a ``threading.local`` dict of plain
+Python slot lists), so the hot path takes no lock: an observation is a
+``bisect`` over fixed bucket bounds and two in-place additions.  Shards are
+only summed when ``/metrics`` is scraped.  A scrape may see a shard mid-update
+and be off by the one observation in flight, which is fine for monitoring.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# seconds; spans cached lookups (~10us) to large batch requests (~1s)
+LATENCY_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+)
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Labels, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Sharded:
+    """Per-thread ``{labels: slots}`` dicts merged on collection."""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str], width: int):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.width = width
+        self._local = threading.local()
+        self._shards: List[Dict[Labels, list]] = []
+
+    def _slots(self, labels: Labels) -> list:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            self._shards.append(shard)  # list.append is atomic under the GIL
+        slots = shard.get(labels)
+        if slots is None:
+            slots = shard[labels] = [0] * self.width
+        return slots
+
+    def collect(self) -> Dict[Labels, list]:
+        merged: Dict[Labels, list] = {}
+        for shard in list(self._shards):
+            for labels, slots in list(shard.items()):
+                total = merged.setdefault(labels, [0] * self.width)
+                for i, v in enumerate(slots):
+                    total[i] += v
+        return merged
+
+
+class Counter(_Sharded):
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames, 1)
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self._slots(labels)[0] += amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, (value,) in sorted(self.collect().items()):
+            lines.append(f"{self.name}{_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+class Histogram(_Sharded):
+    """Fixed-bucket histogram; slots are per-bucket counts, then count and sum."""
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        self.buckets = tuple(buckets)
+        super().__init__(name, help, labelnames, len(self.buckets) + 3)
+
+    def observe(self, value: float, *labels: str) -> None:
+        slots = self._slots(labels)
+        slots[bisect_left(self.buckets, value)] += 1
+        slots[-2] += 1
+        slots[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, slots in sorted(self.collect().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), slots[:-2]):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound!r}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {slots[-2]}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {slots[-1]}")
+        return lines
+
+
+def gauge(name: str, help: str, labelnames: Sequence[str], samples: Iterable[Tuple[Labels, float]]) -> List[str]:
+    """Render a gauge whose values are read at scrape time."""
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} gauge"]
+    for labels, value in samples:
+        lines.append(f"{name}{_labels(labelnames, labels)} {value}")
+    return lines
+
+
+REQUESTS = Counter("cot_api_requests_total", "HTTP requests by route and status.", ("route", "method", "status"))
+REQUEST_SECONDS = Histogram("cot_api_request_seconds", "End-to-end request latency.", ("route",))
+STAGE_SECONDS = Histogram(
+    "cot_api_stage_seconds",
+    "Time spent per request stage (validation, build, inference, cache, serialize).",
+    ("route", "stage"),
+)
+ROWS = Counter("cot_api_scored_rows_total", "Rows scored by market.", ("market",))
+
+
+class StageTimer:
+    """Attribute consecutive slices of a request to named stages.
+
+    ``mark(stage)`` records the time since the previous mark (or ``start``)
+    under ``stage``.
+    """
+
+    __slots__ = ("route", "last")
+
+    def __init__(self, route: str, start: Optional[float] = None):
+        self.route = route
+        self.last = time.perf_counter() if start is None else start
+
+    def mark(self, stage: str) -> None:
+        now = time.perf_counter()
+        STAGE_SECONDS.observe(now - self.last, self.route, stage)
+        self.last = now
+
+
+class MetricsMiddleware:
+    """ASGI middleware counting requests and timing them per route template.
+
+    The request start time is stored in ``scope["state"]["t0"]`` so handlers
+    can attribute routing and body parsing to the validation stage.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        scope.setdefault("state", {})["t0"] = start
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = getattr(scope.get("route"), "path", "unmatched")
+            REQUESTS.inc(route, scope["method"], str(status[0]))
+            REQUEST_SECONDS.observe(time.perf_counter() - start, route)
+
+
+def render(extra: Iterable[List[str]] = ()) -> str:
+    """Prometheus exposition text for the built-in metrics plus ``extra`` blocks."""
+    lines: List[str] = []
+    for metric in (REQUESTS, REQUEST_SECONDS, STAGE_SECONDS, ROWS):
+        lines.extend(metric.render())
+    for block in extra:
+        lines.extend(block)
+    return "\n".join(lines) + "\n"
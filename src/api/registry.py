@@ -0,0 +1,232 @@
+"""Hot-reloadable registry of per-market, per-version models.
+
+Artifacts are discovered in a models directory with two layouts::
+
+    models/model_<market>.joblib          -> version "default"
+    models/<market>/<version>.joblib      -> explicit versions, e.g. 2025-06-13
+
+A ``.compact`` sibling is picked up by :func:`predict_model.load_model`.  The
+latest version of a market is the lexically greatest explicit version, or
+``default`` when there is none.
+
+A background thread rescans the directory, loads new or changed artifacts
+outside any lock and then replaces the whole snapshot in one reference
+assignment.  Requests read the snapshot once, so in-flight predictions keep
+using the model they started with while new requests see the retrained one.
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.models.compact import CompactModel, to_compact
+from src.models.predict_model import load_model
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+handler = logging.StreamHandler()
+handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+if not logger.handlers:
+    logger.addHandler(handler)
+
+DEFAULT_VERSION = "default"
+PREFIX = "model_"
+PATTERNS = ("*.joblib", "*.pkl")
+
+Key = Tuple[str, str]
+
+
+@dataclass(frozen=True)
+class ModelEntry:
+    market: str
+    version: str
+    path: str
+    mtime_ns: int
+    model: Any
+    feature_names: Tuple[str, ...]
+    load_seconds: float
+    # NumPy-only scorer for the array fast path; None when unsupported
+    scorer: Optional[CompactModel] = None
+
+    def describe(self) -> dict:
+        return {
+            "market": self.market,
+            "version": self.version,
+            "path": self.path,
+            "kind": type(self.model).__name__,
+            "fast_path": self.scorer is not None,
+            "features": list(self.feature_names),
+            "load_seconds": round(self.load_seconds, 4),
+        }
+
+
+def feature_names(model) -> Tuple[str, ...]:
+    """Input columns expected by a fitted pipeline or compact model."""
+    names = getattr(model, "feature_names", None)
+    if names is None:
+        names = getattr(model, "feature_names_in_", None)
+    return tuple(names) if names is not None else ()
+
+
+def as_compact(model) -> Optional[CompactModel]:
+    """Return ``model`` as a :class:`CompactModel` when it can be converted."""
+    if isinstance(model, CompactModel):
+        return model
+    try:
+        return to_compact(model)
+    except (ValueError, AttributeError):
+        return None
+
+
+def _artifact_mtime(path: Path) -> int:
+    # a refreshed .compact sibling also counts as a change
+    compact = path.with_suffix(".compact")
+    mtimes = [path.stat().st_mtime_ns]
+    if compact.exists():
+        mtimes.append(compact.stat().st_mtime_ns)
+    return max(mtimes)
+
+
+def scan_models(models_dir: str) -> Dict[Key, Tuple[str, int]]:
+    """Return ``{(market, version): (path, mtime_ns)}`` for every artifact."""
+    root = Path(models_dir)
+    found = {}
+    if not root.is_dir():
+        return found
+    for pattern in PATTERNS:
+        for path in root.glob(pattern):
+            if path.stem.startswith(PREFIX):
+                found[(path.stem[len(PREFIX):], DEFAULT_VERSION)] = path
+        for path in root.glob(f"*/{pattern}"):
+            found[(path.parent.name, path.stem)] = path
+    out = {}
+    for key, path in found.items():
+        try:
+            out[key] = (str(path), _artifact_mtime(path))
+        except FileNotFoundError:
+            # removed between glob and stat; picked up on the next scan
+            continue
+    return out
+
+
+def _latest(versions: List[str]) -> str:
+    explicit = sorted(v for v in versions if v != DEFAULT_VERSION)
+    return explicit[-1] if explicit else DEFAULT_VERSION
+
+
+class ModelRegistry:
+    """Serve the models of a directory and swap in new artifacts atomically."""
+
+    def __init__(
+        self,
+        models_dir: str,
+        poll_interval: float = 30.0,
+        settle_seconds: float = 2.0,
+        loader: Callable[[str], Any] = load_model,
+    ):
+        self.models_dir = models_dir
+        self.poll_interval = poll_interval
+        self.settle_seconds = settle_seconds
+        self.loader = loader
+        # (entries, latest version per market); replaced, never mutated
+        self._state: Tuple[Dict[Key, ModelEntry], Dict[str, str]] = ({}, {})
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._listeners: List[Callable[[Dict[Key, ModelEntry]], None]] = []
+
+    def refresh(self) -> List[Key]:
+        """Rescan the directory and swap in any new or changed artifacts.
+
+        Returns the keys that were (re)loaded.  Artifacts that fail to load,
+        or were modified less than ``settle_seconds`` ago and may still be
+        being written, keep serving their previous version.
+        """
+        with self._refresh_lock:
+            now_ns = time.time_ns()
+            current = self._state[0]
+            found = scan_models(self.models_dir)
+            entries, changed = {}, []
+            for key, (path, mtime_ns) in sorted(found.items()):
+                old = current.get(key)
+                if old is not None and old.path == path and old.mtime_ns == mtime_ns:
+                    entries[key] = old
+                    continue
+                if now_ns - mtime_ns < self.settle_seconds * 1e9:
+                    if old is not None:
+                        entries[key] = old
+                    continue
+                start = time.perf_counter()
+                try:
+                    model = self.loader(path)
+                except Exception as exc:
+                    logger.error(f"Failed to load {path}: {exc}")
+                    if old is not None:
+                        entries[key] = old
+                    continue
+                entries[key] = ModelEntry(
+                    key[0], key[1], path, mtime_ns, model,
+                    feature_names(model), time.perf_counter() - start,
+                    as_compact(model),
+                )
+                changed.append(key)
+                logger.info(f"Loaded {key[0]}@{key[1]} from {path}")
+
+            removed = set(current) - set(entries)
+            if not changed and not removed:
+                return []
+            latest = {}
+            for market in {m for m, _ in entries}:
+                latest[market] = _latest([v for m, v in entries if m == market])
+            self._state = (entries, latest)
+            for key in sorted(removed):
+                logger.info(f"Unloaded {key[0]}@{key[1]}")
+            for listener in self._listeners:
+                listener(entries)
+            return changed
+
+    def get(self, market: str, version: Optional[str] = None) -> ModelEntry:
+        """Return the entry for ``market`` (latest version unless given)."""
+        entries, latest = self._state
+        if market not in latest:
+            raise KeyError(f"unknown market {market!r}")
+        key = (market, version or latest[market])
+        if key not in entries:
+            raise KeyError(f"unknown version {key[1]!r} for market {market!r}")
+        return entries[key]
+
+    def markets(self) -> Dict[str, str]:
+        """Map each market to the version served by default."""
+        return dict(self._state[1])
+
+    def entries(self) -> List[ModelEntry]:
+        entries = self._state[0]
+        return [entries[k] for k in sorted(entries)]
+
+    def on_swap(self, listener: Callable[[Dict[Key, ModelEntry]], None]) -> None:
+        """Call ``listener(entries)`` after every snapshot swap."""
+        self._listeners.append(listener)
+
+    def _poll(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.refresh()
+            except Exception as exc:
+                logger.error(f"Model refresh failed: {exc}")
+
+    def start(self) -> None:
+        """Start the background watcher thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._poll, name="model-registry", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,146 @@
+"""Prefork launcher that shares preloaded models across uvicorn workers.
+
+``uvicorn --workers N`` imports and loads every model once per worker.  This
+launcher loads the registry once in the parent, calls :func:`gc.freeze` so the
+collector does not write to the preloaded objects, binds the listening socket
+and then forks the workers.  Model arrays stay on copy-on-write pages that
+every worker shares; compact artifacts are memory-mapped files and are shared
+through the page cache in any case.
+
+Each worker runs its own uvicorn event loop on the inherited socket, scores in
+a ``ThreadPoolExecutor`` of ``--inference-threads`` threads and starts its own
+registry watcher, so a retrained artifact is picked up by every worker (that
+copy is private to the worker until the next restart).  The parent restarts
+workers that die and forwards SIGINT/SIGTERM.
+"""
+
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+handler = logging.StreamHandler()
+handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+if not logger.handlers:
+    logger.addHandler(handler)
+
+
+def bind_socket(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(sock: socket.socket, log_level: str) -> None:
+    import uvicorn
+
+    from src.api.app import app
+
+    config = uvicorn.Config(app, log_level=log_level, lifespan="on", access_log=False)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def _fork_worker(sock: socket.socket, log_level: str) -> int:
+    pid = os.fork()
+    if pid == 0:
+        code = 0
+        try:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            _run_worker(sock, log_level)
+        except BaseException:
+            logger.exception("worker crashed")
+            code = 1
+        finally:
+            os._exit(code)
+    return pid
+
+
+def serve(
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    workers: int = 4,
+    inference_threads: int = 0,
+    preload: bool = True,
+    log_level: str = "warning",
+) -> int:
+    """Preload models, fork ``workers`` processes and supervise them."""
+    if not hasattr(os, "fork"):
+        raise RuntimeError("the prefork launcher needs os.fork; use uvicorn directly")
+    threads = inference_threads or max(1, (os.cpu_count() or 1) // workers)
+    # read by src.api.app at import time
+    os.environ["INFERENCE_THREADS"] = str(threads)
+
+    sock = bind_socket(host, port)
+    from src.api import app as app_module
+
+    if preload:
+        start = time.perf_counter()
+        app_module.registry.refresh()
+        logger.info(
+            f"Preloaded {len(app_module.registry.entries())} models "
+            f"in {time.perf_counter() - start:.2f}s"
+        )
+    gc.collect()
+    gc.freeze()
+
+    children = {_fork_worker(sock, log_level) for _ in range(workers)}
+    logger.info(f"Serving on {host}:{port} with {workers} workers x {threads} inference threads")
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        children.discard(pid)
+        if not stopping:
+            logger.warning(f"Worker {pid} exited with status {status}; restarting")
+            children.add(_fork_worker(sock, log_level))
+    sock.close()
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the API from preforked workers")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--inference-threads", type=int, default=0,
+                        help="scoring threads per worker (0 = cores / workers)")
+    parser.add_argument("--no-preload", action="store_true",
+                        help="let every worker load its own models")
+    parser.add_argument("--log-level", default="warning")
+    args = parser.parse_args()
+    sys.exit(serve(
+        args.host, args.port, args.workers, args.inference_threads,
+        preload=not args.no_preload, log_level=args.log_level,
+    ))
+
+
+if __name__ == "__main__":
+    main()
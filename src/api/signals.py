@@ -0,0 +1,184 @@
+"""Latest-week signal snapshot written after the ETL and served from memory.
+
+:func:`build_snapshot` scores the most recent complete week of every model in
+the models directory and writes one structured NumPy array (``.npy``) with a
+row per (market, version)::
+
+    market, version, week, probability, signal, contrarian
+
+``signal`` is ``1`` (long) or ``0`` (flat) from ``probability >= threshold``
+and is inverted on weeks flagged ``extreme_spec_long``, the same contrarian
+overlay as :func:`src.eval.backtest.run_backtest`.
+
+:class:`SignalStore` memory-maps the file, pre-encodes the JSON responses once
+per file version and re-reads the file only when its mtime changes, so a
+request costs one ``stat`` and a dict lookup.
+"""
+
+import argparse
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.api.registry import ModelRegistry
+from src.models.predict_model import predict
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+handler = logging.StreamHandler()
+handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+if not logger.handlers:
+    logger.addHandler(handler)
+
+SNAPSHOT_FIELDS = [
+    ("week", "datetime64[D]"),
+    ("probability", "f8"),
+    ("signal", "i1"),
+    ("contrarian", "i1"),
+]
+FEATURE_PATTERN = "class_features_{market}.csv"
+# where the weekly ETL writes the snapshot and the API reads it
+DEFAULT_SIGNALS_PATH = "data/processed/signals_latest.npy"
+CONTRARIAN_COL = "extreme_spec_long"
+
+
+def _features_file(features_dir: str, market: str, pattern: str) -> Optional[Path]:
+    # model keys such as "contrarian_gc" or "gc_online" score the features of
+    # market "gc"
+    for name in (market, market.split("_", 1)[0], market.rsplit("_", 1)[-1]):
+        path = Path(features_dir) / pattern.format(market=name)
+        if path.is_file():
+            return path
+    return None
+
+
+def snapshot_dtype(rows) -> np.dtype:
+    """Record layout with market and version fields as wide as the longest name."""
+    market_width = max((len(r[0]) for r in rows), default=1)
+    version_width = max((len(r[1]) for r in rows), default=1)
+    return np.dtype([("market", f"U{market_width}"), ("version", f"U{version_width}")] + SNAPSHOT_FIELDS)
+
+
+def latest_row(features_csv: Path, columns) -> Optional[pd.DataFrame]:
+    """Most recent week with every feature in ``columns`` present."""
+    df = pd.read_csv(features_csv, parse_dates=["week"]).sort_values("week")
+    complete = df.dropna(subset=list(columns))
+    return complete.tail(1) if len(complete) else None
+
+
+def build_snapshot(
+    models_dir: str,
+    features_dir: str,
+    out_path: str,
+    threshold: float = 0.5,
+    pattern: str = FEATURE_PATTERN,
+) -> np.ndarray:
+    """Score the latest week of every model and write the snapshot atomically."""
+    registry = ModelRegistry(models_dir, settle_seconds=0)
+    registry.refresh()
+    rows = []
+    for entry in registry.entries():
+        path = _features_file(features_dir, entry.market, pattern)
+        if path is None:
+            logger.warning(f"No features file for {entry.market}; skipped")
+            continue
+        row = latest_row(path, entry.feature_names)
+        if row is None:
+            logger.warning(f"No complete week in {path}; skipped {entry.market}")
+            continue
+        X = row[list(entry.feature_names)]
+        prob = float(np.asarray(predict(entry.model, X))[0])
+        contrarian = int(row[CONTRARIAN_COL].iloc[0] == 1) if CONTRARIAN_COL in row else 0
+        signal = int(prob >= threshold)
+        rows.append((
+            entry.market,
+            entry.version,
+            np.datetime64(row["week"].iloc[0].date(), "D"),
+            prob,
+            -signal if contrarian else signal,
+            contrarian,
+        ))
+
+    snapshot = np.array(rows, dtype=snapshot_dtype(rows))
+    Path(out_path).parent.mkdir(parents=True, exist_ok=True)
+    tmp = f"{out_path}.tmp"
+    with open(tmp, "wb") as fh:
+        np.save(fh, snapshot)
+    os.replace(tmp, out_path)
+    logger.info(f"Wrote {len(snapshot)} signals to {out_path}")
+    return snapshot
+
+
+def _record(row) -> dict:
+    return {
+        "market": str(row["market"]),
+        "version": str(row["version"]),
+        "week": str(row["week"]),
+        "probability": float(row["probability"]),
+        "signal": int(row["signal"]),
+        "contrarian": bool(row["contrarian"]),
+    }
+
+
+class SignalStore:
+    """Memory-mapped snapshot reader with pre-encoded responses."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        # (mtime_ns, all-signals JSON, {market: JSON}); replaced, never mutated
+        self._state: Tuple[Optional[int], bytes, Dict[str, bytes]] = (None, b"[]", {})
+
+    def _current(self):
+        try:
+            mtime_ns = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        state = self._state
+        if state[0] == mtime_ns:
+            return state
+        with self._lock:
+            if self._state[0] != mtime_ns:
+                snapshot = np.load(self.path, mmap_mode="r")
+                records = [_record(r) for r in snapshot]
+                by_market: Dict[str, list] = {}
+                for rec in records:
+                    by_market.setdefault(rec["market"], []).append(rec)
+                self._state = (
+                    mtime_ns,
+                    json.dumps(records).encode(),
+                    {m: json.dumps(recs).encode() for m, recs in by_market.items()},
+                )
+                logger.info(f"Loaded {len(records)} signals from {self.path}")
+            return self._state
+
+    def latest(self) -> Optional[bytes]:
+        """JSON for every signal, or ``None`` when no snapshot exists."""
+        state = self._current()
+        return None if state is None else state[1]
+
+    def market(self, market: str) -> Optional[bytes]:
+        """JSON for the signals of ``market``, or ``None`` when unknown."""
+        state = self._current()
+        return None if state is None else state[2].get(market)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write the latest-week signal snapshot")
+    parser.add_argument("--models-dir", default="models")
+    parser.add_argument("--features-dir", default="data/processed")
+    parser.add_argument("--out", default=os.environ.get("SIGNALS_PATH", DEFAULT_SIGNALS_PATH))
+    parser.add_argument("--threshold", type=float, default=0.5,
+                        help="probability at or above which the signal is long")
+    args = parser.parse_args()
+    build_snapshot(args.models_dir, args.features_dir, args.out, args.threshold)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,9 +2,22 @@ import pandas as pd
 from pathlib import Path
 import argparse
 
-
-def build_classification_features(in_csv: str, out_csv: str, th: float = 0.0) -> pd.DataFrame:
-    """Add binary classification target and extreme speculator flag."""
+from src.features.expanding_quantile import extreme_flags
+
+
+def build_classification_features(
+    in_csv: str,
+    out_csv: str,
+    th: float = 0.0,
+    q: float = 0.90,
+    min_periods: int = 52,
+) -> pd.DataFrame:
+    """Add binary classification target and extreme speculator flag.
+
+    The flag compares each week's ``mm_net_pct_oi`` with the ``q`` percentile
+    of the weeks up to and including it, so no future data leaks into earlier
+    rows.  Weeks with fewer than ``min_periods`` observations are not flagged.
+    """
     df = pd.read_csv(in_csv)
     if "return_1w" in df.columns:
         ret_col = "return_1w"
@@ -15,8 +28,8 @@ def build_classification_features(in_csv: str, out_csv: str, th: float = 0.0) ->
 
     # flag weeks when money managers are extremely long
     if "mm_net_pct_oi" in df.columns:
-        p90 = df["mm_net_pct_oi"].quantile(0.90)
-        df["extreme_spec_long"] = (df["mm_net_pct_oi"] >= p90).astype(int)
+        flags = extreme_flags(df["mm_net_pct_oi"], [q], min_periods=min_periods)
+        df["extreme_spec_long"] = flags[q]
 
     df["target_dir"] = (df[ret_col] > th).astype(int)
     Path(out_csv).parent.mkdir(parents=True, exist_ok=True)
@@ -34,8 +47,15 @@ def main() -> None:
         help='Output CSV with target and extreme flag'
     )
     parser.add_argument('--th', type=float, default=0.0, help='Return threshold')
+    parser.add_argument('--q', type=float, default=0.90, help='Extreme speculator percentile')
+    parser.add_argument(
+        '--min-periods',
+        type=int,
+        default=52,
+        help='Weeks of history required before flagging extremes'
+    )
     args = parser.parse_args()
-    build_classification_features(args.in_csv, args.out_csv, args.th)
+    build_classification_features(args.in_csv, args.out_csv, args.th, args.q, args.min_periods)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,105 @@
+import argparse
+from pathlib import Path
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_HORIZONS = (1, 2, 4, 13)
+KEY_COLS = ["week", "report_date", "market_name"]
+
+
+def forward_returns(df: pd.DataFrame, horizons: Sequence[int]) -> np.ndarray:
+    """Return an ``(n_rows, n_horizons)`` matrix of forward returns.
+
+    Prices are used when ``etf_close`` is present so ``h=1`` matches
+    ``return_1w``.  Otherwise ``return_1w`` is compounded over each horizon.
+    Rows without a full horizon ahead of them are NaN.
+    """
+    n = len(df)
+    ahead = np.arange(n)[:, None] + np.asarray(horizons, dtype=int)[None, :]
+
+    if "etf_close" in df.columns:
+        close = np.append(df["etf_close"].to_numpy(dtype=float), np.nan)
+        return close[np.minimum(ahead, n)] / close[:n, None] - 1
+
+    if "return_1w" not in df.columns:
+        raise ValueError("Input CSV must contain 'etf_close' or 'return_1w' column")
+    # cumulative log growth so an h-week return is a difference of two entries
+    returns = df["return_1w"].to_numpy(dtype=float)
+    growth = np.concatenate([[0.0], np.cumsum(np.log1p(returns)), [np.nan]])
+    return np.expm1(growth[np.minimum(ahead, n + 1)] - growth[:n, None])
+
+
+def build_label_matrix(
+    in_csv: str,
+    out_csv: str,
+    horizons: Sequence[int] = DEFAULT_HORIZONS,
+    thresholds: Sequence[float] = (0.0,),
+    ternary: bool = False,
+) -> pd.DataFrame:
+    """Write forward returns and labels for every horizon and threshold.
+
+    Binary labels are ``1`` when the forward return exceeds the threshold.
+    Ternary labels are ``1`` above ``th``, ``-1`` below ``-th`` and ``0`` in
+    between.  Rows stay aligned with the input features so a training job can
+    join any ``target_{h}w_th{th}`` column by ``week``.
+    """
+    df = pd.read_csv(in_csv)
+    fwd = forward_returns(df, horizons)
+    ths = np.asarray(thresholds, dtype=float)
+
+    # (rows, horizons, thresholds) in one broadcast comparison
+    up = fwd[:, :, None] > ths[None, None, :]
+    labels = up.astype(np.int8)
+    if ternary:
+        labels = labels - (fwd[:, :, None] < -ths[None, None, :]).astype(np.int8)
+    missing = np.isnan(fwd)
+
+    out = df[[c for c in KEY_COLS if c in df.columns]].copy()
+    for i, h in enumerate(horizons):
+        out[f"fwd_ret_{h}w"] = fwd[:, i]
+    for i, h in enumerate(horizons):
+        for j, th in enumerate(thresholds):
+            col = pd.array(labels[:, i, j], dtype="Int8")
+            col[missing[:, i]] = pd.NA
+            out[label_name(h, th)] = col
+
+    Path(out_csv).parent.mkdir(parents=True, exist_ok=True)
+    out.to_csv(out_csv, index=False)
+    return out
+
+
+def label_name(horizon: int, th: float) -> str:
+    """Column name used for the label of ``horizon`` weeks at threshold ``th``."""
+    return f"target_{horizon}w_th{th:g}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Create multi-horizon label matrix")
+    parser.add_argument('--in', dest='in_csv', required=True, help='Input features CSV')
+    parser.add_argument(
+        '--out',
+        dest='out_csv',
+        default='data/processed/labels.csv',
+        help='Output CSV with forward returns and labels'
+    )
+    parser.add_argument(
+        '--horizons',
+        default=','.join(str(h) for h in DEFAULT_HORIZONS),
+        help='Comma-separated horizons in weeks'
+    )
+    parser.add_argument('--thresholds', default='0', help='Comma-separated return thresholds')
+    parser.add_argument('--ternary', action='store_true', help='Emit -1/0/1 labels')
+    args = parser.parse_args()
+    build_label_matrix(
+        args.in_csv,
+        args.out_csv,
+        [int(h) for h in args.horizons.split(',')],
+        [float(t) for t in args.thresholds.split(',')],
+        ternary=args.ternary,
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -1,14 +1,33 @@
 import argparse
+import logging
 from pathlib import Path
 from typing import Optional
 
 import joblib
+import numpy as np
 import pandas as pd
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
 
+from src.eval.metrics import performance
+from src.eval.vector_backtest import backtest_matrix, signal_matrix
+from src.models.predict_model import load_model
 
-def _load_split(features_csv: str, test_start_date: str):
-    df = pd.read_csv(features_csv, parse_dates=["week"])
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+handler = logging.StreamHandler()
+handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+if not logger.handlers:
+    logger.addHandler(handler)
+
+BACKTEST_COLUMNS = ["week", "entry_price", "exit_price", "signal", "strategy_ret", "cum_return"]
+NO_REFIT_HELP = (
+    "Score the stored model as trained; unless it was trained before test_start "
+    "this leaks the test window into the model"
+)
+
+
+def split_frame(df: pd.DataFrame, test_start_date: str):
+    """Sort ``df`` by week and split it into train/test at ``test_start_date``."""
     df = df.sort_values("week").reset_index(drop=True)
     test_start = pd.to_datetime(test_start_date)
     train_df = df[df.week < test_start]
@@ -16,6 +35,10 @@ def _load_split(features_csv: str, test_start_date: str):
     return train_df, test_df
 
 
+def _load_split(features_csv: str, test_start_date: str):
+    return split_frame(pd.read_csv(features_csv, parse_dates=["week"]), test_start_date)
+
+
 def _prep_X(df: pd.DataFrame) -> pd.DataFrame:
     return df.drop(
         columns=["target_dir", "contract_code", "week", "report_date"],
@@ -23,13 +46,38 @@ def _prep_X(df: pd.DataFrame) -> pd.DataFrame:
     )
 
 
-def holdout_validation(features_csv: str, model_path: str, test_start_date: str) -> None:
-    train_df, test_df = _load_split(features_csv, test_start_date)
+def _load_fitted(model_path: str, train_df: pd.DataFrame, refit: bool, test_start_date: str):
+    """Refit the stored model on ``train_df`` or load it ready for scoring.
+
+    Without refitting the compact artifact is preferred, which loads in
+    milliseconds (see :func:`src.models.predict_model.load_model`).  A model
+    scored as trained is only point-in-time if its ``train_end_`` is before
+    ``test_start_date``; otherwise a look-ahead warning is logged.
+    """
+    if not refit:
+        model = load_model(model_path)
+        train_end = getattr(model, "train_end_", None)
+        if train_end is None:
+            logger.warning(f"{model_path} records no training cutoff; its test scores may include look-ahead")
+        elif pd.Timestamp(train_end) >= pd.Timestamp(test_start_date):
+            logger.warning(
+                f"{model_path} was trained through {train_end}, on or after the test start "
+                f"{test_start_date}; its test scores include look-ahead"
+            )
+        return model
     model = joblib.load(model_path)
+    model.fit(_prep_X(train_df), train_df["target_dir"])
+    return model
 
-    X_train = _prep_X(train_df)
-    y_train = train_df["target_dir"]
-    model.fit(X_train, y_train)
+
+def holdout_validation(
+    features_csv: str,
+    model_path: str,
+    test_start_date: str,
+    refit: bool = True,
+) -> None:
+    train_df, test_df = _load_split(features_csv, test_start_date)
+    model = _load_fitted(model_path, train_df, refit, test_start_date)
 
     X_test = _prep_X(test_df)
     y_test = test_df["target_dir"]
@@ -46,71 +94,69 @@ def holdout_validation(features_csv: str, model_path: str, test_start_date: str)
     print(table.to_string(index=False))
 
 
+def model_signals(test_df: pd.DataFrame, model, allow_shorts=False, n_strategies: int = 1):
+    """``(weeks, n_strategies)`` positions from ``model`` with the contrarian overlay."""
+    extreme = test_df["extreme_spec_long"] if "extreme_spec_long" in test_df.columns else None
+    return signal_matrix(model.predict(_prep_X(test_df)), extreme, allow_shorts, n_strategies=n_strategies)
+
+
+def simulate(
+    test_df: pd.DataFrame,
+    model,
+    commission_per_trade: float = 0.0005,
+    allow_shorts: bool = False,
+) -> pd.DataFrame:
+    """Score ``test_df`` with a fitted ``model`` and compute weekly returns.
+
+    Returns every test row with ``signal``, ``strategy_ret`` and
+    ``cum_return`` columns added (the last week has no exit price, so its
+    return is NaN).
+    """
+    signals = model_signals(test_df, model, allow_shorts)
+    result = backtest_matrix(test_df["etf_close"], signals, commission_per_trade)
+
+    df_bt = test_df.copy()
+    df_bt["signal"] = signals[:, 0]
+    df_bt["entry_price"] = df_bt["etf_close"]
+    df_bt["exit_price"] = df_bt["etf_close"].shift(-1)
+    df_bt["strategy_ret"] = result.returns[:, 0]
+    df_bt["cum_return"] = result.equity[:, 0]
+    return df_bt
+
+
 def run_backtest(
     features_csv: str,
     model_path: str,
     test_start_date: str,
     commission_per_trade: float = 0.0005,
     allow_shorts: bool = False,
+    refit: bool = True,
 ) -> pd.DataFrame:
     """Run a simple next-week backtest.
 
     If ``allow_shorts`` is True, classifier predictions of ``0`` will be
     interpreted as short signals (``-1``). Otherwise they are treated as no
-    position.
+    position.  With ``refit=False`` the stored model is scored as trained
+    instead of being refitted on the weeks before ``test_start_date``.
     """
     train_df, test_df = _load_split(features_csv, test_start_date)
-    model = joblib.load(model_path)
-
-    X_train = _prep_X(train_df)
-    y_train = train_df["target_dir"]
-    model.fit(X_train, y_train)
-
-    X_test = _prep_X(test_df)
-    signals = model.predict(X_test)
-    if allow_shorts:
-        # map classifier output 1 -> long, 0 -> short
-        positions = [1 if s == 1 else -1 for s in signals]
-    else:
-        positions = signals
-
-    df_bt = test_df.copy()
-    df_bt["signal"] = positions
-    # contrarian overlay: invert signal on extreme speculator-long weeks
-    if "extreme_spec_long" in df_bt.columns:
-        mask = df_bt["extreme_spec_long"] == 1
-        df_bt.loc[mask, "signal"] = -df_bt.loc[mask, "signal"]
-    df_bt["entry_price"] = df_bt["etf_close"]
-    df_bt["exit_price"] = df_bt["etf_close"].shift(-1)
-    df_bt["raw_ret"] = (df_bt["exit_price"] - df_bt["entry_price"]) / df_bt["entry_price"]
-    df_bt["strategy_ret"] = df_bt["raw_ret"] * df_bt["signal"] - 2 * commission_per_trade
+    model = _load_fitted(model_path, train_df, refit, test_start_date)
+    df_bt = simulate(test_df, model, commission_per_trade, allow_shorts)
 
     ret_series = df_bt["strategy_ret"].dropna()
-    cum_return = (1 + ret_series).cumprod()
-    df_bt.loc[ret_series.index, "cum_return"] = cum_return
-
-    if not cum_return.empty:
-        peak = cum_return.cummax()
-        drawdown = (peak - cum_return) / peak
-        max_drawdown = drawdown.max()
-        sharpe = ret_series.mean() / ret_series.std() * (52 ** 0.5) if ret_series.std() else 0.0
-        downside = ret_series[ret_series < 0]
-        sortino = (
-            ret_series.mean() / downside.std() * (52 ** 0.5)
-            if downside.std()
-            else 0.0
-        )
-    else:
-        max_drawdown = 0.0
-        sharpe = 0.0
-        sortino = 0.0
+    cum_return = df_bt.loc[ret_series.index, "cum_return"]
+    stats = {k: float(v[0]) for k, v in performance(ret_series.to_numpy()).items()}
+    # undefined ratios (no trades, no volatility) are reported as 0
+    max_drawdown, sharpe, sortino = (
+        0.0 if np.isnan(stats[k]) else stats[k] for k in ("max_drawdown", "sharpe", "sortino")
+    )
 
     print(
         f"Cumulative Return: {cum_return.iloc[-1] if not cum_return.empty else 1:.4f} "
         f"MaxDD: {max_drawdown:.4f} Sharpe: {sharpe:.4f} Sortino: {sortino:.4f}"
     )
 
-    return df_bt[["week", "entry_price", "exit_price", "signal", "strategy_ret", "cum_return"]].dropna()
+    return df_bt[BACKTEST_COLUMNS].dropna()
 
 
 def main(argv: Optional[list] = None) -> None:
@@ -121,6 +167,7 @@ def main(argv: Optional[list] = None) -> None:
     holdout_p.add_argument("features_csv")
     holdout_p.add_argument("model")
     holdout_p.add_argument("test_start")
+    holdout_p.add_argument("--no-refit", action="store_true", help=NO_REFIT_HELP)
 
     backtest_p = subparsers.add_parser("backtest")
     backtest_p.add_argument("features_csv")
@@ -128,11 +175,26 @@ def main(argv: Optional[list] = None) -> None:
     backtest_p.add_argument("test_start")
     backtest_p.add_argument("--commission", type=float, default=0.0005)
     backtest_p.add_argument("--allow-shorts", action="store_true", help="Enable short trades")
+    backtest_p.add_argument("--no-refit", action="store_true", help=NO_REFIT_HELP)
+    backtest_p.add_argument("--bootstrap", type=int, default=0, help="Block-bootstrap resamples (0 = off)")
+    backtest_p.add_argument("--block-method", choices=["stationary", "moving"], default="stationary")
+    backtest_p.add_argument("--block", type=float, default=8, help="(Mean) block length in weeks")
+    backtest_p.add_argument("--seed", type=int, default=0)
+    backtest_p.add_argument("--n-jobs", type=int, default=1)
+
+    sweep_p = subparsers.add_parser("sweep", help="Evaluate every probability cutoff")
+    sweep_p.add_argument("features_csv")
+    sweep_p.add_argument("model")
+    sweep_p.add_argument("test_start")
+    sweep_p.add_argument("--commission", type=float, default=0.0005)
+    sweep_p.add_argument("--allow-shorts", action="store_true", help="Short below the cutoff")
+    sweep_p.add_argument("--no-refit", action="store_true", help=NO_REFIT_HELP)
+    sweep_p.add_argument("--out", default="reports/cutoff_sweep.csv")
 
     args = parser.parse_args(argv)
 
     if args.command == "holdout":
-        holdout_validation(args.features_csv, args.model, args.test_start)
+        holdout_validation(args.features_csv, args.model, args.test_start, refit=not args.no_refit)
     elif args.command == "backtest":
         df = run_backtest(
             args.features_csv,
@@ -140,11 +202,47 @@ def main(argv: Optional[list] = None) -> None:
             args.test_start,
             commission_per_trade=args.commission,
             allow_shorts=args.allow_shorts,
+            refit=not args.no_refit,
         )
         Path("reports").mkdir(exist_ok=True)
         out_path = Path("reports/backtest_results.csv")
         df.to_csv(out_path, index=False)
         print(f"Results saved to {out_path}")
+        if args.bootstrap > 0:
+            from src.eval.bootstrap import backtest_significance
+
+            table = backtest_significance(
+                df,
+                args.commission,
+                n_boot=args.bootstrap,
+                method=args.block_method,
+                block=args.block,
+                seed=args.seed,
+                n_jobs=args.n_jobs,
+            )
+            print(table.to_string(float_format=lambda v: f"{v:.4f}"))
+    elif args.command == "sweep":
+        from src.eval.cutoff_sweep import run_sweep
+
+        Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+        curve = run_sweep(
+            args.features_csv,
+            args.model,
+            args.test_start,
+            commission_per_trade=args.commission,
+            allow_shorts=args.allow_shorts,
+            refit=not args.no_refit,
+            out_path=args.out,
+        )
+        for metric in ("sharpe", "f1"):
+            if curve[metric].isna().all():
+                continue
+            best = curve.loc[curve[metric].idxmax()]
+            print(
+                f"Best {metric}: cutoff={best['cutoff']:.4f} n_long={int(best['n_long'])} "
+                f"Sharpe={best['sharpe']:.4f} F1={best['f1']:.4f} CumRet={best['cum_return']:.4f}"
+            )
+        print(f"Cutoff curve ({len(curve)} cutoffs) saved to {args.out}")
     else:
         parser.print_help()
 
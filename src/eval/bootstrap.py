@@ -0,0 +1,171 @@
+"""Block-bootstrap confidence intervals and random-signal p-values for backtests.
+
+Weekly strategy returns are autocorrelated, so resampling single weeks
+understates the variance.  The resamplers below draw whole blocks of
+consecutive weeks and return the indices of every resample as one
+``(weeks, n_boot)`` array:
+
+* :func:`moving_block_indices` - fixed-length blocks at uniform random starts
+  (Kunsch),
+* :func:`stationary_indices` - blocks of geometric length with mean ``block``,
+  wrapping around the end of the sample (Politis & Romano).
+
+Each column is a resampled return series, so all statistics come from one
+:func:`src.eval.metrics.performance` call per chunk.
+
+The null hypothesis is a random signal.  Positions are permuted against the
+market returns.  That keeps how often the strategy is long, short or flat, but
+breaks any timing skill.  A p-value is the share of permuted strategies at
+least as good as the real one.
+
+Resamples are split into fixed-size chunks, each seeded from its own child of
+one :class:`numpy.random.SeedSequence`, and spread over a joblib process pool.
+Results depend only on ``seed`` and ``chunk_size``, never on ``n_jobs``.
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+
+from src.eval.metrics import PERIODS_PER_YEAR, performance
+
+STATISTICS = ("sharpe", "cum_return", "max_drawdown")
+# higher is better for every statistic except drawdown
+LOWER_IS_BETTER = {"max_drawdown"}
+METHODS = ("stationary", "moving")
+
+
+def moving_block_indices(n: int, block: float, n_boot: int, rng: np.random.Generator) -> np.ndarray:
+    """``(n, n_boot)`` indices built from blocks of ``block`` consecutive weeks.
+
+    ``block`` is rounded to whole weeks, so the CLI's float ``--block`` works
+    for both methods.
+    """
+    block = max(1, min(int(round(block)), n))
+    n_blocks = -(-n // block)
+    starts = rng.integers(0, n - block + 1, size=(n_blocks, 1, n_boot))
+    idx = starts + np.arange(block)[None, :, None]
+    return idx.reshape(n_blocks * block, n_boot)[:n]
+
+
+def stationary_indices(n: int, block: float, n_boot: int, rng: np.random.Generator) -> np.ndarray:
+    """``(n, n_boot)`` circular indices with geometric block lengths of mean ``block``."""
+    new_block = rng.random((n, n_boot)) < 1.0 / max(block, 1.0)
+    new_block[0] = True
+    starts = rng.integers(0, n, size=(n, n_boot))
+    rows = np.arange(n)[:, None]
+    # row at which the block covering each position began
+    began = np.maximum.accumulate(np.where(new_block, rows, 0), axis=0)
+    return (np.take_along_axis(starts, began, axis=0) + rows - began) % n
+
+
+def permutation_indices(n: int, n_boot: int, rng: np.random.Generator) -> np.ndarray:
+    """``(n, n_boot)`` independent permutations of ``range(n)``."""
+    return np.argsort(rng.random((n, n_boot)), axis=0)
+
+
+def _statistics(returns: np.ndarray, periods: int) -> Dict[str, np.ndarray]:
+    scores = performance(returns, periods=periods)
+    return {name: scores[name] for name in STATISTICS}
+
+
+def _bootstrap_chunk(
+    n_boot: int,
+    seed: np.random.SeedSequence,
+    returns: np.ndarray,
+    method: str,
+    block: float,
+    periods: int,
+) -> Dict[str, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    draw = stationary_indices if method == "stationary" else moving_block_indices
+    return _statistics(returns[draw(len(returns), block, n_boot, rng)], periods)
+
+
+def _null_chunk(
+    n_boot: int,
+    seed: np.random.SeedSequence,
+    market: np.ndarray,
+    positions: np.ndarray,
+    cost: float,
+    periods: int,
+) -> Dict[str, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    shuffled = positions[permutation_indices(len(positions), n_boot, rng)]
+    return _statistics(market[:, None] * shuffled - cost, periods)
+
+
+def _run_chunks(fn, n_boot: int, chunk_size: int, seed: np.random.SeedSequence, n_jobs: int, *args):
+    """Concatenated statistics of ``fn`` over chunks of at most ``chunk_size`` resamples."""
+    sizes = [min(chunk_size, n_boot - start) for start in range(0, n_boot, chunk_size)]
+    parts = Parallel(n_jobs=n_jobs)(
+        delayed(fn)(size, child, *args) for size, child in zip(sizes, seed.spawn(len(sizes)))
+    )
+    return {name: np.concatenate([p[name] for p in parts]) for name in STATISTICS}
+
+
+def bootstrap_test(
+    market_returns,
+    positions,
+    commission_per_trade: float = 0.0005,
+    n_boot: int = 10000,
+    method: str = "stationary",
+    block: float = 8,
+    alpha: float = 0.05,
+    seed: Optional[int] = 0,
+    n_jobs: int = 1,
+    chunk_size: int = 1000,
+    periods: int = PERIODS_PER_YEAR,
+) -> pd.DataFrame:
+    """Bootstrap intervals and random-signal p-values of a backtest.
+
+    ``market_returns`` are the weekly returns of the traded instrument and
+    ``positions`` the signal held over each week, as in ``run_backtest``
+    (strategy return ``= market * position - 2 * commission``).  Weeks with a
+    missing market return are dropped.
+
+    Returns one row per statistic (Sharpe, cumulative return, max drawdown)
+    with the observed value, the bootstrap mean and ``1 - alpha`` percentile
+    interval, the mean of the random-signal null and the one-sided p-value.
+    """
+    if method not in METHODS:
+        raise ValueError(f"method must be one of {METHODS}, got {method!r}")
+    market = np.asarray(market_returns, dtype=float)
+    positions = np.asarray(positions, dtype=float)
+    keep = ~np.isnan(market)
+    market, positions = market[keep], positions[keep]
+    if len(market) < 2:
+        raise ValueError("need at least two weeks of returns")
+    cost = 2 * commission_per_trade
+    returns = market * positions - cost
+
+    root = np.random.SeedSequence(seed)
+    boot_seed, null_seed = root.spawn(2)
+    observed = {k: v[0] for k, v in _statistics(returns[:, None], periods).items()}
+    boot = _run_chunks(_bootstrap_chunk, n_boot, chunk_size, boot_seed, n_jobs, returns, method, block, periods)
+    null = _run_chunks(_null_chunk, n_boot, chunk_size, null_seed, n_jobs, market, positions, cost, periods)
+
+    rows = []
+    for name in STATISTICS:
+        dist, null_dist = boot[name], null[name]
+        better = null_dist <= observed[name] if name in LOWER_IS_BETTER else null_dist >= observed[name]
+        valid = ~np.isnan(null_dist)
+        low, high = np.nanquantile(dist, [alpha / 2, 1 - alpha / 2])
+        rows.append({
+            "statistic": name,
+            "observed": observed[name],
+            "boot_mean": np.nanmean(dist),
+            "ci_low": low,
+            "ci_high": high,
+            "null_mean": np.nanmean(null_dist),
+            "p_value": (1 + (better & valid).sum()) / (1 + valid.sum()),
+        })
+    return pd.DataFrame(rows).set_index("statistic")
+
+
+def backtest_significance(bt: pd.DataFrame, commission_per_trade: float = 0.0005, **kwargs) -> pd.DataFrame:
+    """:func:`bootstrap_test` on the frame returned by ``run_backtest``."""
+    market = (bt["exit_price"] - bt["entry_price"]) / bt["entry_price"]
+    return bootstrap_test(market, bt["signal"], commission_per_trade, **kwargs)
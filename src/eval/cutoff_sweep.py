@@ -0,0 +1,138 @@
+"""Backtest every probability cutoff from one ``predict_proba`` pass.
+
+``run_backtest`` trades on ``model.predict``, which is a fixed 0.5 cutoff.
+:func:`sweep_cutoffs` scores the test weeks once, sorts them by probability
+and evaluates every distinct cutoff ``c`` (long when ``p >= c``) in
+``O(n log n)``.  Lowering the cutoff past one probability switches exactly
+those weeks to long, so every statistic is a cumulative sum over the sorted
+weeks:
+
+* true positives, giving precision, recall, F1 and accuracy,
+* the sum and the sum of squares of weekly strategy returns, giving the mean
+  and the annualized Sharpe ratio (sample std),
+* the sum of ``log(1 + r)``, giving the cumulative return.
+
+Returns follow ``run_backtest``: the contrarian overlay flips the position on
+extreme weeks, and each week with a price pays ``2 * commission``.  With
+shorts, weeks below the cutoff are short instead of flat.  A cumulative return
+is NaN once a week loses 100% or more.
+"""
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from src.eval.backtest import _load_fitted, _load_split, _prep_X
+from src.eval.metrics import PERIODS_PER_YEAR
+from src.models.predict_model import predict
+
+CURVE_COLUMNS = [
+    "cutoff", "n_long", "precision", "recall", "f1", "accuracy",
+    "mean_return", "sharpe", "cum_return",
+]
+
+
+def sweep_cutoffs(
+    proba,
+    labels,
+    prices,
+    extreme=None,
+    commission_per_trade: float = 0.0005,
+    allow_shorts: bool = False,
+    periods: int = PERIODS_PER_YEAR,
+) -> pd.DataFrame:
+    """One row per distinct cutoff, ascending, plus ``inf`` (never long).
+
+    ``labels`` are ``target_dir`` values (NaN rows are left out of the
+    classification metrics).  ``prices`` are the weekly ``etf_close`` values
+    the positions are entered at.
+    """
+    proba = np.asarray(proba, dtype=float)
+    labels = np.asarray(labels, dtype=float)
+    prices = np.asarray(prices, dtype=float)
+    raw = np.full(len(prices), np.nan)
+    raw[:-1] = (prices[1:] - prices[:-1]) / prices[:-1]
+    flip = np.where(np.asarray(extreme) == 1, -1.0, 1.0) if extreme is not None else 1.0
+    traded = ~np.isnan(raw)
+    move = np.where(traded, raw * flip, 0.0)
+    cost = 2 * commission_per_trade
+
+    # weekly return below and at/above the cutoff
+    flat = -move if allow_shorts else np.zeros_like(move)
+    r_below = np.where(traded, flat - cost, 0.0)
+    r_above = np.where(traded, move - cost, 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        log_below = np.where(r_below > -1, np.log1p(r_below), np.nan)
+        log_above = np.where(r_above > -1, np.log1p(r_above), np.nan)
+
+    order = np.argsort(-proba, kind="stable")
+    # the last week of each group of tied probabilities ends a cutoff
+    ends = np.flatnonzero(np.r_[proba[order][1:] != proba[order][:-1], True])
+
+    def switched(values: np.ndarray) -> np.ndarray:
+        """Totals after switching the top-k weeks to long, k = 0 and each group end."""
+        return np.r_[0.0, np.cumsum(values[order])[ends]]
+
+    n_long = np.r_[0, ends + 1]
+    labeled = ~np.isnan(labels)
+    positives = np.where(labeled, labels == 1, False)
+    tp = switched(positives.astype(float))
+    predicted = switched(labeled.astype(float))
+    n_labeled = labeled.sum()
+    n_pos = positives.sum()
+    tn = (n_labeled - n_pos) - (predicted - tp)
+
+    n = traded.sum()
+    # sums of returns shifted by the cost, so all-flat weeks are exactly zero
+    g_below, g_above = np.where(traded, flat, 0.0), move
+    s1 = g_below.sum() + switched(g_above - g_below)
+    s2 = (g_below ** 2).sum() + switched(g_above ** 2 - g_below ** 2)
+    logs = log_below.sum() + switched(log_above - log_below)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        precision = np.where(predicted > 0, tp / predicted, 0.0)
+        recall = tp / n_pos if n_pos else np.zeros_like(tp)
+        f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+        mean = s1 / n - cost
+        var = np.maximum(s2 - s1 * s1 / n, 0.0) / (n - 1)
+        sharpe = np.where(var > 0, mean / np.sqrt(var) * np.sqrt(periods), np.nan)
+        curve = pd.DataFrame({
+            "cutoff": np.r_[np.inf, proba[order][ends]],
+            "n_long": n_long,
+            "precision": precision,
+            "recall": recall,
+            "f1": f1,
+            "accuracy": (tp + tn) / n_labeled,
+            "mean_return": mean,
+            "sharpe": sharpe,
+            "cum_return": np.exp(logs),
+        })
+    return curve.iloc[::-1].reset_index(drop=True)[CURVE_COLUMNS]
+
+
+def run_sweep(
+    features_csv: str,
+    model_path: str,
+    test_start_date: str,
+    commission_per_trade: float = 0.0005,
+    allow_shorts: bool = False,
+    refit: bool = True,
+    out_path: Optional[str] = None,
+) -> pd.DataFrame:
+    """Fit (or load) the model as ``run_backtest`` does and sweep its cutoffs."""
+    train_df, test_df = _load_split(features_csv, test_start_date)
+    model = _load_fitted(model_path, train_df, refit, test_start_date)
+    proba = predict(model, _prep_X(test_df))
+    extreme = test_df["extreme_spec_long"] if "extreme_spec_long" in test_df.columns else None
+    curve = sweep_cutoffs(
+        proba,
+        test_df["target_dir"],
+        test_df["etf_close"],
+        extreme,
+        commission_per_trade,
+        allow_shorts,
+    )
+    if out_path:
+        curve.to_csv(out_path, index=False)
+    return curve
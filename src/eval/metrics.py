@@ -0,0 +1,164 @@
+"""Performance metrics for many return series in one vectorized call.
+
+Every function takes a ``(T, S)`` array of weekly returns, one column per
+series.  NaN marks a week in which a series did not trade, so ragged series of
+different lengths can share one array.  Missing weeks are skipped, as in
+``Series.dropna()``: equity carries over them and they count towards neither
+averages nor drawdown durations.
+
+:func:`performance` returns one ``(S,)`` array per metric.
+:func:`rolling_performance` computes the same metrics over trailing windows
+by stacking the windows as extra columns, so both share one definition.
+
+Definitions follow the existing backtests.  The Sharpe ratio uses the sample
+standard deviation.  The Sortino ratio divides by the sample standard
+deviation of the losing weeks.  Drawdowns are measured from the running peak
+of the equity curve.  A metric that is undefined for a series (for example no
+trades, or zero volatility) is NaN.
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+
+PERIODS_PER_YEAR = 52
+METRICS = (
+    "n_periods",
+    "cum_return",
+    "annual_return",
+    "sharpe",
+    "sortino",
+    "max_drawdown",
+    "drawdown_duration",
+    "calmar",
+    "hit_rate",
+    "turnover",
+)
+# below this many columns numpy's ``accumulate`` along axis 0 is faster
+ROW_LOOP_MIN_COLUMNS = 64
+# cells per block of stacked windows in :func:`rolling_performance`
+ROLLING_BLOCK_CELLS = 1 << 22
+
+
+def accumulate(ufunc, a: np.ndarray) -> np.ndarray:
+    """``ufunc.accumulate(a, axis=0)`` in place.
+
+    Accumulating down the rows of a C-ordered ``(T, S)`` array strides through
+    memory, so for wide matrices one vectorized step per row (over all columns
+    at once) is several times faster.  Both give identical values.
+    """
+    if a.shape[1] < ROW_LOOP_MIN_COLUMNS:
+        return ufunc.accumulate(a, axis=0, out=a)
+    for t in range(1, len(a)):
+        ufunc(a[t - 1], a[t], out=a[t])
+    return a
+
+
+def _as_2d(values) -> np.ndarray:
+    values = np.asarray(values, dtype=float)
+    return values[:, None] if values.ndim == 1 else values
+
+
+def _sample_std(values: np.ndarray, mask: np.ndarray, count: np.ndarray) -> np.ndarray:
+    """Column-wise ``std(ddof=1)`` of ``values`` over ``mask``.
+
+    Values are shifted by each column's first masked value, so a constant
+    series has a standard deviation of exactly zero.
+    """
+    first = values[mask.argmax(axis=0), np.arange(values.shape[1])] if len(values) else 0.0
+    with np.errstate(invalid="ignore", divide="ignore"):
+        dev = values - first
+        dev *= mask
+        dev -= dev.sum(axis=0) / count
+        dev *= mask
+        return np.sqrt(np.einsum("ij,ij->j", dev, dev) / (count - 1))
+
+
+def performance(returns, positions=None, periods: int = PERIODS_PER_YEAR) -> Dict[str, np.ndarray]:
+    """All :data:`METRICS` for every column of ``returns``.
+
+    ``positions`` (same shape) is only needed for ``turnover``, the mean
+    absolute change in position per week.  Without it, turnover is NaN.
+    """
+    returns = _as_2d(returns)
+    valid = ~np.isnan(returns)
+    n = valid.sum(axis=0)
+    r = np.where(valid, returns, 0.0)
+    out: Dict[str, np.ndarray] = {"n_periods": n.astype(float)}
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        equity = accumulate(np.multiply, 1 + r)
+        cum = np.where(n > 0, equity[-1] if len(equity) else 1.0, np.nan)
+        out["cum_return"] = cum
+        out["annual_return"] = cum ** (periods / n) - 1
+
+        mean = r.sum(axis=0) / n
+        std = _sample_std(r, valid, n)
+        out["sharpe"] = np.where(std > 0, mean / std * np.sqrt(periods), np.nan)
+        losing = r < 0
+        downside = _sample_std(np.minimum(r, 0.0), losing, losing.sum(axis=0))
+        out["sortino"] = np.where(downside > 0, mean / downside * np.sqrt(periods), np.nan)
+
+        # running peak over traded weeks only; equity carries over the gaps
+        peak = accumulate(np.maximum, np.where(valid, equity, -np.inf))
+        dd = np.where(valid, (peak - equity) / peak, 0.0)
+        out["max_drawdown"] = np.where(n > 0, dd.max(axis=0) if len(dd) else 0.0, np.nan)
+
+        # longest run of traded weeks below the peak; NaN weeks do not break it
+        under = valid & (dd > 0)
+        count = accumulate(np.add, under.astype(float))
+        last_peak = accumulate(np.maximum, np.where(valid & ~under, count, 0.0))
+        longest = (count - last_peak).max(axis=0) if len(count) else np.zeros(returns.shape[1])
+        out["drawdown_duration"] = np.where(n > 0, longest, np.nan)
+
+        out["calmar"] = np.where(
+            out["max_drawdown"] > 0, out["annual_return"] / out["max_drawdown"], np.nan
+        )
+        out["hit_rate"] = np.where(n > 0, (r > 0).sum(axis=0) / n, np.nan)
+
+    if positions is None:
+        out["turnover"] = np.full(returns.shape[1], np.nan)
+    else:
+        pos = _as_2d(positions)
+        change = np.abs(np.diff(pos, axis=0))
+        moved = ~np.isnan(change)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out["turnover"] = np.where(moved, change, 0.0).sum(axis=0) / moved.sum(axis=0)
+    return out
+
+
+def rolling_performance(
+    returns,
+    window: int,
+    positions=None,
+    periods: int = PERIODS_PER_YEAR,
+    min_periods: Optional[int] = None,
+) -> Dict[str, np.ndarray]:
+    """:func:`performance` over each trailing ``window`` of weeks.
+
+    Returns ``(T, S)`` arrays; row ``t`` covers weeks ``t - window + 1 .. t``
+    and is NaN where fewer than ``min_periods`` (default ``window``) of them
+    traded.  Windows are stacked side by side as columns, in blocks of about
+    :data:`ROLLING_BLOCK_CELLS` values, and scored in one call per block.
+    """
+    returns = _as_2d(returns)
+    pos = None if positions is None else _as_2d(positions)
+    T, S = returns.shape
+    min_periods = window if min_periods is None else min_periods
+    out = {name: np.full((T, S), np.nan) for name in METRICS}
+    if T < window:
+        return out
+
+    ends = np.arange(window - 1, T)
+    block = max(1, ROLLING_BLOCK_CELLS // (window * S))
+    steps = np.arange(window)
+    for start in range(0, len(ends), block):
+        chunk = ends[start:start + block]
+        rows = chunk[None, :] - steps[::-1, None]  # (window, len(chunk))
+        stacked = returns[rows].reshape(window, -1)
+        stacked_pos = None if pos is None else pos[rows].reshape(window, -1)
+        scores = performance(stacked, stacked_pos, periods)
+        enough = (scores["n_periods"] >= min_periods).reshape(len(chunk), S)
+        for name in METRICS:
+            out[name][chunk] = np.where(enough, scores[name].reshape(len(chunk), S), np.nan)
+    return out
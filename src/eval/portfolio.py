@@ -0,0 +1,241 @@
+"""Multi-market portfolio backtest on a common weekly calendar.
+
+:func:`src.eval.backtest.run_backtest` trades one market at a time.  Here the
+per-market frames (``week``, ``etf_close``, ``signal`` and ``vol_26w``) are
+pivoted once by :func:`align` into ``(weeks, markets)`` arrays on the union of
+their weeks.  Sizing, returns, costs and attribution are then whole-array
+operations, with no loop over markets.
+
+Sizing splits a gross budget of ``leverage`` across the markets that can trade
+in a week, meaning they have a signal, an entry and exit price and, for
+inverse-vol, a volatility:
+
+* ``equal`` - the same budget for every market,
+* ``inverse_vol`` - budgets proportional to ``1 / vol_26w``, so every market
+  contributes about the same risk.
+
+The position is the budget times the signal, so a flat market's budget is left
+in cash.  Weeks whose gross exposure ``sum(|position|)`` exceeds ``max_gross``
+are scaled down to it.  ``vol_26w`` at week ``t`` only uses closes up to
+``t``, so the sizing has no look-ahead.
+
+A position taken at week ``t`` earns that market's ``close[t+1] / close[t] - 1``,
+as in ``run_backtest``.  Turnover is ``|change in position|`` per market, with
+the portfolio starting in cash, and costs are ``commission * turnover``.  This
+differs from ``run_backtest``, which pays ``2 * commission`` every week
+whatever the position.  A week with no trades but positions to close (such as
+the last one) returns just that exit cost.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.eval.backtest import _load_fitted, model_signals, split_frame
+from src.eval.metrics import PERIODS_PER_YEAR, accumulate, performance
+
+SIZING = ("equal", "inverse_vol")
+FIELDS = ("etf_close", "signal", "vol_26w")
+VOL_WINDOW = 26
+
+
+def volatility(prices: pd.Series, window: int = VOL_WINDOW) -> pd.Series:
+    """Rolling std of weekly log returns, as ``vol_26w`` in ``build_features``."""
+    return np.log(prices).diff().rolling(window=window).std()
+
+
+def align(frames: Mapping[str, pd.DataFrame], fields=FIELDS):
+    """Pivot per-market frames into ``(weeks, markets)`` arrays.
+
+    Returns the union calendar, the market names and a dict with one ``(T, M)``
+    float array per field.  Markets missing a week, or a field, are NaN there.
+    """
+    markets = list(frames)
+    wide = pd.concat(
+        {m: df.set_index("week").reindex(columns=list(fields)) for m, df in frames.items()},
+        axis=1,
+    ).sort_index()
+    arrays = {
+        field: wide.xs(field, axis=1, level=1).reindex(columns=markets).to_numpy(float)
+        for field in fields
+    }
+    return pd.DatetimeIndex(wide.index), markets, arrays
+
+
+def turnover(weights: np.ndarray) -> np.ndarray:
+    """``(T, M)`` absolute weight changes, entering from cash in the first week."""
+    return np.abs(np.diff(weights, axis=0, prepend=0.0))
+
+
+def _row_normalize(budget: np.ndarray) -> np.ndarray:
+    total = budget.sum(axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(total > 0, budget / total, 0.0)
+
+
+def target_weights(
+    signals: np.ndarray,
+    returns: np.ndarray,
+    vol: Optional[np.ndarray] = None,
+    sizing: str = "equal",
+    leverage: float = 1.0,
+    max_gross: Optional[float] = 1.0,
+) -> np.ndarray:
+    """Signed ``(T, M)`` positions as fractions of portfolio equity.
+
+    ``returns`` are the next-week market returns; markets are only sized in
+    weeks where theirs is known.
+    """
+    if sizing not in SIZING:
+        raise ValueError(f"sizing must be one of {SIZING}, got {sizing!r}")
+    tradable = np.isfinite(signals) & np.isfinite(returns)
+    if sizing == "inverse_vol":
+        if vol is None:
+            raise ValueError("inverse_vol sizing needs vol_26w")
+        tradable &= np.isfinite(vol) & (vol > 0)
+        with np.errstate(divide="ignore"):
+            budget = np.where(tradable, 1.0 / np.where(tradable, vol, 1.0), 0.0)
+    else:
+        budget = tradable.astype(float)
+    weights = leverage * _row_normalize(budget) * np.where(tradable, signals, 0.0)
+    if max_gross is not None:
+        gross = np.abs(weights).sum(axis=1, keepdims=True)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            weights *= np.where(gross > max_gross, max_gross / gross, 1.0)
+    return weights
+
+
+@dataclass(frozen=True)
+class PortfolioResult:
+    """Aligned portfolio backtest output.
+
+    ``weights``, ``market_returns`` (NaN where a week has no exit price),
+    ``costs`` and ``contributions`` (``weight * return - cost``) are
+    ``(T, M)``.  ``returns`` (their row sum, NaN on weeks without positions
+    or costs) and ``equity`` are ``(T,)``.
+    """
+
+    weeks: pd.DatetimeIndex
+    markets: List[str]
+    weights: np.ndarray
+    market_returns: np.ndarray
+    costs: np.ndarray
+    contributions: np.ndarray
+    returns: np.ndarray
+    equity: np.ndarray
+
+    def frame(self) -> pd.DataFrame:
+        """Weekly portfolio returns, equity, exposure and costs."""
+        return pd.DataFrame({
+            "week": self.weeks,
+            "portfolio_ret": self.returns,
+            "cum_return": self.equity,
+            "gross_exposure": np.abs(self.weights).sum(axis=1),
+            "net_exposure": self.weights.sum(axis=1),
+            "cost": self.costs.sum(axis=1),
+        })
+
+    def summary(self, periods: int = PERIODS_PER_YEAR) -> Dict[str, float]:
+        """:data:`src.eval.metrics.METRICS` of the portfolio return series.
+
+        ``turnover`` is the mean weekly :func:`turnover` summed over markets,
+        so it equals the attribution's total turnover divided by the weeks.
+        """
+        scores = performance(self.returns, periods=periods)
+        scores["turnover"] = np.array([turnover(self.weights).sum(axis=1).mean()])
+        return {name: float(values[0]) for name, values in scores.items()}
+
+    def attribution(self) -> pd.DataFrame:
+        """Per-market exposure, turnover, costs and share of the portfolio P&L.
+
+        ``contribution`` adds up weekly arithmetic contributions, so the
+        markets sum to the portfolio's summed weekly return (not its
+        compounded return).
+        """
+        contribution = self.contributions.sum(axis=0)
+        total = contribution.sum()
+        return pd.DataFrame({
+            "market": self.markets,
+            "mean_weight": self.weights.mean(axis=0),
+            "mean_abs_weight": np.abs(self.weights).mean(axis=0),
+            "turnover": turnover(self.weights).sum(axis=0),
+            "cost": self.costs.sum(axis=0),
+            "contribution": contribution,
+            "share": contribution / total if total != 0 else np.full(len(self.markets), np.nan),
+        })
+
+
+def backtest_portfolio(
+    frames: Mapping[str, pd.DataFrame],
+    sizing: str = "equal",
+    leverage: float = 1.0,
+    max_gross: Optional[float] = 1.0,
+    commission: float = 0.0005,
+) -> PortfolioResult:
+    """Backtest the ``signal`` columns of ``frames`` as one portfolio.
+
+    ``frames`` maps market name to a frame with ``week``, ``etf_close`` and
+    ``signal`` columns (plus ``vol_26w`` for inverse-vol sizing; it is
+    computed from ``etf_close`` when missing).  ``commission`` is the cost per
+    unit of :func:`turnover`, a scalar or one value per market.
+    """
+    frames = {
+        m: df if "vol_26w" in df.columns else df.assign(vol_26w=volatility(df["etf_close"]))
+        for m, df in frames.items()
+    }
+    weeks, markets, arrays = align(frames)
+    prices = arrays["etf_close"]
+    raw = np.full(prices.shape, np.nan)
+    raw[:-1] = (prices[1:] - prices[:-1]) / prices[:-1]
+    weights = target_weights(arrays["signal"], raw, arrays["vol_26w"], sizing, leverage, max_gross)
+
+    costs = turnover(weights)
+    costs *= np.broadcast_to(np.asarray(commission, dtype=float), (len(markets),))
+    contributions = np.where(np.isnan(raw), 0.0, weights * raw) - costs
+
+    traded = ~np.isnan(raw).all(axis=1) | (costs.sum(axis=1) > 0)
+    returns = np.where(traded, contributions.sum(axis=1), np.nan)
+    equity = accumulate(np.multiply, np.where(traded, 1 + returns, 1.0)[:, None])[:, 0]
+    return PortfolioResult(
+        weeks, markets, weights, raw, costs, contributions, returns, np.where(traded, equity, np.nan)
+    )
+
+
+def market_signals(
+    features_csv: str,
+    model_path: str,
+    test_start_date: str,
+    allow_shorts: bool = False,
+    refit: bool = True,
+) -> pd.DataFrame:
+    """Test weeks of one market with its model's signal and ``vol_26w``."""
+    df = pd.read_csv(features_csv, parse_dates=["week"]).sort_values("week")
+    # computed over the full history so the first test weeks have a value;
+    # kept out of ``df`` so the model sees the same features as in training
+    vol = df["vol_26w"] if "vol_26w" in df.columns else volatility(df["etf_close"])
+    vol = pd.Series(vol.to_numpy(), index=df["week"])
+    train_df, test_df = split_frame(df, test_start_date)
+    model = _load_fitted(model_path, train_df, refit, test_start_date)
+    out = test_df[["week", "etf_close"]].copy()
+    # joined on week: rows in neither split (e.g. a missing week) must not shift it
+    out["vol_26w"] = vol.reindex(out["week"]).to_numpy()
+    out["signal"] = model_signals(test_df, model, allow_shorts)[:, 0]
+    return out
+
+
+def run_portfolio(
+    features: Mapping[str, str],
+    models: Mapping[str, str],
+    test_start_date: str,
+    allow_shorts: bool = False,
+    refit: bool = True,
+    **kwargs,
+) -> PortfolioResult:
+    """Fit each market's model, then backtest all signals as one portfolio."""
+    frames = {
+        market: market_signals(path, models[market], test_start_date, allow_shorts, refit)
+        for market, path in features.items()
+    }
+    return backtest_portfolio(frames, **kwargs)
@@ -0,0 +1,216 @@
+"""Rolling threshold evaluation on a process pool with checkpoint and resume.
+
+The grid is market x threshold x test_start x commission.  Work is split into
+one job per (market, threshold, test_start), and each job backtests every
+commission on the same fit and scores all of them in one vectorized call
+(see :class:`src.eval.walk_forward.WalkForward` and :mod:`src.eval.metrics`).
+Jobs run on a joblib process pool.  The parent appends each finished cell to
+an append-only JSON-lines store and flushes it straight away, so a crash
+loses at most the jobs still running.
+
+A cell's key includes a fingerprint of its inputs: the features and model
+file contents and ``min_periods``.  On restart, cells already in the store
+under the same fingerprint are skipped.  If the data or model changes, the
+fingerprint changes and the grid runs again.  The per-market
+``rolling_thresholds_<market>.csv`` reports are always assembled from the
+store.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import pandas as pd
+from joblib import Parallel, delayed
+
+from src.eval.metrics import performance
+from src.eval.walk_forward import WalkForward
+from src.features.expanding_quantile import extreme_flags
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+handler = logging.StreamHandler()
+handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+if not logger.handlers:
+    logger.addHandler(handler)
+
+REPORT_COLUMNS = ["threshold", "test_start", "commission", "cum_return", "sharpe", "max_drawdown"]
+
+# per-process engines, so a worker reuses its fits across the jobs it runs
+_ENGINES: Dict[str, WalkForward] = {}
+
+
+def _file_digest(path: str) -> str:
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def fingerprint(features_csv: str, model_path: str, min_periods: int) -> str:
+    """Identify the inputs a market's cells were computed from."""
+    parts = [_file_digest(features_csv), _file_digest(model_path), str(min_periods)]
+    return hashlib.sha1("|".join(parts).encode()).hexdigest()[:16]
+
+
+def cell_key(fp: str, market: str, threshold: float, test_start: str, commission: float) -> str:
+    return f"{fp}|{market}|{threshold!r}|{test_start}|{commission!r}"
+
+
+class ResultStore:
+    """Append-only JSON-lines file of finished grid cells."""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+
+    def load(self) -> Dict[str, dict]:
+        """Cells by key; a torn last line from a crash is ignored."""
+        cells: Dict[str, dict] = {}
+        if not self.path.exists():
+            return cells
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                cells[record["key"]] = record
+        return cells
+
+    def append(self, records: Iterable[dict]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        lines = "".join(json.dumps(record) + "\n" for record in records)
+        with open(self.path, "ab") as f:
+            if f.tell() and not self._ends_with_newline():
+                # terminate a torn line left by a crash so new records parse
+                lines = "\n" + lines
+            f.write(lines.encode())
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+
+def _engine(model_path: str) -> WalkForward:
+    engine = _ENGINES.get(model_path)
+    if engine is None:
+        engine = _ENGINES[model_path] = WalkForward.from_path(model_path)
+    return engine
+
+
+def _run_job(
+    fp: str,
+    market: str,
+    model_path: str,
+    df: pd.DataFrame,
+    threshold: float,
+    test_start: str,
+    commissions: Sequence[float],
+) -> List[dict]:
+    engine = _engine(model_path)
+    result = engine.backtest_commissions(df, test_start, commissions)
+    scores = performance(result.returns)
+    return [
+        {
+            "key": cell_key(fp, market, threshold, test_start, commission),
+            "market": market,
+            "threshold": threshold,
+            "test_start": test_start,
+            "commission": commission,
+            **{name: float(scores[name][i]) for name in ("cum_return", "sharpe", "max_drawdown")},
+        }
+        for i, commission in enumerate(commissions)
+    ]
+
+
+def run_grid(
+    features: Dict[str, str],
+    models: Dict[str, str],
+    thresholds: Sequence[float],
+    test_starts: Sequence[str],
+    commissions: Sequence[float],
+    store_path: str,
+    out_dir: str = "reports",
+    min_periods: int = 52,
+    n_jobs: int = -1,
+) -> Dict[str, Path]:
+    """Evaluate the missing cells of the grid and write one report per market."""
+    store = ResultStore(store_path)
+    done = store.load()
+    jobs = []
+    fps = {}
+    for market, features_csv in features.items():
+        fps[market] = fp = fingerprint(features_csv, models[market], min_periods)
+        base = pd.read_csv(features_csv, parse_dates=["week"])
+        base = base.sort_values("week").reset_index(drop=True)
+        flags = extreme_flags(base["mm_net_pct_oi"], thresholds, min_periods=min_periods)
+        for q in thresholds:
+            df = None
+            for ts in test_starts:
+                todo = [c for c in commissions if cell_key(fp, market, q, ts, c) not in done]
+                if not todo:
+                    continue
+                if df is None:
+                    df = base.copy()
+                    df["extreme_spec_long"] = flags[q]
+                jobs.append((fp, market, models[market], df, q, ts, todo))
+
+    total = len(features) * len(thresholds) * len(test_starts) * len(commissions)
+    pending = sum(len(job[-1]) for job in jobs)
+    logger.info(f"{total - pending}/{total} cells already in {store_path}; running {len(jobs)} jobs")
+    if jobs:
+        finished = 0
+        results = Parallel(n_jobs=n_jobs, return_as="generator_unordered")(
+            delayed(_run_job)(*job) for job in jobs
+        )
+        for records in results:
+            store.append(records)
+            done.update((r["key"], r) for r in records)
+            finished += 1
+            if finished % 50 == 0 or finished == len(jobs):
+                logger.info(f"{finished}/{len(jobs)} jobs checkpointed")
+
+    return write_reports(done, fps, thresholds, test_starts, commissions, out_dir)
+
+
+def write_reports(
+    cells: Dict[str, dict],
+    fingerprints: Dict[str, str],
+    thresholds: Sequence[float],
+    test_starts: Sequence[str],
+    commissions: Sequence[float],
+    out_dir: str = "reports",
+) -> Dict[str, Path]:
+    """Assemble ``rolling_thresholds_<market>.csv`` in grid order from stored cells."""
+    Path(out_dir).mkdir(parents=True, exist_ok=True)
+    paths = {}
+    for market, fp in fingerprints.items():
+        rows = [
+            cells[cell_key(fp, market, q, ts, c)]
+            for q in thresholds
+            for ts in test_starts
+            for c in commissions
+        ]
+        paths[market] = path = Path(out_dir) / f"rolling_thresholds_{market}.csv"
+        pd.DataFrame(rows, columns=REPORT_COLUMNS).to_csv(path, index=False)
+    return paths
+
+
+def parse_paths(items: Sequence[str], markets: Optional[Sequence[str]] = None) -> Dict[str, str]:
+    """``MARKET=PATH`` items, or a single plain path shared by ``markets``."""
+    if len(items) == 1 and "=" not in items[0]:
+        return {market: items[0] for market in markets or ["gc"]}
+    out = {}
+    for item in items:
+        market, sep, path = item.partition("=")
+        if not sep:
+            raise ValueError(f"expected MARKET=PATH, got {item!r}")
+        out[market] = path
+    return out
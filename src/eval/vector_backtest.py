@@ -0,0 +1,160 @@
+"""Backtest many strategies at once over a (weeks x strategies) signal matrix.
+
+:func:`src.eval.backtest.run_backtest` follows one signal vector.  Here every
+strategy is a column: :func:`signal_matrix` broadcasts model predictions
+against per-strategy options (long-only vs. long/short, contrarian overlay on
+or off).  :func:`backtest_matrix` then computes weekly returns, equity curves
+and drawdowns for all columns with whole-array NumPy operations, with no
+Python loop over strategies.
+
+The rules match ``run_backtest``.  A position taken at week ``t`` earns
+``close[t+1] / close[t] - 1``, and every week pays ``2 * commission``.  The
+last week has no exit price, and weeks with a missing price do not count.
+"""
+
+from dataclasses import dataclass
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.eval.metrics import accumulate, performance
+
+
+def _column(values, n: int) -> np.ndarray:
+    """Per-strategy option as an ``(n,)`` array."""
+    return np.broadcast_to(np.asarray(values), (n,))
+
+
+def signal_matrix(
+    predictions,
+    extreme=None,
+    allow_shorts=False,
+    overlay=True,
+    n_strategies: Optional[int] = None,
+) -> np.ndarray:
+    """Positions for every (week, strategy) pair.
+
+    Parameters
+    ----------
+    predictions:
+        Classifier output (``1`` = long), shape ``(T,)`` shared by every
+        strategy or ``(T, S)`` with one column per strategy.
+    extreme:
+        ``extreme_spec_long`` flags of shape ``(T,)``; ``None`` disables the
+        overlay everywhere.
+    allow_shorts, overlay:
+        Booleans or ``(S,)`` arrays.  With shorts, a ``0`` prediction is a
+        short (``-1``) instead of flat.  The overlay inverts the position on
+        weeks flagged as extreme.
+    """
+    pred = np.asarray(predictions)
+    if pred.ndim == 1:
+        pred = pred[:, None]
+    n = max(np.size(allow_shorts), np.size(overlay), pred.shape[1], n_strategies or 1)
+    signals = np.array(np.broadcast_to(pred, (len(pred), n)))
+    shorts = np.flatnonzero(_column(allow_shorts, n))
+    if len(shorts):
+        signals[:, shorts] = np.where(signals[:, shorts] == 1, 1, -1)
+    if extreme is not None:
+        rows = np.flatnonzero(np.asarray(extreme) == 1)
+        cols = np.flatnonzero(_column(overlay, n))
+        if len(rows) and len(cols):
+            signals[np.ix_(rows, cols)] *= -1
+    return signals
+
+
+@dataclass(frozen=True)
+class MatrixResult:
+    """Per-strategy backtest output.
+
+    ``returns``, ``equity`` and ``drawdown`` are ``(T, S)`` and NaN on weeks
+    without a trade; ``cum_return`` (1.0 if a strategy never traded) and
+    ``max_drawdown`` are ``(S,)``.  ``positions`` are the signals traded.
+    """
+
+    returns: np.ndarray
+    equity: np.ndarray
+    drawdown: np.ndarray
+    cum_return: np.ndarray
+    max_drawdown: np.ndarray
+    positions: np.ndarray
+
+    def summary(self, strategies: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """One row per strategy with every :data:`src.eval.metrics.METRICS` value."""
+        table = pd.DataFrame(performance(self.returns, self.positions))
+        table["cum_return"] = self.cum_return
+        table["max_drawdown"] = self.max_drawdown
+        if strategies is not None:
+            table = pd.concat([strategies.reset_index(drop=True), table], axis=1)
+        return table
+
+
+def backtest_matrix(prices, signals, commission=0.0005) -> MatrixResult:
+    """Returns, equity curves and drawdowns for every column of ``signals``.
+
+    ``commission`` is a scalar or one value per strategy.  Signals must be
+    finite; weeks are skipped only where the price return is missing.
+    """
+    prices = np.asarray(prices, dtype=float)
+    signals = np.asarray(signals)
+    if signals.ndim == 1:
+        signals = signals[:, None]
+    n = signals.shape[1]
+    raw = np.full(len(prices), np.nan)
+    raw[:-1] = (prices[1:] - prices[:-1]) / prices[:-1]
+    returns = raw[:, None] * signals
+    returns -= 2 * _column(commission, n)
+
+    traded = ~np.isnan(raw)
+    if not traded.any():
+        nan = np.full(returns.shape, np.nan)
+        return MatrixResult(returns, nan, nan.copy(), np.ones(n), np.zeros(n), signals)
+
+    # weeks without a trade grow by 1, as in ``Series.dropna().cumprod()``
+    equity = 1 + returns
+    equity[~traded] = 1.0
+    accumulate(np.multiply, equity)
+    # untraded weeks repeat the previous equity, so only leading ones matter
+    first = int(np.argmax(traded))
+    peak = accumulate(np.maximum, equity[first:].copy())
+    drawdown = np.full(returns.shape, np.nan)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        np.divide(peak - equity[first:], peak, out=drawdown[first:])
+    max_drawdown = drawdown[first:].max(axis=0)
+    cum_return = equity[-1].copy()
+    equity[~traded] = np.nan
+    drawdown[~traded] = np.nan
+    return MatrixResult(returns, equity, drawdown, cum_return, max_drawdown, signals)
+
+
+def strategy_grid(
+    allow_shorts: Sequence[bool] = (False, True),
+    overlay: Sequence[bool] = (True, False),
+    commissions: Sequence[float] = (0.0005,),
+) -> pd.DataFrame:
+    """One row per combination of the strategy options."""
+    index = pd.MultiIndex.from_product(
+        [list(allow_shorts), list(overlay), list(commissions)],
+        names=["allow_shorts", "overlay", "commission"],
+    )
+    return index.to_frame(index=False)
+
+
+def run_grid(
+    prices,
+    predictions,
+    extreme=None,
+    strategies: Optional[pd.DataFrame] = None,
+) -> Tuple[pd.DataFrame, MatrixResult]:
+    """Backtest every row of ``strategies`` (default :func:`strategy_grid`)."""
+    strategies = strategy_grid() if strategies is None else strategies
+    signals = signal_matrix(
+        predictions,
+        extreme,
+        strategies["allow_shorts"].to_numpy(bool),
+        strategies["overlay"].to_numpy(bool),
+        n_strategies=len(strategies),
+    )
+    result = backtest_matrix(prices, signals, strategies["commission"].to_numpy(float))
+    return result.summary(strategies), result
@@ -0,0 +1,120 @@
+"""Walk-forward backtests over in-memory frames with a fitted-model cache.
+
+:func:`src.eval.backtest.run_backtest` reads the features CSV, unpickles the
+model and refits it for every call.  A rolling evaluation makes hundreds of
+such calls on the same data, so :class:`WalkForward` loads the model template
+once and runs each split on a frame that is already in memory.
+
+Fitted models are cached by training window, feature set, model hash and a
+hash of the training rows.  Two splits whose training inputs are identical
+(the same cutoff under several commissions, thresholds whose flags agree over
+the whole window, repeated runs of a grid) share a single fit.  The cache key
+covers the data itself, so it is never stale: a change to any training value
+is a new key.  Fits copy the template with :func:`copy.deepcopy`, which is
+what unpickling it again would give, so results match ``run_backtest``
+exactly.
+"""
+
+import copy
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Hashable, Optional, Sequence, Tuple
+
+import joblib
+import pandas as pd
+
+from src.eval.backtest import BACKTEST_COLUMNS, _prep_X, model_signals, simulate, split_frame
+from src.eval.vector_backtest import MatrixResult, backtest_matrix
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+handler = logging.StreamHandler()
+handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+if not logger.handlers:
+    logger.addHandler(handler)
+
+DEFAULT_CACHE_SIZE = 64
+
+
+def frame_hash(X: pd.DataFrame, y: Optional[pd.Series] = None) -> str:
+    """Content hash of a design matrix (and labels), independent of the index."""
+    digest = hashlib.sha1()
+    digest.update(pd.util.hash_pandas_object(X, index=False).to_numpy().tobytes())
+    if y is not None:
+        digest.update(pd.util.hash_pandas_object(y, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+class WalkForward:
+    """Refit-and-score backtests sharing one model template and fit cache.
+
+    Parameters
+    ----------
+    template:
+        Unfitted (or fitted) estimator; every fit starts from a deep copy.
+    cache_size:
+        Fitted models kept, least recently used evicted first.
+    """
+
+    def __init__(self, template, cache_size: int = DEFAULT_CACHE_SIZE):
+        self.template = template
+        self.model_hash = joblib.hash(template)
+        self.cache_size = cache_size
+        self._fitted: "OrderedDict[Hashable, object]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_path(cls, model_path: str, **kwargs) -> "WalkForward":
+        return cls(joblib.load(model_path), **kwargs)
+
+    def _key(self, train_df: pd.DataFrame, X: pd.DataFrame, y: pd.Series) -> Tuple:
+        window = (train_df["week"].min(), train_df["week"].max(), len(train_df))
+        return window, tuple(X.columns), self.model_hash, frame_hash(X, y)
+
+    def fit(self, train_df: pd.DataFrame):
+        """Model fitted on ``train_df``, reused when the same inputs were fitted before."""
+        X, y = _prep_X(train_df), train_df["target_dir"]
+        key = self._key(train_df, X, y)
+        model = self._fitted.get(key)
+        if model is not None:
+            self.hits += 1
+            self._fitted.move_to_end(key)
+            return model
+        self.misses += 1
+        model = copy.deepcopy(self.template)
+        model.fit(X, y)
+        self._fitted[key] = model
+        if len(self._fitted) > self.cache_size:
+            self._fitted.popitem(last=False)
+        return model
+
+    def backtest(
+        self,
+        df: pd.DataFrame,
+        test_start_date: str,
+        commission_per_trade: float = 0.0005,
+        allow_shorts: bool = False,
+    ) -> pd.DataFrame:
+        """Same result as :func:`run_backtest` on ``df`` written to a CSV."""
+        train_df, test_df = split_frame(df, test_start_date)
+        model = self.fit(train_df)
+        df_bt = simulate(test_df, model, commission_per_trade, allow_shorts)
+        return df_bt[BACKTEST_COLUMNS].dropna()
+
+    def backtest_commissions(
+        self,
+        df: pd.DataFrame,
+        test_start_date: str,
+        commissions: Sequence[float],
+        allow_shorts: bool = False,
+    ) -> MatrixResult:
+        """One fit and one scoring pass for a column per commission."""
+        train_df, test_df = split_frame(df, test_start_date)
+        model = self.fit(train_df)
+        signals = model_signals(test_df, model, allow_shorts, n_strategies=len(commissions))
+        return backtest_matrix(test_df["etf_close"], signals, list(commissions))
+
+    def stats(self) -> dict:
+        return {"fits": self.misses, "cache_hits": self.hits, "cached": len(self._fitted)}
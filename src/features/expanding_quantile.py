@@ -0,0 +1,135 @@
+"""Point-in-time percentiles computed with an order-statistics structure.
+
+Whole-sample quantiles (``df[col].quantile(q)``) leak future observations into
+every earlier week.  The helpers here walk the series once in chronological
+order, keep the observations seen so far in a Fenwick tree indexed by value
+rank and read any number of quantiles per week in ``O(log n)``.  A full pass
+therefore costs ``O(n log n)`` instead of the ``O(n^2)`` of calling
+``quantile()`` on every expanding slice.
+"""
+
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+class OrderStatisticTree:
+    """Multiset of values drawn from a fixed universe with rank queries.
+
+    Parameters
+    ----------
+    universe:
+        Every value that may later be inserted.  Values are coordinate
+        compressed once so inserts, removals and ``k``-th smallest lookups are
+        all ``O(log n)``.
+    """
+
+    def __init__(self, universe: np.ndarray):
+        self._values = np.unique(np.asarray(universe, dtype=float))
+        self._tree = [0] * (len(self._values) + 1)
+        self._size = 0
+        self._top_bit = 1 << (len(self._values).bit_length() - 1) if len(self._values) else 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def rank_of(self, values: np.ndarray) -> np.ndarray:
+        """Return the 1-based rank of each value in the universe."""
+        return np.searchsorted(self._values, values) + 1
+
+    def update(self, rank: int, count: int = 1) -> None:
+        """Add ``count`` copies of the value with 1-based ``rank``."""
+        self._size += count
+        tree = self._tree
+        n = len(tree)
+        while rank < n:
+            tree[rank] += count
+            rank += rank & -rank
+
+    def kth(self, k: int) -> float:
+        """Return the ``k``-th smallest stored value (0-based)."""
+        if not 0 <= k < self._size:
+            raise IndexError("k out of range")
+        tree = self._tree
+        pos = 0
+        remaining = k + 1
+        step = self._top_bit
+        while step:
+            nxt = pos + step
+            if nxt < len(tree) and tree[nxt] < remaining:
+                pos = nxt
+                remaining -= tree[nxt]
+            step >>= 1
+        return float(self._values[pos])
+
+    def quantile(self, q: float) -> float:
+        """Linearly interpolated quantile matching ``pandas.Series.quantile``."""
+        if not self._size:
+            return np.nan
+        pos = q * (self._size - 1)
+        lo = int(np.floor(pos))
+        hi = min(lo + 1, self._size - 1)
+        lo_val = self.kth(lo)
+        if hi == lo or pos == lo:
+            return lo_val
+        return lo_val + (self.kth(hi) - lo_val) * (pos - lo)
+
+
+def expanding_quantiles(
+    values,
+    quantiles: Sequence[float],
+    min_periods: int = 1,
+    window: Optional[int] = None,
+) -> np.ndarray:
+    """Return the point-in-time quantiles of ``values`` for every row.
+
+    Row ``t`` only sees observations ``0..t`` (or the last ``window`` of them),
+    so the result is free of look-ahead.  NaNs are skipped; rows with fewer
+    than ``min_periods`` valid observations get NaN.
+
+    Returns an array of shape ``(len(values), len(quantiles))``.
+    """
+    arr = np.asarray(values, dtype=float)
+    qs = [float(q) for q in quantiles]
+    out = np.full((len(arr), len(qs)), np.nan)
+    valid = ~np.isnan(arr)
+    tree = OrderStatisticTree(arr[valid])
+    ranks = np.zeros(len(arr), dtype=int)
+    ranks[valid] = tree.rank_of(arr[valid])
+
+    for t in range(len(arr)):
+        if valid[t]:
+            tree.update(int(ranks[t]))
+        if window is not None and t >= window and valid[t - window]:
+            tree.update(int(ranks[t - window]), -1)
+        if len(tree) >= max(min_periods, 1):
+            out[t] = [tree.quantile(q) for q in qs]
+    return out
+
+
+def point_in_time_quantiles(
+    series: pd.Series,
+    quantiles: Sequence[float],
+    min_periods: int = 1,
+    window: Optional[int] = None,
+) -> pd.DataFrame:
+    """DataFrame version of :func:`expanding_quantiles` keyed by quantile."""
+    out = expanding_quantiles(series.to_numpy(), quantiles, min_periods, window)
+    return pd.DataFrame(out, index=series.index, columns=list(quantiles))
+
+
+def extreme_flags(
+    series: pd.Series,
+    quantiles: Sequence[float],
+    min_periods: int = 52,
+    window: Optional[int] = None,
+) -> pd.DataFrame:
+    """Flag rows at or above their own point-in-time quantile.
+
+    One column per quantile holding ``0``/``1``.  Rows without enough history
+    are never flagged.
+    """
+    thresholds = point_in_time_quantiles(series, quantiles, min_periods, window)
+    flags = thresholds.le(series, axis=0) & thresholds.notna()
+    return flags.astype(int)
@@ -0,0 +1,337 @@
+"""Compact, memory-mappable inference artifacts for trained pipelines.
+
+``joblib`` pickles of full sklearn pipelines are slow to load, large for
+forests and tied to the exact sklearn version.  :func:`export_compact` writes
+only what scoring needs:
+
+* the input feature order and any one-hot categories,
+* ``StandardScaler`` means and scales,
+* logistic coefficients (``LogisticRegression`` or a log-loss
+  ``SGDClassifier``), or the forest flattened into node arrays.
+
+File layout::
+
+    b"COTCMPK1" | uint64 header length | JSON header | 64-byte aligned arrays
+
+The header records each array's dtype, shape and offset plus a SHA-256 of the
+array payload.  :func:`load_compact` memory-maps the file and returns a
+:class:`CompactModel` that scores with NumPy only.  Forest batches above
+``FLAT_FOREST_MAX_ROWS`` rows use sklearn trees rebuilt from the same arrays
+when sklearn is installed, since its compiled traversal is faster there.
+
+Hashing the payload reads every page of it, so each process checks the
+digest once per file version (path, mtime, size and inode).  Registry reloads
+of an unchanged file stay lazy, while a replaced or rewritten artifact is
+checked again.  Check artifacts after copying them with::
+
+    python -m src.models.compact models/model_gc.compact
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.models.flat_forest import FLAT_FOREST_MAX_ROWS, FlatForest, sklearn_trees, trees_predict_proba
+
+MAGIC = b"COTCMPK1"
+ALIGN = 64
+SUFFIX = ".compact"
+
+# absolute path -> stat key of the last version whose checksum matched
+_VERIFIED: Dict[str, tuple] = {}
+
+
+def compact_path(model_path: str) -> str:
+    """Path of the compact artifact stored next to ``model_path``."""
+    return str(Path(model_path).with_suffix(SUFFIX))
+
+
+def _unpack_pipeline(pipe):
+    """Return (numeric_cols, cat_cols, scaler, encoder, clf) for a supported pipeline."""
+    from sklearn.compose import ColumnTransformer
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+    if not isinstance(pipe, Pipeline) or len(pipe.steps) != 2:
+        raise ValueError("only two-step (preprocess, classifier) pipelines can be exported")
+    pre, clf = pipe.steps[0][1], pipe.steps[1][1]
+
+    if isinstance(pre, StandardScaler):
+        return list(pre.feature_names_in_), [], pre, None, clf
+
+    if isinstance(pre, ColumnTransformer):
+        numeric_cols, cat_cols, scaler, encoder = [], [], None, None
+        for name, trans, cols in pre.transformers_:
+            if name == "remainder":
+                if trans != "drop":
+                    raise ValueError("ColumnTransformer remainder must be 'drop'")
+                continue
+            if isinstance(trans, StandardScaler):
+                numeric_cols, scaler = list(cols), trans
+            elif isinstance(trans, OneHotEncoder):
+                cat_cols, encoder = list(cols), trans
+            else:
+                raise ValueError(f"unsupported transformer {type(trans).__name__}")
+        if not numeric_cols:
+            raise ValueError("pipeline has no scaled numeric columns")
+        return numeric_cols, cat_cols, scaler, encoder, clf
+
+    raise ValueError(f"unsupported preprocessing step {type(pre).__name__}")
+
+
+def flatten_forest(forest) -> Dict[str, np.ndarray]:
+    """Concatenate every tree of a fitted forest into contiguous node arrays.
+
+    Child indices are global, leaves point to ``-1`` and ``value`` holds the
+    per-node class probabilities.  ``missing_go_to_left`` is the side sklearn
+    sends NaN to at each split (always left before sklearn 1.3).
+    """
+    features, thresholds, lefts, rights, values, missing, offsets = [], [], [], [], [], [], [0]
+    for est in forest.estimators_:
+        tree = est.tree_
+        base = offsets[-1]
+        left = tree.children_left.astype(np.int32)
+        right = tree.children_right.astype(np.int32)
+        features.append(tree.feature.astype(np.int32))
+        thresholds.append(tree.threshold.astype(np.float64))
+        lefts.append(np.where(left >= 0, left + base, -1).astype(np.int32))
+        rights.append(np.where(right >= 0, right + base, -1).astype(np.int32))
+        value = tree.value[:, 0, :].astype(np.float64)
+        values.append(value / value.sum(axis=1, keepdims=True))
+        go_left = getattr(tree, "missing_go_to_left", np.ones(tree.node_count))
+        missing.append(np.asarray(go_left, dtype=np.uint8))
+        offsets.append(base + tree.node_count)
+    return {
+        "feature": np.concatenate(features),
+        "threshold": np.concatenate(thresholds),
+        "left": np.concatenate(lefts),
+        "right": np.concatenate(rights),
+        "value": np.concatenate(values),
+        "missing_go_to_left": np.concatenate(missing),
+        "tree_offsets": np.asarray(offsets, dtype=np.int64),
+    }
+
+
+def _compact_parts(pipe):
+    """Return the (header, arrays) a compact artifact stores for ``pipe``."""
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.linear_model import LogisticRegression, SGDClassifier
+
+    numeric_cols, cat_cols, scaler, encoder, clf = _unpack_pipeline(pipe)
+    n_num = len(numeric_cols)
+    arrays = {
+        "mean": np.zeros(n_num) if scaler.mean_ is None else np.asarray(scaler.mean_, dtype=np.float64),
+        "scale": np.ones(n_num) if scaler.scale_ is None else np.asarray(scaler.scale_, dtype=np.float64),
+    }
+    # multiclass SGD normalizes one-vs-rest scores rather than a softmax
+    is_sgd_logistic = (
+        isinstance(clf, SGDClassifier) and clf.loss == "log_loss" and len(clf.classes_) == 2
+    )
+    if isinstance(clf, LogisticRegression) or is_sgd_logistic:
+        kind = "logistic"
+        arrays["coef"] = np.asarray(clf.coef_, dtype=np.float64)
+        arrays["intercept"] = np.asarray(clf.intercept_, dtype=np.float64)
+    elif isinstance(clf, RandomForestClassifier):
+        kind = "forest"
+        arrays.update(flatten_forest(clf))
+    else:
+        raise ValueError(f"unsupported classifier {type(clf).__name__}")
+
+    header = {
+        "kind": kind,
+        "numeric_cols": numeric_cols,
+        "cat_cols": cat_cols,
+        "categories": [list(map(str, c)) for c in encoder.categories_] if encoder else [],
+        "classes": np.asarray(clf.classes_).tolist(),
+        "train_end": getattr(pipe, "train_end_", None),
+        "arrays": {},
+    }
+    return header, arrays
+
+
+def to_compact(pipe) -> "CompactModel":
+    """Convert a supported fitted pipeline to an in-memory :class:`CompactModel`."""
+    header, arrays = _compact_parts(pipe)
+    return CompactModel(header, {k: np.ascontiguousarray(v) for k, v in arrays.items()})
+
+
+def export_compact(pipe, out_path: str) -> str:
+    """Write ``pipe`` as a compact artifact and return the path."""
+    header, arrays = _compact_parts(pipe)
+    payload = bytearray()
+    for name, arr in arrays.items():
+        arr = np.ascontiguousarray(arr)
+        payload.extend(b"\0" * (-len(payload) % ALIGN))
+        header["arrays"][name] = {
+            "dtype": arr.dtype.str,
+            "shape": list(arr.shape),
+            "offset": len(payload),
+        }
+        payload.extend(arr.tobytes())
+    header["sha256"] = hashlib.sha256(payload).hexdigest()
+
+    raw = json.dumps(header).encode()
+    raw += b" " * (-(len(MAGIC) + 8 + len(raw)) % ALIGN)
+    Path(out_path).parent.mkdir(parents=True, exist_ok=True)
+    tmp = f"{out_path}.tmp"
+    with open(tmp, "wb") as fh:
+        fh.write(MAGIC)
+        fh.write(np.uint64(len(raw)).tobytes())
+        fh.write(raw)
+        fh.write(payload)
+    os.replace(tmp, out_path)
+    return out_path
+
+
+def try_export_compact(pipe, model_path: str):
+    """Export next to ``model_path`` when the pipeline is supported."""
+    try:
+        return export_compact(pipe, compact_path(model_path))
+    except ValueError:
+        return None
+
+
+class CompactModel:
+    """NumPy-only scorer backed by a memory-mapped compact artifact."""
+
+    def __init__(self, header: dict, arrays: Dict[str, np.ndarray], path: str = ""):
+        self.kind = header["kind"]
+        self.numeric_cols = header["numeric_cols"]
+        self.cat_cols = header["cat_cols"]
+        self.categories = [np.asarray(c, dtype=object) for c in header["categories"]]
+        self.classes_ = np.asarray(header["classes"])
+        # last training week, as recorded by ``train_model.fit_model``
+        self.train_end_ = header.get("train_end")
+        self.feature_names = self.numeric_cols + self.cat_cols
+        self.arrays = arrays
+        self.path = path
+        # built up front so forking servers share it instead of each worker
+        # building a private copy on its first request
+        self._forest = FlatForest.from_arrays(arrays) if self.kind == "forest" else None
+        # sklearn trees for large batches, built on first use
+        self._trees = None
+
+    def transform_columns(self, columns: Mapping[str, Sequence]) -> np.ndarray:
+        """Like :meth:`transform` for a mapping of column name to values.
+
+        Numeric columns go straight into one float matrix in feature order,
+        without an intermediate DataFrame or object array.
+        """
+        n = len(columns[self.feature_names[0]])
+        num = np.empty((n, len(self.numeric_cols)))
+        for j, col in enumerate(self.numeric_cols):
+            num[:, j] = columns[col]
+        cats = [np.asarray(columns[c]).astype(str) for c in self.cat_cols]
+        return self._encode(num, cats)
+
+    def transform(self, X) -> np.ndarray:
+        """Scale numeric columns and one-hot encode categoricals."""
+        if isinstance(X, pd.DataFrame):
+            num = X[self.numeric_cols].to_numpy(dtype=np.float64)
+            cats = [X[c].astype(str).to_numpy() for c in self.cat_cols]
+        else:
+            X = np.asarray(X)
+            if X.ndim != 2 or X.shape[1] != len(self.feature_names):
+                raise ValueError(f"expected {len(self.feature_names)} columns in {self.feature_names}")
+            n_num = len(self.numeric_cols)
+            num = X[:, :n_num].astype(np.float64)
+            cats = [X[:, n_num + i].astype(str) for i in range(len(self.cat_cols))]
+        return self._encode(num, cats)
+
+    def _encode(self, num: np.ndarray, cats: list) -> np.ndarray:
+        parts = [(num - self.arrays["mean"]) / self.arrays["scale"]]
+        for values, categories in zip(cats, self.categories):
+            parts.append((values[:, None] == categories[None, :]).astype(np.float64))
+        return np.hstack(parts) if len(parts) > 1 else parts[0]
+
+    def predict_proba(self, X) -> np.ndarray:
+        return self.proba_transformed(self.transform(X))
+
+    def predict_proba_columns(self, columns: Mapping[str, Sequence]) -> np.ndarray:
+        return self.proba_transformed(self.transform_columns(columns))
+
+    def proba_transformed(self, Xt: np.ndarray) -> np.ndarray:
+        """Class probabilities for an already transformed matrix."""
+        if self.kind == "forest":
+            if len(Xt) > FLAT_FOREST_MAX_ROWS:
+                if self._trees is None:
+                    self._trees = sklearn_trees(self.arrays, Xt.shape[1]) or []
+                if self._trees:
+                    return trees_predict_proba(self._trees, Xt)
+            return self._forest.predict_proba(Xt)
+        scores = Xt @ self.arrays["coef"].T + self.arrays["intercept"]
+        if scores.shape[1] == 1:
+            p = 1.0 / (1.0 + np.exp(-scores[:, 0]))
+            return np.column_stack([1 - p, p])
+        scores = scores - scores.max(axis=1, keepdims=True)
+        exp = np.exp(scores)
+        return exp / exp.sum(axis=1, keepdims=True)
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+def _file_version(path: str) -> tuple:
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+def load_compact(path: str, verify: bool = True) -> CompactModel:
+    """Memory-map a compact artifact and return a :class:`CompactModel`.
+
+    Arrays are read lazily.  With ``verify`` the payload's SHA-256 is checked,
+    which reads the whole file, unless this version of the file already
+    passed in this process.
+    """
+    key = os.path.abspath(path)
+    version = _file_version(path)
+    mm = np.memmap(path, dtype=np.uint8, mode="r")
+    if bytes(mm[:len(MAGIC)]) != MAGIC:
+        raise ValueError(f"{path} is not a compact model artifact")
+    start = len(MAGIC) + 8
+    header_len = int(np.frombuffer(mm[len(MAGIC):start], dtype=np.uint64)[0])
+    header = json.loads(bytes(mm[start:start + header_len]))
+    payload = mm[start + header_len:]
+    if verify and _VERIFIED.get(key) != version:
+        if hashlib.sha256(payload).hexdigest() != header["sha256"]:
+            raise ValueError(f"checksum mismatch in {path}")
+        _VERIFIED[key] = version
+
+    arrays = {}
+    for name, spec in header["arrays"].items():
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"], dtype=np.int64))
+        arrays[name] = np.frombuffer(
+            payload, dtype=dtype, count=count, offset=spec["offset"]
+        ).reshape(spec["shape"])
+    return CompactModel(header, arrays, path)
+
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(description="Inspect compact model artifacts")
+    parser.add_argument("paths", nargs="+")
+    parser.add_argument("--no-verify", action="store_true", help="Skip the SHA-256 check")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for path in args.paths:
+        try:
+            model = load_compact(path, verify=not args.no_verify)
+        except ValueError as exc:
+            print(f"{path}: {exc}")
+            failed = True
+            continue
+        status = "not verified" if args.no_verify else "checksum ok"
+        print(f"{path}: {model.kind} model, {len(model.feature_names)} features, {status}")
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
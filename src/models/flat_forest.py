@@ -0,0 +1,175 @@
+"""Vectorized scorer for flattened random forests.
+
+All trees of a fitted ``RandomForestClassifier`` are stored as one set of
+contiguous node arrays (see :func:`src.models.compact.flatten_forest`).
+Scoring walks every tree for a whole batch at once: the current node of each
+(tree, sample) pair lives in one integer array that advances one level per
+step.  Leaves point to themselves, and pairs that reached a leaf are dropped
+every few levels so deep levels only touch live paths.  Leaf class
+probabilities are then averaged over trees.  Missing values follow each
+split's ``missing_go_to_left``, as in sklearn.
+
+The gain is the removal of sklearn's per-tree dispatch, which dominates small
+and medium batches.  On very large batches sklearn's compiled traversal is
+faster on a single core; ``scripts/bench_forest.py`` shows the crossover.
+Above :data:`FLAT_FOREST_MAX_ROWS` rows, :func:`sklearn_trees` rebuilds
+sklearn ``Tree`` objects from the same flat arrays so artifacts without the
+original pickle can still use the compiled path.
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+
+DEFAULT_CHUNK = 16384
+COMPACT_EVERY = 3
+# above this many rows sklearn's compiled per-tree traversal is faster
+FLAT_FOREST_MAX_ROWS = 512
+
+
+class FlatForest:
+    """Level-by-level batch traversal of a flattened tree ensemble."""
+
+    def __init__(
+        self,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        left: np.ndarray,
+        right: np.ndarray,
+        value: np.ndarray,
+        tree_offsets: np.ndarray,
+        missing_go_to_left: Optional[np.ndarray] = None,
+    ):
+        idx = np.arange(len(feature))
+        self.leaf = np.asarray(left) < 0
+        self.feature = np.where(self.leaf, 0, feature).astype(np.intp)
+        self.threshold = _float32_thresholds(np.asarray(threshold, dtype=np.float64), self.leaf)
+        self.left = np.where(self.leaf, idx, left).astype(np.intp)
+        self.right = np.where(self.leaf, idx, right).astype(np.intp)
+        self.value = np.asarray(value, dtype=np.float64)
+        self.roots = np.asarray(tree_offsets[:-1], dtype=np.intp)
+        # artifacts written before the array existed sent every NaN left
+        if missing_go_to_left is None:
+            missing_go_to_left = np.ones(len(feature), dtype=bool)
+        self.missing_right = ~np.asarray(missing_go_to_left, dtype=bool)
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray]) -> "FlatForest":
+        return cls(
+            arrays["feature"],
+            arrays["threshold"],
+            arrays["left"],
+            arrays["right"],
+            arrays["value"],
+            arrays["tree_offsets"],
+            arrays.get("missing_go_to_left"),
+        )
+
+    @classmethod
+    def from_sklearn(cls, forest) -> "FlatForest":
+        from src.models.compact import flatten_forest
+
+        return cls.from_arrays(flatten_forest(forest))
+
+    def leaf_nodes(self, X: np.ndarray) -> np.ndarray:
+        """Return the ``(n_trees, n_samples)`` leaf reached by every pair."""
+        Xf = np.ascontiguousarray(X, dtype=np.float32)
+        n, n_features = Xf.shape
+        flat_X = Xf.ravel()
+        has_nan = bool(np.isnan(flat_X).any())
+        node = np.repeat(self.roots, n)
+        row_offset = np.tile(np.arange(n, dtype=np.intp) * n_features, len(self.roots))
+        pos = np.arange(len(node))
+        leaves = np.empty_like(node)
+        level = 0
+        while len(node):
+            x = np.take(flat_X, row_offset + np.take(self.feature, node))
+            go_right = x > np.take(self.threshold, node)
+            if has_nan:
+                missing = np.isnan(x)
+                go_right[missing] = np.take(self.missing_right, node[missing])
+            node = np.where(go_right, np.take(self.right, node), np.take(self.left, node))
+            level += 1
+            if level % COMPACT_EVERY == 0:
+                # drop finished pairs so deep levels only touch live paths
+                done = np.take(self.leaf, node)
+                leaves[pos[done]] = node[done]
+                keep = ~done
+                node, row_offset, pos = node[keep], row_offset[keep], pos[keep]
+        return leaves.reshape(len(self.roots), n)
+
+    def predict_proba(self, X: np.ndarray, chunk_size: int = DEFAULT_CHUNK) -> np.ndarray:
+        """Average leaf class probabilities over all trees."""
+        X = np.asarray(X)
+        out = np.empty((len(X), self.value.shape[1]))
+        for start in range(0, len(X), chunk_size):
+            leaves = self.leaf_nodes(X[start:start + chunk_size])
+            out[start:start + leaves.shape[1]] = self.value[leaves].mean(axis=0)
+        return out
+
+
+def _float32_thresholds(threshold: np.ndarray, leaf: np.ndarray) -> np.ndarray:
+    """Largest float32 not above each float64 threshold.
+
+    sklearn compares float32 inputs with float64 thresholds; for any float32
+    ``x`` the test ``x <= t`` is identical to ``x <= t32`` with this rounding,
+    so the traversal can stay in float32.  Leaves get ``+inf`` so they never
+    move.
+    """
+    t32 = threshold.astype(np.float32)
+    above = t32.astype(np.float64) > threshold
+    t32[above] = np.nextafter(t32[above], np.float32(-np.inf))
+    t32[leaf] = np.inf
+    return t32
+
+
+def sklearn_trees(arrays: Dict[str, np.ndarray], n_features: int) -> Optional[List]:
+    """sklearn ``Tree`` objects for the flattened forest in ``arrays``.
+
+    The trees are restored through ``Tree.__setstate__``, taking the node
+    record layout from a throwaway tree so it matches the installed sklearn.
+    Missing values follow ``missing_go_to_left`` (left when the artifact
+    predates it), as in :meth:`FlatForest.leaf_nodes`.  Returns
+    ``None`` when sklearn is unavailable or its tree state format changed.
+    """
+    try:
+        from sklearn.tree import DecisionTreeClassifier
+        from sklearn.tree._tree import Tree
+
+        node_dtype = DecisionTreeClassifier().fit([[0.0], [1.0]], [0, 1]).tree_.__getstate__()["nodes"].dtype
+        value = np.asarray(arrays["value"], dtype=np.float64)
+        n_classes = np.array([value.shape[1]], dtype=np.intp)
+        offsets = np.asarray(arrays["tree_offsets"])
+        trees = []
+        for start, stop in zip(offsets[:-1], offsets[1:]):
+            left = np.asarray(arrays["left"][start:stop])
+            leaf = left < 0
+            nodes = np.zeros(stop - start, dtype=node_dtype)
+            nodes["left_child"] = np.where(leaf, -1, left - start)
+            nodes["right_child"] = np.where(leaf, -1, arrays["right"][start:stop] - start)
+            nodes["feature"] = np.where(leaf, -2, arrays["feature"][start:stop])
+            nodes["threshold"] = np.where(leaf, -2.0, arrays["threshold"][start:stop])
+            if "missing_go_to_left" in node_dtype.names:
+                missing = arrays.get("missing_go_to_left")
+                nodes["missing_go_to_left"] = 1 if missing is None else missing[start:stop]
+            tree = Tree(n_features, n_classes, 1)
+            tree.__setstate__({
+                "max_depth": 0,  # only used when growing trees
+                "node_count": stop - start,
+                "nodes": nodes,
+                "values": np.ascontiguousarray(value[start:stop, None, :]),
+            })
+            trees.append(tree)
+        return trees
+    except (ImportError, KeyError, TypeError, ValueError):
+        return None
+
+
+def trees_predict_proba(trees: List, X: np.ndarray) -> np.ndarray:
+    """Average class probabilities of :func:`sklearn_trees` output."""
+    Xf = np.ascontiguousarray(X, dtype=np.float32)
+    out = tree_proba = None
+    for tree in trees:
+        tree_proba = tree.predict(Xf).reshape(len(Xf), -1)
+        out = tree_proba.copy() if out is None else out + tree_proba
+    return out / len(trees)
@@ -0,0 +1,174 @@
+"""Permutation importance and drop-column ablation over time-series folds.
+
+Both measures use the same ``TimeSeriesSplit`` folds as ``train_classifier``.
+Permutation importance reuses each fold's fitted pipeline: all permuted copies
+of the test slice are stacked and scored with a single ``predict`` call.
+Drop-column ablation has to refit, so every (feature, fold) pair is its own
+job.  All jobs run on a process pool over the shared design matrix and the
+result is a ranked report, one row per feature.
+"""
+
+import argparse
+from pathlib import Path
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.metrics import accuracy_score, f1_score
+from sklearn.model_selection import TimeSeriesSplit
+
+from src.models.train_classifier import (
+    build_design,
+    build_pipeline,
+    default_classifiers,
+    load_design,
+    shared_design,
+)
+
+SCORERS = {
+    "accuracy": accuracy_score,
+    "f1": lambda y, p: f1_score(y, p, zero_division=0),
+}
+
+
+def _permutation_job(design_path, clf, numeric_cols, cat_cols, columns,
+                     train_idx, test_idx, n_repeats, scoring, seed):
+    """Fit one fold and score every (feature, repeat) permutation of its test slice."""
+    X, y = load_design(design_path)
+    scorer = SCORERS[scoring]
+    pipe = build_pipeline(clone(clf), numeric_cols, cat_cols)
+    pipe.fit(X.iloc[train_idx], y.iloc[train_idx])
+
+    X_test = X.iloc[test_idx].reset_index(drop=True)
+    y_test = y.iloc[test_idx].to_numpy()
+    baseline = scorer(y_test, pipe.predict(X_test))
+
+    rng = np.random.default_rng(seed)
+    n = len(X_test)
+    variants = []
+    for col in columns:
+        for _ in range(n_repeats):
+            shuffled = X_test.copy()
+            shuffled[col] = X_test[col].to_numpy()[rng.permutation(n)]
+            variants.append(shuffled)
+    preds = pipe.predict(pd.concat(variants, ignore_index=True)).reshape(len(variants), n)
+
+    records = []
+    for i, col in enumerate(columns):
+        for r in range(n_repeats):
+            score = scorer(y_test, preds[i * n_repeats + r])
+            records.append({"feature": col, "repeat": r, "importance": baseline - score})
+    return baseline, records
+
+
+def _drop_column_job(design_path, clf, numeric_cols, cat_cols, column,
+                     train_idx, test_idx, scoring):
+    """Refit one fold without ``column`` and return its score."""
+    X, y = load_design(design_path)
+    keep_num = [c for c in numeric_cols if c != column]
+    keep_cat = [c for c in cat_cols if c != column]
+    pipe = build_pipeline(clone(clf), keep_num, keep_cat)
+    cols = keep_num + keep_cat
+    pipe.fit(X.iloc[train_idx][cols], y.iloc[train_idx])
+    return SCORERS[scoring](y.iloc[test_idx], pipe.predict(X.iloc[test_idx][cols]))
+
+
+def feature_importance(
+    df: pd.DataFrame,
+    classifier: str = "RandomForest",
+    columns: Optional[Sequence[str]] = None,
+    n_splits: int = 5,
+    n_repeats: int = 5,
+    scoring: str = "accuracy",
+    drop_column: bool = True,
+    n_jobs: int = 1,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """Return a per-feature importance table ranked by permutation importance."""
+    X, y, numeric_cols, cat_cols = build_design(df)
+    columns = list(columns) if columns else list(numeric_cols)
+    missing = [c for c in columns if c not in X.columns]
+    if missing:
+        raise ValueError(f"unknown feature columns: {missing}")
+    clf = default_classifiers()[classifier]
+    splits = list(TimeSeriesSplit(n_splits=n_splits).split(X))
+
+    with shared_design(X, y, numeric_cols, cat_cols) as design_path:
+        perm = Parallel(n_jobs=n_jobs)(
+            delayed(_permutation_job)(
+                design_path, clf, numeric_cols, cat_cols, columns,
+                train_idx, test_idx, n_repeats, scoring, seed + fold,
+            )
+            for fold, (train_idx, test_idx) in enumerate(splits)
+        )
+        dropped = []
+        if drop_column:
+            jobs = [(col, fold) for col in columns for fold in range(len(splits))]
+            scores = Parallel(n_jobs=n_jobs)(
+                delayed(_drop_column_job)(
+                    design_path, clf, numeric_cols, cat_cols, col, *splits[fold], scoring,
+                )
+                for col, fold in jobs
+            )
+            dropped = [
+                {"feature": col, "importance": perm[fold][0] - score}
+                for (col, fold), score in zip(jobs, scores)
+            ]
+
+    perm_df = pd.DataFrame([r for _, records in perm for r in records])
+    report = perm_df.groupby("feature")["importance"].agg(
+        permutation_mean="mean", permutation_std="std"
+    )
+    if dropped:
+        drop_df = pd.DataFrame(dropped).groupby("feature")["importance"].agg(
+            drop_column_mean="mean", drop_column_std="std"
+        )
+        report = report.join(drop_df)
+    report = report.reindex(columns).sort_values("permutation_mean", ascending=False)
+    report.insert(0, "rank", np.arange(1, len(report) + 1))
+    report["baseline_" + scoring] = float(np.mean([b for b, _ in perm]))
+    return report.reset_index()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Permutation importance and drop-column ablation")
+    parser.add_argument('--features', default='data/processed/class_features.csv',
+                        help='Path to classification features CSV')
+    parser.add_argument('--out', default='reports/feature_importance.csv',
+                        help='Where to write the ranked report')
+    parser.add_argument('--classifier', default='RandomForest',
+                        choices=sorted(default_classifiers()))
+    parser.add_argument('--columns', default=None,
+                        help='Comma-separated features to evaluate (default: all numeric)')
+    parser.add_argument('--splits', type=int, default=5, help='TimeSeriesSplit folds')
+    parser.add_argument('--repeats', type=int, default=5, help='Permutations per feature and fold')
+    parser.add_argument('--scoring', default='accuracy', choices=sorted(SCORERS))
+    parser.add_argument('--no-drop-column', action='store_true',
+                        help='Skip the drop-column refits')
+    parser.add_argument('--n-jobs', type=int, default=1,
+                        help='Worker processes (-1 = all cores)')
+    parser.add_argument('--seed', type=int, default=0, help='Permutation seed')
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.features)
+    report = feature_importance(
+        df,
+        classifier=args.classifier,
+        columns=args.columns.split(',') if args.columns else None,
+        n_splits=args.splits,
+        n_repeats=args.repeats,
+        scoring=args.scoring,
+        drop_column=not args.no_drop_column,
+        n_jobs=args.n_jobs,
+        seed=args.seed,
+    )
+    Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+    report.to_csv(args.out, index=False)
+    print(report.to_string(index=False, float_format=lambda v: f"{v:.4f}"))
+    print(f"Report saved to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+"""Incremental weekly updates of a log-loss SGD model.
+
+Every weekly COT release adds one newly labeled row per market.  Instead of
+refitting on the full history, :class:`OnlineModel` keeps a
+``StandardScaler`` and an ``SGDClassifier(loss="log_loss")`` and feeds only
+the weeks it has not seen yet to ``partial_fit``.  The state is checkpointed
+with joblib after every update (atomically, so a crash never leaves a
+half-written file).
+
+The scaler is fitted at the last full refit and then kept fixed, so the
+coefficients learned online stay in one feature space.  Every
+``refit_every`` updates the model is refitted on the full history, which
+refreshes the scaler and bounds how far the online path can wander.
+
+New weeks are scored before the model trains on them (prequential
+evaluation), and those probabilities are kept in the state.  After each run
+they are compared with the batch ``train_model`` pipeline on the most recent
+weeks after the batch model's training cutoff (``train_end_``), so both sides
+are scored out of sample, and the result is appended to a drift log.
+
+Features and labels follow :func:`src.models.train_model.fit_model`:
+``FEATURE_COLS`` and ``return_1w > 0``.
+"""
+
+import argparse
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Optional
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import SGDClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from src.models.compact import try_export_compact
+from src.models.predict_model import load_model, predict
+from src.models.train_model import FEATURE_COLS
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+handler = logging.StreamHandler()
+handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+if not logger.handlers:
+    logger.addHandler(handler)
+
+CLASSES = np.array([0, 1])
+FULL_FIT_EPOCHS = 20
+
+
+def _xy(df: pd.DataFrame):
+    df = df.dropna(subset=FEATURE_COLS + ["return_1w"])
+    return df[FEATURE_COLS], (df["return_1w"] > 0).astype(int).to_numpy(), df
+
+
+class OnlineModel:
+    """Scaler + SGD classifier with the last trained week and update counters.
+
+    :attr:`prequential` maps each week scored before training on it to the
+    positive-class probability the model gave it then.
+    """
+
+    def __init__(self, refit_every: int = 52, alpha: float = 1e-4, random_state: int = 42):
+        self.refit_every = refit_every
+        self.alpha = alpha
+        self.random_state = random_state
+        self.scaler: Optional[StandardScaler] = None
+        self.clf: Optional[SGDClassifier] = None
+        self.last_week: Optional[pd.Timestamp] = None
+        self.n_seen = 0
+        self.updates_since_refit = 0
+        self.prequential: Dict[pd.Timestamp, float] = {}
+
+    def _score_unseen(self, X: pd.DataFrame, rows: pd.DataFrame) -> None:
+        if len(rows):
+            p = self.clf.predict_proba(self.scaler.transform(X))[:, 1]
+            self.prequential.update(zip(pd.to_datetime(rows["week"]), p.tolist()))
+
+    def fit_full(self, df: pd.DataFrame) -> int:
+        """Refit scaler and classifier on every labeled week of ``df``."""
+        if self.clf is not None:
+            # weeks since the last run are scored by the old model first
+            X, _, rows = _xy(df[pd.to_datetime(df["week"]) > self.last_week])
+            self._score_unseen(X, rows)
+        X, y, rows = _xy(df)
+        self.scaler = StandardScaler().fit(X)
+        self.clf = SGDClassifier(loss="log_loss", alpha=self.alpha, random_state=self.random_state)
+        Xs = self.scaler.transform(X)
+        # a few chronological passes; later weeks are seen last, as online
+        for _ in range(FULL_FIT_EPOCHS):
+            self.clf.partial_fit(Xs, y, classes=CLASSES)
+        self.last_week = pd.Timestamp(rows["week"].max())
+        self.n_seen = len(rows)
+        self.updates_since_refit = 0
+        return len(rows)
+
+    def update(self, df: pd.DataFrame) -> int:
+        """``partial_fit`` on weeks after :attr:`last_week`; return how many."""
+        weeks = pd.to_datetime(df["week"])
+        X, y, rows = _xy(df[weeks > self.last_week])
+        if not len(rows):
+            return 0
+        self._score_unseen(X, rows)
+        self.clf.partial_fit(self.scaler.transform(X), y, classes=CLASSES)
+        self.last_week = pd.Timestamp(rows["week"].max())
+        self.n_seen += len(rows)
+        self.updates_since_refit += 1
+        return len(rows)
+
+    def due_for_refit(self) -> bool:
+        return self.clf is None or self.updates_since_refit >= self.refit_every
+
+    def pipeline(self) -> Pipeline:
+        """A fitted sklearn pipeline equivalent to the online state."""
+        return Pipeline([("scaler", self.scaler), ("clf", self.clf)])
+
+    def save(self, path: str) -> None:
+        # a plain dict, so the checkpoint loads the same under ``python -m``
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        tmp = f"{path}.tmp"
+        joblib.dump(dict(vars(self)), tmp)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "OnlineModel":
+        model = cls()
+        model.__dict__.update(joblib.load(path))
+        return model
+
+
+def drift_report(prequential, batch, df: pd.DataFrame, since, window: int = 52) -> dict:
+    """Compare online and batch probabilities on labeled weeks after ``since``.
+
+    ``prequential`` holds the online model's probabilities from before it
+    trained on each week (:attr:`OnlineModel.prequential`) and ``since`` is the
+    batch model's last training week, so the latest ``window`` weeks compared
+    are out of sample for both.
+    """
+    X, y, rows = _xy(df)
+    weeks = pd.to_datetime(rows["week"])
+    p_online = weeks.map(prequential)
+    keep = (weeks > pd.Timestamp(since)).to_numpy() & p_online.notna().to_numpy()
+    X, y, rows = X[keep].tail(window), y[keep][-window:], rows[keep].tail(window)
+    if not len(y):
+        return {"week": None, "window": 0}
+    p_online = p_online[keep].tail(window).to_numpy(dtype=float)
+    p_batch = np.asarray(predict(batch, X))
+    return {
+        "week": str(pd.Timestamp(rows["week"].max()).date()),
+        "window": len(y),
+        "online_accuracy": float(((p_online >= 0.5) == y).mean()),
+        "batch_accuracy": float(((p_batch >= 0.5) == y).mean()),
+        "mean_abs_prob_diff": float(np.abs(p_online - p_batch).mean()),
+        "signal_agreement": float(((p_online >= 0.5) == (p_batch >= 0.5)).mean()),
+    }
+
+
+def run_update(
+    features_csv: str,
+    state_path: str,
+    market: str,
+    refit_every: int = 52,
+    batch_model: Optional[str] = None,
+    export_dir: Optional[str] = None,
+    drift_out: Optional[str] = None,
+    force_refit: bool = False,
+) -> OnlineModel:
+    """Update (or refit) the online model of ``market`` after an ETL run."""
+    df = pd.read_csv(features_csv, parse_dates=["week"]).sort_values("week")
+    if Path(state_path).exists():
+        model = OnlineModel.load(state_path)
+        model.refit_every = refit_every
+    else:
+        model = OnlineModel(refit_every=refit_every)
+
+    if force_refit or model.due_for_refit():
+        n = model.fit_full(df)
+        logger.info(f"{market}: full refit on {n} weeks up to {model.last_week.date()}")
+    else:
+        n = model.update(df)
+        logger.info(
+            f"{market}: online update with {n} new weeks up to {model.last_week.date()} "
+            f"({model.updates_since_refit}/{model.refit_every} before next refit)"
+        )
+    model.save(state_path)
+
+    if export_dir:
+        # served by the registry as market "<market>_online"
+        out = str(Path(export_dir) / f"model_{market}_online.joblib")
+        pipe = model.pipeline()
+        joblib.dump(pipe, f"{out}.tmp")
+        os.replace(f"{out}.tmp", out)
+        try_export_compact(pipe, out)
+        logger.info(f"Exported online model to {out}")
+
+    report = None
+    if batch_model and not Path(batch_model).exists():
+        # batch models are not built by every pipeline (e.g. a fresh CI checkout)
+        logger.warning(f"{market}: batch model {batch_model} not found; drift report skipped")
+    elif batch_model:
+        batch = load_model(batch_model)
+        since = getattr(batch, "train_end_", None)
+        if since is None:
+            logger.warning(f"{market}: {batch_model} records no training cutoff; retrain it to compare")
+        else:
+            report = {"market": market, **drift_report(model.prequential, batch, df, since)}
+            if not report["window"]:
+                logger.info(f"{market}: no weeks scored online after the batch cutoff {since} yet")
+                report = None
+    if report:
+        logger.info(
+            f"{market}: online acc={report['online_accuracy']:.3f} "
+            f"batch acc={report['batch_accuracy']:.3f} "
+            f"agreement={report['signal_agreement']:.3f}"
+        )
+        if drift_out:
+            Path(drift_out).parent.mkdir(parents=True, exist_ok=True)
+            header = not Path(drift_out).exists()
+            pd.DataFrame([report]).to_csv(drift_out, mode="a", header=header, index=False)
+    return model
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incrementally update the online model")
+    parser.add_argument("--features", required=True, help="features CSV from build_features")
+    parser.add_argument("--market", required=True)
+    parser.add_argument("--state", default=None,
+                        help="checkpoint path (default models/online/<market>.state)")
+    parser.add_argument("--refit-every", type=int, default=52,
+                        help="weekly updates between full refits")
+    parser.add_argument("--full-refit", action="store_true", help="refit on the full history now")
+    parser.add_argument("--batch-model", default=None,
+                        help="batch model to compare against; skipped when the file is missing")
+    parser.add_argument("--export-dir", default=None,
+                        help="also write model_<market>_online.joblib here for the API")
+    parser.add_argument("--drift-out", default="reports/online_drift.csv")
+    args = parser.parse_args()
+    run_update(
+        args.features,
+        args.state or f"models/online/{args.market}.state",
+        args.market,
+        refit_every=args.refit_every,
+        batch_model=args.batch_model,
+        export_dir=args.export_dir,
+        drift_out=args.drift_out,
+        force_refit=args.full_refit,
+    )
+
+
+if __name__ == "__main__":
+    main()
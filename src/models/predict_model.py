@@ -1,8 +1,61 @@
+import os
+import weakref
+
 import joblib
 import pandas as pd
 
-def load_model(model_path: str):
+from src.models.compact import SUFFIX, compact_path, load_compact
+from src.models.flat_forest import FLAT_FOREST_MAX_ROWS, FlatForest
+
+# fitted forest -> (estimators_ list it was built from, FlatForest)
+_FLAT_FORESTS = weakref.WeakKeyDictionary()
+
+
+def load_model(model_path: str, prefer_compact: bool = True):
+    """Load a model for scoring.
+
+    A compact artifact (see :mod:`src.models.compact`) next to the joblib
+    file is used instead of unpickling the pipeline when it is at least as
+    new as the pickle.  The compact model scores with NumPy only.
+    """
+    if model_path.endswith(SUFFIX):
+        return load_compact(model_path)
+    compact = compact_path(model_path)
+    if prefer_compact and os.path.exists(compact):
+        if not os.path.exists(model_path) or os.path.getmtime(compact) >= os.path.getmtime(model_path):
+            return load_compact(compact)
     return joblib.load(model_path)
 
+
+def _flat_forest(clf):
+    """Return a cached :class:`FlatForest` for a fitted sklearn forest."""
+    from sklearn.ensemble import RandomForestClassifier
+
+    if not isinstance(clf, RandomForestClassifier) or not hasattr(clf, "estimators_"):
+        return None
+    cached = _FLAT_FORESTS.get(clf)
+    if cached is None or cached[0] is not clf.estimators_:
+        cached = (clf.estimators_, FlatForest.from_sklearn(clf))
+        _FLAT_FORESTS[clf] = cached
+    return cached[1]
+
+
 def predict(model, features: pd.DataFrame):
-    return model.predict_proba(features)[:,1]
+    """Probability of the positive class.
+
+    Random forests, bare or at the end of a pipeline, are scored with the
+    vectorized :class:`FlatForest` instead of sklearn's per-tree loop for
+    batches up to :data:`FLAT_FOREST_MAX_ROWS` rows.
+    """
+    steps = getattr(model, "steps", None)
+    clf = steps[-1][1] if steps else model
+    flat = _flat_forest(clf) if len(features) <= FLAT_FOREST_MAX_ROWS else None
+    if flat is None:
+        return model.predict_proba(features)[:,1]
+    X = model[:-1].transform(features) if steps and len(steps) > 1 else features
+    if hasattr(X, "toarray"):
+        # sparse output, e.g. a ColumnTransformer with a sparse one-hot encoder
+        X = X.toarray()
+    elif hasattr(X, "to_numpy"):
+        X = X.to_numpy()
+    return flat.predict_proba(X)[:, 1]
@@ -0,0 +1,225 @@
+"""Time-series-aware successive-halving hyperparameter search.
+
+Candidates are sampled from :data:`SEARCH_SPACE` and scored in rungs.  Early
+rungs only use the most recent ``TimeSeriesSplit`` folds with a short, capped
+training window, so hundreds of configurations are cheap to screen.  After
+each rung the best ``1/eta`` survive and move on to more folds and longer
+windows; the last rung uses every fold with the full expanding history.
+
+Every (candidate, fold) fit of a rung is a separate job on a process pool and
+the design matrix is shared through :func:`train_classifier.shared_design`.
+"""
+
+import argparse
+import json
+import math
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import TimeSeriesSplit
+
+from src.models.compact import try_export_compact
+from src.models.train_classifier import (
+    build_design,
+    build_pipeline,
+    score_fold,
+    shared_design,
+)
+
+
+def _sample_logistic(rng: np.random.Generator) -> dict:
+    return {
+        "C": float(10 ** rng.uniform(-3, 2)),
+        "class_weight": [None, "balanced"][rng.integers(2)],
+        "max_iter": 1000,
+    }
+
+
+def _sample_forest(rng: np.random.Generator) -> dict:
+    return {
+        "n_estimators": int(rng.choice([50, 100, 200, 400])),
+        "max_depth": [None, 3, 5, 8, 12][rng.integers(5)],
+        "min_samples_leaf": int(rng.choice([1, 2, 5, 10, 20])),
+        "max_features": ["sqrt", 0.5, 1.0][rng.integers(3)],
+        "class_weight": [None, "balanced"][rng.integers(2)],
+        "random_state": 42,
+    }
+
+
+SEARCH_SPACE = {
+    "LogisticRegression": (LogisticRegression, _sample_logistic),
+    "RandomForest": (RandomForestClassifier, _sample_forest),
+}
+
+
+def sample_candidates(n_candidates: int, seed: int = 0) -> List[Tuple[str, dict]]:
+    """Draw ``n_candidates`` (model name, params) pairs, alternating models."""
+    rng = np.random.default_rng(seed)
+    names = list(SEARCH_SPACE)
+    return [
+        (names[i % len(names)], SEARCH_SPACE[names[i % len(names)]][1](rng))
+        for i in range(n_candidates)
+    ]
+
+
+def rung_schedule(
+    n_candidates: int,
+    n_splits: int,
+    n_rows: int,
+    eta: int = 3,
+    min_train_size: int = 52,
+) -> List[Tuple[int, Optional[int]]]:
+    """Return ``(n_recent_folds, max_train_size)`` for every rung.
+
+    The final rung always evaluates all folds on the full expanding window.
+    """
+    n_rungs = 1 + int(math.floor(math.log(max(n_candidates, 1), eta)))
+    schedule = []
+    for rung in range(n_rungs):
+        scale = float(eta) ** (rung - (n_rungs - 1))
+        n_folds = max(1, math.ceil(n_splits * scale))
+        if rung == n_rungs - 1:
+            max_train = None
+        else:
+            max_train = max(min_train_size, int(n_rows * scale))
+        schedule.append((n_folds, max_train))
+    return schedule
+
+
+def successive_halving(
+    X: pd.DataFrame,
+    y: pd.Series,
+    numeric_cols: list,
+    cat_cols: list,
+    candidates: List[Tuple[str, dict]],
+    n_splits: int = 5,
+    eta: int = 3,
+    min_train_size: int = 52,
+    n_jobs: int = 1,
+) -> pd.DataFrame:
+    """Run the halving rungs and return one leaderboard row per (candidate, rung)."""
+    splits = list(TimeSeriesSplit(n_splits=n_splits).split(X))
+    schedule = rung_schedule(len(candidates), n_splits, len(X), eta, min_train_size)
+    alive = list(range(len(candidates)))
+    rows = []
+
+    with shared_design(X, y, numeric_cols, cat_cols) as design_path:
+        for rung, (n_folds, max_train) in enumerate(schedule):
+            folds = splits[-n_folds:]
+            jobs = [(c, f) for c in alive for f in range(len(folds))]
+            results = Parallel(n_jobs=n_jobs)(
+                delayed(score_fold)(
+                    design_path,
+                    SEARCH_SPACE[candidates[c][0]][0](**candidates[c][1]),
+                    numeric_cols,
+                    cat_cols,
+                    folds[f][0] if max_train is None else folds[f][0][-max_train:],
+                    folds[f][1],
+                )
+                for c, f in jobs
+            )
+
+            scores = {}
+            for c in alive:
+                fold_results = [r for (cand, _), r in zip(jobs, results) if cand == c]
+                means = {k: float(np.mean([r[k] for r in fold_results])) for k in fold_results[0]}
+                scores[c] = means["f1"]
+                rows.append({
+                    "candidate": c,
+                    "model": candidates[c][0],
+                    "params": json.dumps(candidates[c][1], sort_keys=True),
+                    "rung": rung,
+                    "n_folds": n_folds,
+                    "max_train_size": max_train if max_train is not None else len(X),
+                    **means,
+                })
+
+            ranked = sorted(alive, key=lambda c: (-scores[c], c))
+            alive = ranked if rung == len(schedule) - 1 else ranked[:max(1, math.ceil(len(ranked) / eta))]
+
+    board = pd.DataFrame(rows)
+    final = board.groupby("candidate")["rung"].transform("max")
+    board["reached_final"] = final == len(schedule) - 1
+    return board.sort_values(["rung", "f1", "candidate"], ascending=[False, False, True]).reset_index(drop=True)
+
+
+def search(
+    features_csv: str,
+    leaderboard_out: str,
+    model_out: Optional[str] = None,
+    n_candidates: int = 100,
+    eta: int = 3,
+    n_splits: int = 5,
+    min_train_size: int = 52,
+    n_jobs: int = 1,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """Search hyperparameters for a classification features CSV.
+
+    Writes the full leaderboard to ``leaderboard_out`` and, when
+    ``model_out`` is given, refits the winner on all rows and saves it.
+    """
+    df = pd.read_csv(features_csv)
+    X, y, numeric_cols, cat_cols = build_design(df)
+    candidates = sample_candidates(n_candidates, seed)
+    board = successive_halving(
+        X, y, numeric_cols, cat_cols, candidates,
+        n_splits=n_splits, eta=eta, min_train_size=min_train_size, n_jobs=n_jobs,
+    )
+
+    Path(leaderboard_out).parent.mkdir(parents=True, exist_ok=True)
+    board.to_csv(leaderboard_out, index=False)
+    best = board.iloc[0]
+    print(f"Best candidate {best['candidate']}: {best['model']} {best['params']} F1={best['f1']:.3f}")
+    print(f"Leaderboard saved to {leaderboard_out}")
+
+    if model_out:
+        name, params = candidates[int(best["candidate"])]
+        pipe = build_pipeline(SEARCH_SPACE[name][0](**params), numeric_cols, cat_cols)
+        pipe.fit(X, y)
+        Path(model_out).parent.mkdir(parents=True, exist_ok=True)
+        joblib.dump(pipe, model_out)
+        try_export_compact(pipe, model_out)
+        print(f"Model saved to {model_out}")
+    return board
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Successive-halving hyperparameter search")
+    parser.add_argument('--features', default='data/processed/class_features.csv',
+                        help='Path to classification features CSV')
+    parser.add_argument('--leaderboard', default='reports/search_leaderboard.csv',
+                        help='Where to write the full leaderboard')
+    parser.add_argument('--model-out', default=None,
+                        help='Optional path to save the refitted best model')
+    parser.add_argument('--n-candidates', type=int, default=100,
+                        help='Number of sampled configurations')
+    parser.add_argument('--eta', type=int, default=3, help='Halving factor between rungs')
+    parser.add_argument('--splits', type=int, default=5, help='TimeSeriesSplit folds')
+    parser.add_argument('--min-train-size', type=int, default=52,
+                        help='Shortest training window used in the first rung')
+    parser.add_argument('--n-jobs', type=int, default=1,
+                        help='Worker processes (-1 = all cores)')
+    parser.add_argument('--seed', type=int, default=0, help='Sampling seed')
+    args = parser.parse_args()
+    search(
+        args.features,
+        args.leaderboard,
+        args.model_out,
+        n_candidates=args.n_candidates,
+        eta=args.eta,
+        n_splits=args.splits,
+        min_train_size=args.min_train_size,
+        n_jobs=args.n_jobs,
+        seed=args.seed,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Train one ``train_model`` pipeline per market in a single process pool.
+
+The feature panel is read once, either from one CSV with a ``market`` column
+or from several per-market feature files, and every market (plus an optional
+pooled cross-market model) is fitted concurrently.  All artifacts are written
+to one models directory together with a single metrics table, so retraining
+the book takes about as long as the slowest market.
+"""
+
+import argparse
+import logging
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+import joblib
+import pandas as pd
+from joblib import Parallel, delayed
+
+from src.models.compact import try_export_compact
+from src.models.train_model import fit_model
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+handler = logging.StreamHandler()
+handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+if not logger.handlers:
+    logger.addHandler(handler)
+
+POOLED = "pooled"
+
+
+def load_panel(
+    feature_csvs: Optional[Dict[str, str]] = None,
+    panel_csv: Optional[str] = None,
+) -> pd.DataFrame:
+    """Return all markets stacked in one frame with a ``market`` column."""
+    if panel_csv:
+        panel = pd.read_csv(panel_csv)
+        if "market" not in panel.columns:
+            raise ValueError("panel CSV must contain a 'market' column")
+    elif feature_csvs:
+        panel = pd.concat(
+            [pd.read_csv(path).assign(market=market) for market, path in feature_csvs.items()],
+            ignore_index=True,
+        )
+    else:
+        raise ValueError("provide feature_csvs or panel_csv")
+    return panel
+
+
+def _fit_market(market: str, df: pd.DataFrame, model_path: str, warm_start: bool) -> dict:
+    start = time.perf_counter()
+    pipe, scores = fit_model(df, warm_start)
+    joblib.dump(pipe, model_path)
+    try_export_compact(pipe, model_path)
+    return {
+        "market": market,
+        "n_rows": len(df),
+        "cv_accuracy": float(scores.mean()),
+        "cv_accuracy_std": float(scores.std()),
+        "fit_seconds": time.perf_counter() - start,
+        "model_path": model_path,
+    }
+
+
+def train_batch(
+    panel: pd.DataFrame,
+    model_dir: str,
+    metrics_out: str,
+    pooled: bool = False,
+    n_jobs: int = -1,
+    warm_start: bool = False,
+) -> pd.DataFrame:
+    """Fit every market of ``panel`` concurrently and write the metrics table."""
+    Path(model_dir).mkdir(parents=True, exist_ok=True)
+    tasks = [
+        (market, group.reset_index(drop=True))
+        for market, group in panel.groupby("market", sort=True)
+    ]
+    if pooled:
+        # chronological order keeps TimeSeriesSplit folds free of look-ahead
+        sort_col = "week" if "week" in panel.columns else "market"
+        tasks.append((POOLED, panel.sort_values(sort_col, kind="stable").reset_index(drop=True)))
+
+    rows = Parallel(n_jobs=n_jobs)(
+        delayed(_fit_market)(
+            market,
+            df,
+            str(Path(model_dir) / f"model_{market}.joblib"),
+            warm_start,
+        )
+        for market, df in tasks
+    )
+
+    metrics = pd.DataFrame(rows)
+    Path(metrics_out).parent.mkdir(parents=True, exist_ok=True)
+    metrics.to_csv(metrics_out, index=False)
+    for row in rows:
+        logger.info(
+            f"{row['market']}: cv_accuracy={row['cv_accuracy']:.3f} "
+            f"fit={row['fit_seconds']:.2f}s -> {row['model_path']}"
+        )
+    logger.info(f"Saved metrics for {len(rows)} models to {metrics_out}")
+    return metrics
+
+
+def _parse_features(items) -> Dict[str, str]:
+    out = {}
+    for item in items:
+        market, sep, path = item.partition("=")
+        if not sep:
+            raise ValueError(f"expected MARKET=PATH, got {item!r}")
+        out[market] = path
+    return out
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train one model per market in one process")
+    parser.add_argument("--features", nargs="*", default=[], help="MARKET=PATH feature CSVs")
+    parser.add_argument("--panel", default=None, help="single CSV with a 'market' column")
+    parser.add_argument("--model-dir", default="models")
+    parser.add_argument("--metrics", default="reports/train_metrics.csv")
+    parser.add_argument("--pooled", action="store_true", help="also fit a cross-market model")
+    parser.add_argument("--n-jobs", type=int, default=-1, help="parallel markets (-1 = all cores)")
+    parser.add_argument(
+        "--warm-start",
+        action="store_true",
+        help="approximate CV by warm-starting across expanding folds",
+    )
+    args = parser.parse_args()
+    panel = load_panel(_parse_features(args.features), args.panel)
+    train_batch(panel, args.model_dir, args.metrics, args.pooled, args.n_jobs, args.warm_start)
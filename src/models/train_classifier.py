@@ -1,6 +1,11 @@
 import argparse
+import tempfile
+from contextlib import contextmanager
+
+import numpy as np
 import pandas as pd
 import joblib
+from joblib import Parallel, delayed
 from sklearn.model_selection import TimeSeriesSplit
 from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import StandardScaler, OneHotEncoder
@@ -10,11 +15,36 @@ from sklearn.ensemble import RandomForestClassifier
 from sklearn.base import clone
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
 from pathlib import Path
+from typing import Iterator, Optional
 
+from src.models.compact import try_export_compact
+from src.models.warm_start import warm_start_predictions
 
-def train_and_evaluate(features_csv: str, model_out: str) -> None:
-    """Train classifiers using a features CSV produced by the classification builder."""
-    df = pd.read_csv(features_csv)
+
+def _attach_target(df: pd.DataFrame, labels_csv: str, target: str) -> pd.DataFrame:
+    """Replace ``target_dir`` with ``target`` from a label matrix."""
+    labels = pd.read_csv(labels_csv)
+    if target not in labels.columns:
+        raise ValueError(f"labels CSV has no '{target}' column")
+    df = df.drop(columns=["target_dir"], errors="ignore")
+    if "week" in df.columns and "week" in labels.columns:
+        df = df.merge(labels[["week", target]], on="week", how="inner")
+    else:
+        if len(labels) != len(df):
+            raise ValueError("labels CSV is not aligned with the features CSV")
+        df[target] = labels[target].to_numpy()
+    df = df.dropna(subset=[target]).reset_index(drop=True)
+    values = set(np.unique(df[target]))
+    if not values <= {0, 1}:
+        raise ValueError(
+            f"'{target}' is not a binary label (values {sorted(values)}); "
+            "ternary label matrices are not supported by the binary classifiers"
+        )
+    return df.rename(columns={target: "target_dir"}).astype({"target_dir": int})
+
+
+def build_design(df: pd.DataFrame):
+    """Split a classification frame into ``X``, ``y`` and column groups."""
     if "target_dir" not in df.columns:
         raise ValueError("features CSV must contain 'target_dir' column")
 
@@ -33,54 +63,174 @@ def train_and_evaluate(features_csv: str, model_out: str) -> None:
     numeric_cols = X_numeric.select_dtypes(include="number").columns.tolist()
     cat_cols = ["market_name"] if "market_name" in df.columns else []
     X = pd.concat([X_numeric[numeric_cols], df[cat_cols]], axis=1)
+    return X, y, numeric_cols, cat_cols
 
-    n_splits = 5 if len(X) > 6 else max(2, len(X) - 1)
-    tscv = TimeSeriesSplit(n_splits=n_splits)
 
-    classifiers = {
+def default_classifiers() -> dict:
+    """The candidate classifiers compared by :func:`train_and_evaluate`."""
+    return {
         'LogisticRegression': LogisticRegression(max_iter=1000),
         'RandomForest': RandomForestClassifier(n_estimators=100, random_state=42)
     }
 
-    summary = {}
 
-    for name, clf in classifiers.items():
-        metrics = {'accuracy': [], 'precision': [], 'recall': [], 'f1': []}
-        fold = 1
-        for train_idx, test_idx in tscv.split(X):
-            X_train, X_test = X.iloc[train_idx], X.iloc[test_idx]
-            y_train, y_test = y.iloc[train_idx], y.iloc[test_idx]
-
-            transformers = [('num', StandardScaler(), numeric_cols)]
-            if cat_cols:
-                transformers.append(
-                    (
-                        'cat',
-                        OneHotEncoder(handle_unknown='ignore'),
-                        cat_cols,
-                    )
-                )
-            preprocess = ColumnTransformer(transformers)
+def build_pipeline(clf, numeric_cols: list, cat_cols: list) -> Pipeline:
+    """Scale numeric columns, one-hot encode categoricals and append ``clf``."""
+    transformers = [('num', StandardScaler(), numeric_cols)]
+    if cat_cols:
+        transformers.append(
+            (
+                'cat',
+                OneHotEncoder(handle_unknown='ignore'),
+                cat_cols,
+            )
+        )
+    return Pipeline([
+        ('preprocess', ColumnTransformer(transformers)),
+        ('clf', clf),
+    ])
+
+
+_DESIGNS: dict = {}
+
+
+def dump_design(X: pd.DataFrame, y: pd.Series, numeric_cols: list, cat_cols: list, folder: str) -> str:
+    """Write the design matrix once as plain arrays workers can memory-map."""
+    design = {
+        'num': X[numeric_cols].to_numpy(dtype=float),
+        'y': y.to_numpy(),
+        'numeric_cols': list(numeric_cols),
+        'cat_cols': list(cat_cols),
+    }
+    for col in cat_cols:
+        codes, categories = pd.factorize(X[col], sort=True)
+        design[f'cat_{col}'] = codes
+        design[f'categories_{col}'] = categories.to_numpy(dtype=object)
+    path = str(Path(folder) / 'design.joblib')
+    joblib.dump(design, path)
+    return path
+
+
+def load_design(path: str):
+    """Rebuild ``X`` and ``y`` from :func:`dump_design` output, memory-mapped.
+
+    Each worker process loads a given design once and reuses it across jobs.
+    """
+    if path in _DESIGNS:
+        return _DESIGNS[path]
+    design = joblib.load(path, mmap_mode='r')
+    X = pd.DataFrame(design['num'], columns=design['numeric_cols'])
+    for col in design['cat_cols']:
+        codes = np.asarray(design[f'cat_{col}'])
+        values = design[f'categories_{col}'][np.where(codes < 0, 0, codes)]
+        X[col] = np.where(codes < 0, np.nan, values)
+    _DESIGNS.clear()
+    _DESIGNS[path] = (X, pd.Series(design['y']))
+    return _DESIGNS[path]
+
+
+@contextmanager
+def shared_design(X: pd.DataFrame, y: pd.Series, numeric_cols: list, cat_cols: list) -> Iterator[str]:
+    """Dump the design to a temporary folder and yield its path for the jobs.
+
+    With ``n_jobs=1`` the jobs run in this process and :func:`load_design`
+    caches a memmap of the file, so the entry is dropped before the folder is
+    deleted (an open mapping blocks the removal on Windows).
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        design_path = dump_design(X, y, numeric_cols, cat_cols, tmp)
+        try:
+            yield design_path
+        finally:
+            _DESIGNS.pop(design_path, None)
+
 
-            pipe = Pipeline([
-                ('preprocess', preprocess),
-                ('clf', clone(clf)),
-            ])
+def fold_metrics(y_true, preds) -> dict:
+    return {
+        'accuracy': accuracy_score(y_true, preds),
+        'precision': precision_score(y_true, preds, zero_division=0),
+        'recall': recall_score(y_true, preds, zero_division=0),
+        'f1': f1_score(y_true, preds, zero_division=0),
+    }
+
+
+def score_fold(design_path: str, clf, numeric_cols, cat_cols, train_idx, test_idx) -> dict:
+    """Fit one (classifier, fold) pair and score it on the test slice."""
+    X, y = load_design(design_path)
+    pipe = build_pipeline(clone(clf), numeric_cols, cat_cols)
+    pipe.fit(X.iloc[train_idx], y.iloc[train_idx])
+    preds = pipe.predict(X.iloc[test_idx])
+    return fold_metrics(y.iloc[test_idx], preds)
+
+
+def _warm_job(design_path: str, clf, numeric_cols, cat_cols, splits) -> list:
+    """Score all folds of one classifier with warm-started fits."""
+    X, y = load_design(design_path)
+    pipe = build_pipeline(clone(clf), numeric_cols, cat_cols)
+    preds = warm_start_predictions(pipe, X, y, splits)
+    return [fold_metrics(y.iloc[test_idx], p) for (_, test_idx), p in zip(splits, preds)]
+
+
+def train_and_evaluate(
+    features_csv: str,
+    model_out: str,
+    labels_csv: Optional[str] = None,
+    target: Optional[str] = None,
+    n_jobs: int = 1,
+    warm_start: bool = False,
+) -> None:
+    """Train classifiers using a features CSV produced by the classification builder.
+
+    When ``labels_csv`` and ``target`` are given, the target is taken from
+    that column of the label matrix written by :mod:`src.data.build_labels`.
+    Every (classifier, fold) pair runs as its own job on ``n_jobs`` worker
+    processes; results are reported in the same order as a serial run.
+
+    ``warm_start`` switches to the approximate warm-start CV from
+    :mod:`src.models.warm_start`, running one job per classifier.
+    """
+    df = pd.read_csv(features_csv)
+    if labels_csv and target:
+        df = _attach_target(df, labels_csv, target)
+    X, y, numeric_cols, cat_cols = build_design(df)
+
+    n_splits = 5 if len(X) > 6 else max(2, len(X) - 1)
+    tscv = TimeSeriesSplit(n_splits=n_splits)
+    splits = list(tscv.split(X))
+
+    classifiers = default_classifiers()
+
+    jobs = [(name, fold) for name in classifiers for fold in range(len(splits))]
+    with shared_design(X, y, numeric_cols, cat_cols) as design_path:
+        if warm_start:
+            print("Warm-start CV: approximation of cold-start CV")
+            per_clf = Parallel(n_jobs=n_jobs)(
+                delayed(_warm_job)(design_path, clf, numeric_cols, cat_cols, splits)
+                for clf in classifiers.values()
+            )
+            results = [m for fold_list in per_clf for m in fold_list]
+        else:
+            results = Parallel(n_jobs=n_jobs)(
+                delayed(score_fold)(
+                    design_path, classifiers[name], numeric_cols, cat_cols, *splits[fold]
+                )
+                for name, fold in jobs
+            )
+    by_job = dict(zip(jobs, results))
 
-            pipe.fit(X_train, y_train)
-            preds = pipe.predict(X_test)
+    summary = {}
 
-            metrics['accuracy'].append(accuracy_score(y_test, preds))
-            metrics['precision'].append(precision_score(y_test, preds, zero_division=0))
-            metrics['recall'].append(recall_score(y_test, preds, zero_division=0))
-            metrics['f1'].append(f1_score(y_test, preds, zero_division=0))
+    for name, clf in classifiers.items():
+        metrics = {'accuracy': [], 'precision': [], 'recall': [], 'f1': []}
+        for fold in range(len(splits)):
+            for k, v in by_job[(name, fold)].items():
+                metrics[k].append(v)
 
-            print(f"{name} Fold {fold}: "
+            print(f"{name} Fold {fold + 1}: "
                   f"acc={metrics['accuracy'][-1]:.3f} "
                   f"precision={metrics['precision'][-1]:.3f} "
                   f"recall={metrics['recall'][-1]:.3f} "
                   f"F1={metrics['f1'][-1]:.3f}")
-            fold += 1
 
         mean_metrics = {k: sum(v)/len(v) for k, v in metrics.items()}
         print(f"{name} Mean: "
@@ -93,28 +243,16 @@ def train_and_evaluate(features_csv: str, model_out: str) -> None:
     # select best model by mean F1
     best_name, (best_f1, best_clf) = max(summary.items(), key=lambda x: x[1][0])
 
-    transformers = [('num', StandardScaler(), numeric_cols)]
-    if cat_cols:
-        transformers.append(
-            (
-                'cat',
-                OneHotEncoder(handle_unknown='ignore'),
-                cat_cols,
-            )
-        )
-    final_preprocess = ColumnTransformer(transformers)
-
-    final_pipe = Pipeline([
-        ('preprocess', final_preprocess),
-        ('clf', best_clf),
-    ])
-
+    final_pipe = build_pipeline(best_clf, numeric_cols, cat_cols)
     final_pipe.fit(X, y)
 
     Path(model_out).parent.mkdir(parents=True, exist_ok=True)
     joblib.dump(final_pipe, model_out)
+    compact = try_export_compact(final_pipe, model_out)
     print(f"Best model: {best_name} with mean F1={best_f1:.3f}")
     print(f"Model saved to {model_out}")
+    if compact:
+        print(f"Compact artifact saved to {compact}")
 
 
 def main():
@@ -123,8 +261,23 @@ def main():
                         help='Path to classification features CSV')
     parser.add_argument('--model-out', default='models/best_model.pkl',
                         help='Path to save the best model pickle')
+    parser.add_argument('--labels', default=None,
+                        help='Optional label matrix CSV from build_labels')
+    parser.add_argument('--target', default=None,
+                        help='Label column to train on, e.g. target_4w_th0')
+    parser.add_argument('--n-jobs', type=int, default=1,
+                        help='Worker processes for fold evaluation (-1 = all cores)')
+    parser.add_argument('--warm-start', action='store_true',
+                        help='Approximate CV by warm-starting across expanding folds')
     args = parser.parse_args()
-    train_and_evaluate(args.features, args.model_out)
+    train_and_evaluate(
+        args.features,
+        args.model_out,
+        args.labels,
+        args.target,
+        args.n_jobs,
+        args.warm_start,
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,69 @@
+"""Warm-start cross-validation over expanding time-series folds.
+
+Expanding ``TimeSeriesSplit`` folds share almost all of their training rows, so
+instead of fitting every fold from scratch the estimator carries its state
+forward:
+
+* ``LogisticRegression`` starts the solver from the previous fold's
+  coefficients.
+* ``RandomForestClassifier`` keeps the previous fold's trees and grows a few
+  new ones on the enlarged window.
+
+The preprocessing steps are fitted once on the first (oldest) training window
+and reused so that earlier trees and coefficients stay valid.
+
+This is an APPROXIMATION of cold-start CV.  Later folds see a forest whose
+older trees never saw the newest rows and a scaler fitted on older data, so
+fold metrics drift slightly from a cold-start run.  Use it for fast iteration
+and check the drift with ``scripts/bench_warm_start.py`` before trusting it.
+"""
+
+from typing import Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.pipeline import Pipeline
+
+DEFAULT_GROW_FRACTION = 0.2
+
+
+def _enable_warm_start(clf) -> None:
+    if "warm_start" not in clf.get_params():
+        raise ValueError(f"{type(clf).__name__} does not support warm_start")
+    clf.set_params(warm_start=True)
+
+
+def warm_start_predictions(
+    pipe: Pipeline,
+    X: pd.DataFrame,
+    y: pd.Series,
+    splits: Iterable[Tuple[np.ndarray, np.ndarray]],
+    grow_fraction: float = DEFAULT_GROW_FRACTION,
+) -> List[np.ndarray]:
+    """Return test-fold predictions from warm-started fits (approximate CV).
+
+    ``pipe`` is cloned; its last step must expose ``warm_start``.  Tree
+    ensembles add ``grow_fraction`` of their original ``n_estimators`` per
+    fold after the first.
+    """
+    pipe = clone(pipe)
+    preprocess = Pipeline(pipe.steps[:-1]) if len(pipe.steps) > 1 else None
+    clf = pipe.steps[-1][1]
+    _enable_warm_start(clf)
+    base_trees = clf.get_params().get("n_estimators")
+
+    preds = []
+    for fold, (train_idx, test_idx) in enumerate(splits):
+        X_train, X_test = X.iloc[train_idx], X.iloc[test_idx]
+        if preprocess is not None:
+            if fold == 0:
+                preprocess.fit(X_train)
+            X_train = preprocess.transform(X_train)
+            X_test = preprocess.transform(X_test)
+        if base_trees is not None and fold > 0:
+            grow = max(1, int(round(base_trees * grow_fraction)))
+            clf.set_params(n_estimators=clf.n_estimators + grow)
+        clf.fit(X_train, y.iloc[train_idx])
+        preds.append(clf.predict(X_test))
+    return preds
@@ -0,0 +1,54 @@
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from src.models.compact import to_compact
+from src.models.train_classifier import build_pipeline
+
+
+def _data(n=120):
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(n, 2)), columns=['a', 'b'])
+    X['market_name'] = np.where(rng.random(n) > 0.5, 'GOLD', 'CRUDE OIL')
+    y = (X['a'] + (X['market_name'] == 'GOLD') > 0.5).astype(int)
+    return X, y
+
+
+@pytest.mark.parametrize('clf', [
+    LogisticRegression(max_iter=1000),
+    RandomForestClassifier(n_estimators=10, random_state=0),
+])
+def test_columns_match_dataframe(clf):
+    X, y = _data()
+    pipe = build_pipeline(clf, ['a', 'b'], ['market_name']).fit(X, y)
+    model = to_compact(pipe)
+    columns = {c: X[c].tolist() for c in X.columns}
+    np.testing.assert_allclose(model.predict_proba_columns(columns), pipe.predict_proba(X), atol=1e-12)
+
+
+def test_batch_endpoint(tmp_path):
+    pytest.importorskip('httpx')
+    from fastapi.testclient import TestClient
+    from src.api import app as app_module
+
+    X, y = _data()
+    pipe = build_pipeline(LogisticRegression(max_iter=1000), ['a', 'b'], ['market_name']).fit(X, y)
+    joblib.dump(pipe, tmp_path / 'model_gc.joblib')
+    app_module.registry.models_dir = str(tmp_path)
+    app_module.registry.settle_seconds = 0
+    with TestClient(app_module.app) as client:
+        assert client.get('/models').json()['models'][0]['fast_path']
+        columns = {c: X[c].tolist() for c in X.columns}
+        out = client.post('/predict/batch?market=gc', json=columns).json()
+        np.testing.assert_allclose(out['probability_up'], pipe.predict_proba(X)[:, 1], atol=1e-12)
+
+        row = {c: columns[c][0] for c in columns}
+        single = client.post('/predict?market=gc', json=row).json()
+        assert single['probability_up'] == pytest.approx(out['probability_up'][0])
+
+        columns['b'] = columns['b'][:-1]
+        assert client.post('/predict/batch?market=gc', json=columns).status_code == 422
+        columns['b'] = [None] * len(X)
+        assert client.post('/predict/batch?market=gc', json=columns).status_code == 422
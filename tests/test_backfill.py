@@ -0,0 +1,50 @@
+import json
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+
+def _setup(tmp_path, n=300):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(size=(n, 2)), columns=['a', 'b'])
+    df.insert(0, 'week', pd.date_range('2006-01-06', periods=n, freq='W-FRI'))
+    df.loc[3, 'b'] = np.nan
+    pipe = Pipeline([('scaler', StandardScaler()), ('clf', LogisticRegression())])
+    pipe.fit(df[['a', 'b']].dropna(), (df['a'].dropna() > 0).astype(int).drop(3))
+    (tmp_path / 'models').mkdir()
+    joblib.dump(pipe, tmp_path / 'models' / 'model_gc.joblib')
+    df.to_csv(tmp_path / 'features_gc.csv', index=False)
+    return df, pipe
+
+
+def test_backfill_streams_ndjson(tmp_path):
+    pytest.importorskip('httpx')
+    from fastapi.testclient import TestClient
+    from src.api import app as app_module
+
+    df, pipe = _setup(tmp_path)
+    app_module.registry.models_dir = str(tmp_path / 'models')
+    app_module.registry.settle_seconds = 0
+    app_module.FEATURES_DIR = str(tmp_path)
+    with TestClient(app_module.app) as client:
+        resp = client.get('/backfill/gc?chunk_rows=7')
+        assert resp.headers['content-type'].startswith('application/x-ndjson')
+        rows = [json.loads(line) for line in resp.text.splitlines()]
+        assert len(rows) == len(df)
+        assert rows[3]['probability_up'] is None
+        ok = df.drop(index=3)
+        expected = pipe.predict_proba(ok[['a', 'b']])[:, 1]
+        got = [r['probability_up'] for i, r in enumerate(rows) if i != 3]
+        np.testing.assert_allclose(got, expected, atol=1e-12)
+        assert rows[0] == {**rows[0], 'market': 'gc', 'version': 'default', 'week': '2006-01-06'}
+
+        ranged = client.get('/backfill/gc?start=2007-01-01&end=2007-12-31&chunk_rows=10')
+        weeks = [json.loads(line)['week'] for line in ranged.text.splitlines()]
+        assert weeks[0] == '2007-01-05' and weeks[-1] == '2007-12-28' and len(weeks) == 52
+
+        assert client.get('/backfill/cl').status_code == 404
@@ -45,3 +45,22 @@ def test_run_backtest_with_shorts(tmp_path):
     assert result.shape[1] == 6
     assert not result.isna().any().any()
 
+
+def test_no_refit_warns_about_look_ahead(tmp_path, caplog):
+    df = pd.DataFrame({
+        'week': pd.date_range('2024-01-02', periods=4, freq='W-TUE'),
+        'feature1': [1, 2, 3, 4],
+        'target_dir': [1, 0, 1, 0],
+        'etf_close': [100, 101, 102, 103]
+    })
+    csv_path = tmp_path / 'features.csv'
+    df.to_csv(csv_path, index=False)
+
+    model = RandomForestClassifier(n_estimators=10, random_state=42).fit(df[['feature1', 'etf_close']], df['target_dir'])
+    model_path = tmp_path / 'model.pkl'
+    for train_end, leaks in [(df.week.iloc[3], True), (df.week.iloc[1], False)]:
+        model.train_end_ = str(train_end.date())
+        joblib.dump(model, model_path)
+        caplog.clear()
+        run_backtest(str(csv_path), str(model_path), str(df.week.iloc[2].date()), refit=False)
+        assert ('look-ahead' in caplog.text) == leaks
@@ -0,0 +1,110 @@
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from src.eval.backtest import main
+from src.eval.bootstrap import (
+    STATISTICS,
+    backtest_significance,
+    bootstrap_test,
+    moving_block_indices,
+    permutation_indices,
+    stationary_indices,
+)
+
+
+def test_moving_blocks_are_consecutive_runs():
+    idx = moving_block_indices(23, 5, 40, np.random.default_rng(0))
+    assert idx.shape == (23, 40)
+    assert idx.min() >= 0 and idx.max() < 23
+    # within each block of 5 rows the indices step by one
+    blocks = idx[:20].reshape(4, 5, 40)
+    assert (np.diff(blocks, axis=1) == 1).all()
+
+
+def test_stationary_blocks_wrap_and_have_geometric_length():
+    n, block = 50, 4.0
+    idx = stationary_indices(n, block, 4000, np.random.default_rng(1))
+    assert idx.shape == (n, 4000)
+    assert idx.min() >= 0 and idx.max() < n
+    step = np.diff(idx, axis=0) % n
+    continues = step == 1
+    # a new block starts with probability 1 / block (ignoring chance continuations)
+    assert 1 - continues.mean() == pytest.approx(1 / block * (1 - 1 / n), abs=0.01)
+
+
+def test_permutations_keep_every_index_once():
+    idx = permutation_indices(30, 7, np.random.default_rng(2))
+    assert (np.sort(idx, axis=0) == np.arange(30)[:, None]).all()
+
+
+def _series(seed=0, weeks=300, skill=0.0):
+    rng = np.random.default_rng(seed)
+    market = rng.normal(0.001, 0.02, weeks)
+    noise = rng.normal(0, 0.02, weeks)
+    positions = np.where(skill * market + noise > 0, 1, -1)
+    return market, positions
+
+
+def test_reproducible_and_independent_of_n_jobs():
+    market, positions = _series()
+    a = bootstrap_test(market, positions, n_boot=600, seed=5, chunk_size=250)
+    b = bootstrap_test(market, positions, n_boot=600, seed=5, chunk_size=250, n_jobs=2)
+    c = bootstrap_test(market, positions, n_boot=600, seed=6, chunk_size=250)
+    pd.testing.assert_frame_equal(a, b)
+    assert not a.equals(c)
+    assert list(a.index) == list(STATISTICS)
+
+
+def test_skill_is_significant_and_noise_is_not():
+    market, skilled = _series(skill=3.0)
+    table = bootstrap_test(market, skilled, n_boot=500, method="moving", block=4)
+    assert table.loc["sharpe", "p_value"] < 0.01
+    assert table.loc["sharpe", "ci_low"] < table.loc["sharpe", "observed"] < table.loc["sharpe", "ci_high"]
+
+    p_values = [
+        bootstrap_test(*_series(seed, skill=0.0), n_boot=200, seed=seed).loc["sharpe", "p_value"]
+        for seed in range(20)
+    ]
+    assert 0.2 < np.mean(p_values) < 0.8
+
+
+def test_backtest_frame_and_validation():
+    prices = np.array([100.0, 101.0, 99.0, 102.0, 103.0, 101.0])
+    bt = pd.DataFrame({
+        "entry_price": prices[:-1],
+        "exit_price": prices[1:],
+        "signal": [1, -1, 1, 1, -1],
+    })
+    table = backtest_significance(bt, 0.0, n_boot=50)
+    expected = (np.prod(1 + np.diff(prices) / prices[:-1] * bt["signal"]))
+    assert table.loc["cum_return", "observed"] == pytest.approx(expected)
+    with pytest.raises(ValueError):
+        bootstrap_test(np.ones(5), np.ones(5), method="iid")
+
+
+def test_moving_blocks_round_float_lengths():
+    idx = moving_block_indices(10, 2.6, 5, np.random.default_rng(0))
+    # 2.6 rounds to blocks of 3 consecutive weeks
+    assert (np.diff(idx[:9].reshape(3, 3, 5), axis=1) == 1).all()
+
+
+def test_backtest_command_with_moving_blocks(tmp_path, monkeypatch, capsys):
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame({
+        "week": pd.date_range("2020-01-07", periods=80, freq="W-TUE"),
+        "feature1": rng.normal(size=80),
+        "target_dir": rng.integers(0, 2, 80),
+        "etf_close": 100 * np.exp(np.cumsum(rng.normal(0, 0.02, 80))),
+    })
+    df.to_csv(tmp_path / "features.csv", index=False)
+    joblib.dump(RandomForestClassifier(n_estimators=5, random_state=0), tmp_path / "model.pkl")
+    monkeypatch.chdir(tmp_path)
+
+    # argparse hands --block over as a float
+    main(["backtest", "features.csv", "model.pkl", "2020-09-01", "--allow-shorts",
+          "--bootstrap", "200", "--block-method", "moving", "--block", "4"])
+    out = capsys.readouterr().out
+    assert "p_value" in out and "max_drawdown" in out
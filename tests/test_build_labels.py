@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+from src.data.build_labels import build_label_matrix
+
+
+def test_build_label_matrix(tmp_path):
+    close = [100, 102, 101, 105, 104, 110]
+    df = pd.DataFrame({
+        'week': pd.date_range('2024-01-05', periods=len(close), freq='W-FRI'),
+        'etf_close': close,
+    })
+    df['return_1w'] = df['etf_close'].pct_change().shift(-1)
+    in_path = tmp_path / 'features.csv'
+    df.to_csv(in_path, index=False)
+    out_path = tmp_path / 'labels.csv'
+
+    labels = build_label_matrix(str(in_path), str(out_path), horizons=[1, 2], thresholds=[0.0, 0.02])
+
+    assert out_path.exists()
+    assert len(labels) == len(df)
+    np.testing.assert_allclose(labels['fwd_ret_1w'], df['return_1w'])
+    assert list(labels['target_1w_th0'].iloc[:-1]) == [1, 0, 1, 0, 1]
+    assert list(labels['target_2w_th0.02'].iloc[:-2]) == [0, 1, 1, 1]
+    assert labels['target_2w_th0'].iloc[-2:].isna().all()
+
+
+def test_ternary_labels_from_returns(tmp_path):
+    df = pd.DataFrame({'return_1w': [0.05, -0.05, 0.001, 0.02]})
+    in_path = tmp_path / 'features.csv'
+    df.to_csv(in_path, index=False)
+
+    labels = build_label_matrix(str(in_path), str(tmp_path / 'labels.csv'),
+                                horizons=[1], thresholds=[0.01], ternary=True)
+    assert list(labels['target_1w_th0.01']) == [1, -1, 0, 1]
@@ -0,0 +1,98 @@
+import threading
+import time
+
+import pytest
+
+from src.api.cache import PredictionCache
+
+
+class Entry:
+    market, version, mtime_ns, feature_names = 'gc', 'default', 1, ('a', 'b')
+
+
+def test_lru_ttl_and_quantized_keys():
+    now = [0.0]
+    cache = PredictionCache(maxsize=2, ttl=10, decimals=6, clock=lambda: now[0])
+    k1 = cache.key(Entry, {'a': 0.1 + 0.2, 'b': 1.0, 'extra': 5})
+    assert k1 == cache.key(Entry, {'a': 0.3, 'b': 1.0})
+    with pytest.raises(KeyError):
+        cache.key(Entry, {'a': 0.3})
+
+    calls = []
+    compute = lambda v: (lambda: calls.append(v) or v)
+    assert cache.get_or_compute(k1, compute(1)) == 1
+    assert cache.get_or_compute(k1, compute(99)) == 1
+    cache.get_or_compute('k2', compute(2))
+    cache.get_or_compute(k1, compute(99))      # k1 most recent
+    cache.get_or_compute('k3', compute(3))     # evicts k2
+    assert cache.get_or_compute('k2', compute(22)) == 22
+    now[0] = 11
+    assert cache.get_or_compute('k2', compute(23)) == 23
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['evictions'], stats['expirations']) == (2, 5, 2, 1)
+
+    cache.clear()
+    assert cache.stats()['size'] == 0 and cache.stats()['invalidations'] == 1
+
+
+def test_concurrent_requests_coalesce():
+    cache = PredictionCache()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return 0.7
+
+    results = []
+    owner = threading.Thread(target=lambda: results.append(cache.get_or_compute('k', slow)))
+    owner.start()
+    started.wait(5)
+    waiters = [threading.Thread(target=lambda: results.append(cache.get_or_compute('k', slow)))
+               for _ in range(4)]
+    for t in waiters:
+        t.start()
+    while cache.stats()['coalesced'] < 4:
+        time.sleep(0.001)
+    release.set()
+    for t in [owner] + waiters:
+        t.join()
+    assert results == [0.7] * 5 and len(calls) == 1
+
+
+def test_failed_compute_is_not_cached():
+    cache = PredictionCache()
+    with pytest.raises(ValueError):
+        cache.get_or_compute('k', lambda: (_ for _ in ()).throw(ValueError('boom')))
+    assert cache.get_or_compute('k', lambda: 1.0) == 1.0
+    assert cache.stats()['inflight'] == 0
+
+
+def test_predict_endpoint_uses_cache(tmp_path):
+    pytest.importorskip('httpx')
+    import joblib
+    import numpy as np
+    import pandas as pd
+    from fastapi.testclient import TestClient
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+    from src.api import app as app_module
+
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(50, 2)), columns=['a', 'b'])
+    pipe = Pipeline([('s', StandardScaler()), ('c', LogisticRegression())]).fit(X, X['a'] > 0)
+    joblib.dump(pipe, tmp_path / 'model_gc.joblib')
+    app_module.registry.models_dir = str(tmp_path)
+    app_module.registry.settle_seconds = 0
+    with TestClient(app_module.app) as client:
+        app_module.cache.clear()
+        before = client.get('/cache/stats').json()
+        first = client.post('/predict?market=gc', json={'a': 1.0, 'b': 0.5}).json()
+        second = client.post('/predict?market=gc', json={'a': 1.0, 'b': 0.5}).json()
+        assert first == second
+        after = client.get('/cache/stats').json()
+        assert after['hits'] - before['hits'] == 1
+        assert after['misses'] - before['misses'] == 1
@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+import pytest
+import joblib
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from src.models import compact
+from src.models.compact import CompactModel, export_compact, load_compact, main
+from src.models.predict_model import load_model
+from src.models.train_classifier import build_pipeline
+
+
+def _data(n=200):
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(n, 3)), columns=['a', 'b', 'c'])
+    X['market_name'] = np.where(rng.random(n) > 0.5, 'GOLD', 'CRUDE OIL')
+    y = pd.Series((X['a'] + (X['market_name'] == 'GOLD') > 0.5).astype(int))
+    return X, y
+
+
+@pytest.mark.parametrize('clf', [
+    LogisticRegression(max_iter=1000),
+    RandomForestClassifier(n_estimators=15, random_state=0),
+])
+def test_compact_matches_pipeline(tmp_path, clf):
+    X, y = _data()
+    pipe = build_pipeline(clf, ['a', 'b', 'c'], ['market_name']).fit(X, y)
+    path = export_compact(pipe, str(tmp_path / 'model.compact'))
+
+    model = load_compact(path)
+    np.testing.assert_allclose(model.predict_proba(X), pipe.predict_proba(X), atol=1e-12)
+    np.testing.assert_array_equal(model.predict(X), pipe.predict(X))
+    # plain arrays in feature order score the same
+    np.testing.assert_allclose(
+        model.predict_proba(X[model.feature_names].to_numpy(dtype=object)),
+        pipe.predict_proba(X),
+        atol=1e-12,
+    )
+
+
+def test_compact_checksum_and_loader(tmp_path, monkeypatch):
+    X, y = _data()
+    pipe = build_pipeline(LogisticRegression(), ['a', 'b', 'c'], ['market_name']).fit(X, y)
+    joblib.dump(pipe, tmp_path / 'model.pkl')
+    path = export_compact(pipe, str(tmp_path / 'model.compact'))
+
+    # each file version is hashed once per process
+    hashed = []
+    sha256 = compact.hashlib.sha256
+    monkeypatch.setattr(compact.hashlib, 'sha256', lambda data: hashed.append(1) or sha256(data))
+    assert isinstance(load_model(str(tmp_path / 'model.pkl')), CompactModel)
+    assert not isinstance(load_model(str(tmp_path / 'model.pkl'), prefer_compact=False), CompactModel)
+    load_compact(path)
+    assert len(hashed) == 1
+
+    raw = bytearray(open(path, 'rb').read())
+    raw[-1] ^= 0xFF
+    open(path, 'wb').write(raw)
+    with pytest.raises(ValueError):
+        load_compact(path)
+    load_compact(path, verify=False)
+    with pytest.raises(SystemExit):
+        main([path])
+    main([path, '--no-verify'])
+
+
+def test_compact_forest_large_batches_use_sklearn_trees(tmp_path):
+    from src.models.flat_forest import FLAT_FOREST_MAX_ROWS
+
+    X, y = _data(n=3 * FLAT_FOREST_MAX_ROWS)
+    X.loc[::7, 'b'] = np.nan
+    pipe = build_pipeline(RandomForestClassifier(n_estimators=15, random_state=0),
+                          ['a', 'b', 'c'], ['market_name'])
+    pipe.fit(X.fillna(0), y)
+    model = load_compact(export_compact(pipe, str(tmp_path / 'model.compact')))
+
+    small = model.predict_proba(X.iloc[:FLAT_FOREST_MAX_ROWS])
+    assert model._trees is None
+    large = model.predict_proba(X)
+    assert model._trees
+    # both engines agree, missing values included
+    np.testing.assert_allclose(large[:FLAT_FOREST_MAX_ROWS], small, atol=1e-12)
+    np.testing.assert_allclose(model.predict_proba(X.fillna(0)), pipe.predict_proba(X.fillna(0)), atol=1e-12)
+
+
+def test_predict_densifies_sparse_preprocessing():
+    from sklearn.compose import ColumnTransformer
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import OneHotEncoder, StandardScaler
+    from src.models.predict_model import predict
+
+    X, y = _data()
+    pre = ColumnTransformer(
+        [('num', StandardScaler(), ['a', 'b', 'c']), ('cat', OneHotEncoder(), ['market_name'])],
+        sparse_threshold=1.0,
+    )
+    pipe = Pipeline([('pre', pre), ('clf', RandomForestClassifier(n_estimators=5, random_state=0))])
+    pipe.fit(X, y)
+    assert hasattr(pipe[:-1].transform(X), 'toarray')
+    np.testing.assert_allclose(predict(pipe, X), pipe.predict_proba(X)[:, 1], atol=1e-12)
@@ -0,0 +1,58 @@
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import f1_score, precision_score, recall_score
+
+from src.eval.backtest import main
+from src.eval.cutoff_sweep import CURVE_COLUMNS, sweep_cutoffs
+from src.eval.metrics import performance
+from src.eval.vector_backtest import backtest_matrix, signal_matrix
+
+
+@pytest.mark.parametrize("allow_shorts", [False, True])
+def test_matches_backtest_at_every_cutoff(allow_shorts):
+    rng = np.random.default_rng(0)
+    weeks = 200
+    proba = np.round(rng.uniform(size=weeks), 2)  # plenty of ties
+    labels = rng.integers(0, 2, weeks)
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, weeks)))
+    prices[30] = np.nan
+    extreme = (rng.uniform(size=weeks) > 0.85).astype(int)
+
+    curve = sweep_cutoffs(proba, labels, prices, extreme, 0.001, allow_shorts)
+    assert list(curve.columns) == CURVE_COLUMNS
+    assert curve["cutoff"].is_monotonic_increasing and np.isinf(curve["cutoff"].iloc[-1])
+    assert len(curve) == len(np.unique(proba)) + 1
+
+    cutoffs = curve["cutoff"].to_numpy()
+    preds = (proba[:, None] >= cutoffs[None, :]).astype(int)
+    result = backtest_matrix(prices, signal_matrix(preds, extreme, allow_shorts), 0.001)
+    np.testing.assert_allclose(curve["cum_return"], result.cum_return, rtol=1e-12)
+    np.testing.assert_allclose(curve["sharpe"], performance(result.returns)["sharpe"], rtol=1e-10)
+    assert (curve["n_long"] == preds.sum(axis=0)).all()
+    for i in [0, 50, len(curve) - 1]:
+        assert curve["precision"][i] == pytest.approx(precision_score(labels, preds[:, i], zero_division=0))
+        assert curve["recall"][i] == pytest.approx(recall_score(labels, preds[:, i]))
+        assert curve["f1"][i] == pytest.approx(f1_score(labels, preds[:, i], zero_division=0))
+
+
+def test_sweep_command(tmp_path, capsys):
+    df = pd.DataFrame({
+        "week": pd.date_range("2024-01-02", periods=30, freq="W-TUE"),
+        "feature1": np.arange(30) % 7,
+        "target_dir": [0, 1, 1] * 10,
+        "etf_close": 100 + np.sin(np.arange(30)),
+    })
+    csv_path = tmp_path / "features.csv"
+    df.to_csv(csv_path, index=False)
+    model_path = tmp_path / "model.pkl"
+    joblib.dump(RandomForestClassifier(n_estimators=10, random_state=42), model_path)
+    out = tmp_path / "curve.csv"
+
+    main(["sweep", str(csv_path), str(model_path), str(df.week.iloc[15].date()), "--out", str(out)])
+    curve = pd.read_csv(out)
+    assert list(curve.columns) == CURVE_COLUMNS
+    assert curve["n_long"].iloc[0] == 15 and curve["n_long"].iloc[-1] == 0
+    assert "Best sharpe" in capsys.readouterr().out
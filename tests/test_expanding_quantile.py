@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+from src.features.expanding_quantile import expanding_quantiles, extreme_flags
+
+
+def test_expanding_quantiles_match_pandas():
+    rng = np.random.default_rng(0)
+    values = rng.normal(size=200)
+    values[[5, 50]] = np.nan
+    qs = [0.85, 0.90, 0.95]
+    out = expanding_quantiles(values, qs, min_periods=10)
+
+    s = pd.Series(values)
+    for i, q in enumerate(qs):
+        expected = s.expanding(min_periods=10).quantile(q)
+        np.testing.assert_allclose(out[:, i], expected.to_numpy(), equal_nan=True)
+
+
+def test_rolling_window_quantiles_match_pandas():
+    rng = np.random.default_rng(1)
+    values = rng.integers(0, 20, size=120).astype(float)
+    out = expanding_quantiles(values, [0.5, 0.9], window=26)
+    expected = pd.Series(values).rolling(26, min_periods=1).quantile(0.9)
+    np.testing.assert_allclose(out[:, 1], expected.to_numpy())
+
+
+def test_extreme_flags_ignore_future_values():
+    s = pd.Series([0.1, 0.2, 0.3, 0.4, 0.5, 10.0])
+    flags = extreme_flags(s, [0.9], min_periods=3)
+    # the late spike must not change earlier flags
+    assert list(flags[0.9]) == [0, 0, 1, 1, 1, 1]
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from src.models.flat_forest import FlatForest
+from src.models.predict_model import predict
+from src.models.train_classifier import build_pipeline
+
+
+def test_flat_forest_matches_sklearn():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(300, 5))
+    y = rng.integers(0, 3, size=300)
+    rf = RandomForestClassifier(n_estimators=20, random_state=0).fit(X, y)
+    flat = FlatForest.from_sklearn(rf)
+
+    batch = rng.normal(size=(257, 5))
+    np.testing.assert_array_equal(flat.predict_proba(batch), rf.predict_proba(batch))
+    # values exactly on a split threshold follow sklearn's <= rule
+    on_split = np.tile(rf.estimators_[0].tree_.threshold[0], (1, 5))
+    np.testing.assert_array_equal(flat.predict_proba(on_split), rf.predict_proba(on_split))
+    np.testing.assert_array_equal(
+        flat.predict_proba(batch, chunk_size=10), rf.predict_proba(batch)
+    )
+
+
+def test_predict_uses_flat_forest_for_pipelines():
+    rng = np.random.default_rng(1)
+    X = pd.DataFrame(rng.normal(size=(200, 3)), columns=['a', 'b', 'c'])
+    X['market_name'] = np.where(rng.random(200) > 0.5, 'GOLD', 'CRUDE OIL')
+    y = (X['a'] > 0).astype(int)
+    pipe = build_pipeline(RandomForestClassifier(n_estimators=10, random_state=0),
+                          ['a', 'b', 'c'], ['market_name']).fit(X, y)
+    np.testing.assert_allclose(predict(pipe, X.head(50)), pipe.predict_proba(X.head(50))[:, 1])
+
+
+def test_missing_values_follow_sklearn():
+    from src.models.compact import flatten_forest
+    from src.models.flat_forest import sklearn_trees, trees_predict_proba
+
+    rng = np.random.default_rng(2)
+    X = rng.normal(size=(400, 4))
+    y = (X[:, 0] + X[:, 1] > 0).astype(int)
+    X_nan = np.where(rng.random(X.shape) < 0.2, np.nan, X)
+    batch = np.where(rng.random((200, 4)) < 0.3, np.nan, rng.normal(size=(200, 4)))
+    # trained without NaN (sklearn picks a side per split) and with NaN
+    for train in (X, X_nan):
+        rf = RandomForestClassifier(n_estimators=20, random_state=0).fit(train, y)
+        expected = rf.predict_proba(batch)
+        np.testing.assert_array_equal(FlatForest.from_sklearn(rf).predict_proba(batch), expected)
+        trees = sklearn_trees(flatten_forest(rf), batch.shape[1])
+        np.testing.assert_allclose(trees_predict_proba(trees, batch), expected, atol=1e-12)
+        np.testing.assert_allclose(predict(rf, batch), expected[:, 1])
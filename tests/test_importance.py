@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+from src.models.importance import feature_importance
+from src.models.train_classifier import _DESIGNS
+
+
+def test_feature_importance_ranks_signal_first():
+    rng = np.random.default_rng(0)
+    n = 240
+    df = pd.DataFrame({
+        'signal': rng.normal(size=n),
+        'noise1': rng.normal(size=n),
+        'noise2': rng.normal(size=n),
+    })
+    df['target_dir'] = (df['signal'] > 0).astype(int)
+
+    report = feature_importance(df, classifier='LogisticRegression', n_splits=3,
+                                n_repeats=3, n_jobs=2)
+
+    assert list(report['rank']) == [1, 2, 3]
+    assert report.iloc[0]['feature'] == 'signal'
+    assert report.iloc[0]['permutation_mean'] > 0.2
+    assert report.iloc[0]['drop_column_mean'] > 0.2
+
+    # a serial run releases its memmap of the deleted design file
+    feature_importance(df, classifier='LogisticRegression', n_splits=3, n_repeats=1,
+                       drop_column=False, n_jobs=1)
+    assert not _DESIGNS
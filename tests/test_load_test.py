@@ -0,0 +1,40 @@
+import importlib.util
+import json
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip('httpx')
+
+ROOT = Path(__file__).resolve().parents[1]
+spec = importlib.util.spec_from_file_location('load_test', ROOT / 'scripts' / 'load_test.py')
+load_test = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(load_test)
+
+
+def test_in_process_run_and_baseline(tmp_path):
+    out, baseline = tmp_path / 'run.json', tmp_path / 'baseline.json'
+    args = ['--synthetic', '--duration', '0.5', '--warmup', '0.1', '--concurrency', '4',
+            '--batch-size', '10', '--out', str(out)]
+    assert load_test.main(args + ['--baseline', str(baseline), '--save-baseline']) == 0
+
+    results = json.loads(out.read_text())
+    assert set(results['scenarios']) == {'single', 'batch', 'hot', 'cold'}
+    assert results['overall']['requests'] > 0 and results['overall']['errors'] == 0
+    for key in ('rps', 'p50_ms', 'p95_ms', 'p99_ms'):
+        assert results['overall'][key] > 0
+
+    # a baseline far faster than this run must fail the check
+    fast = json.loads(baseline.read_text())
+    fast['overall']['p99_ms'] /= 100
+    fast['overall']['rps'] *= 100
+    baseline.write_text(json.dumps(fast))
+    assert load_test.main(args + ['--baseline', str(baseline)]) == 1
+
+
+def test_compare_reports_each_regression():
+    base = {'overall': {'p99_ms': 10.0, 'rps': 100.0, 'errors': 0}, 'scenarios': {}}
+    now = {'overall': {'p99_ms': 11.0, 'rps': 90.0, 'errors': 0}, 'scenarios': {}}
+    assert load_test.compare(now, base, tolerance=0.2) == []
+    now['overall'].update(p99_ms=13.0, rps=70.0, errors=2)
+    assert len(load_test.compare(now, base, tolerance=0.2)) == 3
@@ -0,0 +1,58 @@
+import threading
+
+import pytest
+
+from src.api.metrics import Counter, Histogram
+
+
+def test_histogram_merges_thread_shards():
+    hist = Histogram('lat', 'latency', ('route',), buckets=(0.1, 1.0))
+    count = Counter('req', 'requests', ('route',))
+
+    def work():
+        for v in (0.05, 0.1, 0.5, 2.0):
+            hist.observe(v, '/p')
+            count.inc('/p')
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    text = '\n'.join(hist.render() + count.render())
+    assert 'lat_bucket{route="/p",le="0.1"} 8' in text
+    assert 'lat_bucket{route="/p",le="1.0"} 12' in text
+    assert 'lat_bucket{route="/p",le="+Inf"} 16' in text
+    assert 'lat_count{route="/p"} 16' in text
+    assert 'req{route="/p"} 16' in text
+    assert '# TYPE lat histogram' in text
+
+
+def test_metrics_endpoint(tmp_path):
+    pytest.importorskip('httpx')
+    import joblib
+    import numpy as np
+    import pandas as pd
+    from fastapi.testclient import TestClient
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+    from src.api import app as app_module
+
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(50, 2)), columns=['a', 'b'])
+    pipe = Pipeline([('s', StandardScaler()), ('c', LogisticRegression())]).fit(X, X['a'] > 0)
+    joblib.dump(pipe, tmp_path / 'model_gc.joblib')
+    app_module.registry.models_dir = str(tmp_path)
+    app_module.registry.settle_seconds = 0
+    with TestClient(app_module.app) as client:
+        client.post('/predict/batch?market=gc', json={'a': [0.1, 0.2], 'b': [0.0, 1.0]})
+        client.post('/predict?market=zz', json={'a': 0.1, 'b': 0.0})
+        text = client.get('/metrics').text
+    assert 'cot_api_requests_total{route="/predict/batch",method="POST",status="200"}' in text
+    assert 'cot_api_requests_total{route="/predict",method="POST",status="404"}' in text
+    for stage in ('validation', 'build', 'inference', 'serialize'):
+        assert f'cot_api_stage_seconds_count{{route="/predict/batch",stage="{stage}"}}' in text
+    assert 'cot_model_active{market="gc",version="default"} 1' in text
+    assert 'cot_model_load_seconds{market="gc",version="default"}' in text
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import joblib
+from src.models.compact import to_compact
+from src.models.online import OnlineModel, run_update
+from src.models.train_model import FEATURE_COLS, fit_model
+
+
+def _features(n=200, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(rng.normal(size=(n, len(FEATURE_COLS))), columns=FEATURE_COLS)
+    df.insert(0, 'week', pd.date_range('2020-01-03', periods=n, freq='W-FRI'))
+    df['return_1w'] = 0.01 * df[FEATURE_COLS[0]] + 0.005 * rng.normal(size=n)
+    return df
+
+
+def test_update_uses_only_new_weeks(tmp_path):
+    df = _features()
+    model = OnlineModel(refit_every=3)
+    assert model.fit_full(df.iloc[:150]) == 150
+    assert model.update(df.iloc[:150]) == 0
+    # each new week is scored before partial_fit sees it
+    before = model.pipeline().predict_proba(df[FEATURE_COLS].iloc[[150]])[0, 1]
+    assert model.update(df.iloc[:151]) == 1
+    assert model.prequential == {df['week'].iloc[150]: before}
+    assert model.last_week == df['week'].iloc[150]
+    assert model.n_seen == 151
+
+    model.save(str(tmp_path / 'gc.state'))
+    loaded = OnlineModel.load(str(tmp_path / 'gc.state'))
+    np.testing.assert_array_equal(loaded.clf.coef_, model.clf.coef_)
+    assert loaded.prequential == model.prequential
+    # SGD log-loss exports to the NumPy scorer
+    pipe = loaded.pipeline()
+    X = df[FEATURE_COLS].tail(20)
+    np.testing.assert_allclose(to_compact(pipe).predict_proba(X), pipe.predict_proba(X), atol=1e-12)
+
+
+def test_run_update_refits_periodically_and_logs_drift(tmp_path):
+    df = _features()
+    features, state = tmp_path / 'features_gc.csv', str(tmp_path / 'online' / 'gc.state')
+    batch, _ = fit_model(df.iloc[:150])
+    joblib.dump(batch, tmp_path / 'model_gc.joblib')
+    drift = tmp_path / 'drift.csv'
+
+    for end, updates in [(150, 0), (151, 1), (153, 2), (154, 0)]:
+        df.iloc[:end].to_csv(features, index=False)
+        model = run_update(str(features), state, 'gc', refit_every=2,
+                           batch_model=str(tmp_path / 'model_gc.joblib'),
+                           export_dir=str(tmp_path), drift_out=str(drift))
+        assert model.updates_since_refit == updates
+    assert model.n_seen == 154
+
+    # weeks 150-153 were scored before training on them (week 153 by the
+    # model replaced at the refit); all are after the batch cutoff (week 149)
+    assert sorted(model.prequential) == df['week'].iloc[150:154].tolist()
+    log = pd.read_csv(drift)
+    assert batch.train_end_ == str(df['week'].iloc[149].date())
+    assert log['window'].tolist() == [1, 3, 4]
+    assert log['signal_agreement'].between(0, 1).all()
+    # the cutoff survives the compact artifact load_model prefers
+    compact = to_compact(batch)
+    assert compact.train_end_ == batch.train_end_
+    assert (tmp_path / 'model_gc_online.joblib').exists()
+    assert (tmp_path / 'model_gc_online.compact').exists()
+
+
+def test_run_update_skips_drift_without_batch_model(tmp_path):
+    features, drift = tmp_path / 'features_gc.csv', tmp_path / 'drift.csv'
+    _features().to_csv(features, index=False)
+    model = run_update(str(features), str(tmp_path / 'gc.state'), 'gc',
+                       batch_model=str(tmp_path / 'missing.joblib'), drift_out=str(drift))
+    assert model.n_seen == 200
+    assert (tmp_path / 'gc.state').exists() and not drift.exists()
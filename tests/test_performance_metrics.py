@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.eval.metrics import METRICS, performance, rolling_performance
+
+
+def _pandas_metrics(ret: pd.Series) -> dict:
+    ret = ret.dropna()
+    cum = (1 + ret).cumprod()
+    peak = cum.cummax()
+    downside = ret[ret < 0]
+    return {
+        "cum_return": cum.iloc[-1],
+        "sharpe": ret.mean() / ret.std() * 52 ** 0.5,
+        "sortino": ret.mean() / downside.std() * 52 ** 0.5,
+        "max_drawdown": ((peak - cum) / peak).max(),
+        "hit_rate": (ret > 0).mean(),
+    }
+
+
+def test_ragged_columns_match_pandas():
+    rng = np.random.default_rng(0)
+    returns = rng.normal(0, 0.02, size=(200, 70))
+    # ragged starts and scattered missing weeks
+    for j in range(returns.shape[1]):
+        returns[: j * 2, j] = np.nan
+    returns[rng.uniform(size=returns.shape) < 0.05] = np.nan
+
+    scores = performance(returns)
+    assert set(scores) == set(METRICS)
+    for j in [0, 13, 69]:
+        expected = _pandas_metrics(pd.Series(returns[:, j]))
+        for name, value in expected.items():
+            assert scores[name][j] == pytest.approx(value, rel=1e-10), name
+        assert scores["n_periods"][j] == np.count_nonzero(~np.isnan(returns[:, j]))
+
+
+def test_drawdown_duration_calmar_and_turnover():
+    returns = np.array([0.1, -0.1, np.nan, 0.05, 0.2, -0.5, 0.1])
+    positions = np.array([1, 1, -1, -1, 1, 0, 1])
+    scores = performance(returns, positions)
+    # below the peak for weeks 1 and 3 (the NaN week does not count), then 5 and 6
+    assert scores["drawdown_duration"][0] == 2
+    assert scores["turnover"][0] == pytest.approx(6 / 6)
+    assert scores["hit_rate"][0] == pytest.approx(4 / 6)
+    years = 6 / 52
+    expected = (scores["cum_return"][0] ** (1 / years) - 1) / scores["max_drawdown"][0]
+    assert scores["calmar"][0] == pytest.approx(expected)
+
+
+def test_undefined_metrics_are_nan():
+    scores = performance(np.array([[np.nan, 0.01], [np.nan, 0.01]]))
+    assert np.isnan([scores[m][0] for m in METRICS if m != "n_periods"]).all()
+    assert np.isnan(scores["sharpe"][1]) and scores["max_drawdown"][1] == 0
+
+
+def test_rolling_matches_windows(monkeypatch):
+    rng = np.random.default_rng(1)
+    returns = rng.normal(0, 0.02, size=(60, 3))
+    returns[10:14, 1] = np.nan
+    positions = rng.integers(-1, 2, size=(60, 3))
+    # small blocks so several are stitched together
+    monkeypatch.setattr("src.eval.metrics.ROLLING_BLOCK_CELLS", 100)
+    rolled = rolling_performance(returns, 12, positions, min_periods=10)
+    for t in [30, 45, 59]:
+        window = performance(returns[t - 11:t + 1], positions[t - 11:t + 1])
+        for name in METRICS:
+            np.testing.assert_allclose(rolled[name][t], window[name], rtol=1e-12)
+    assert np.isnan(rolled["sharpe"][:11]).all()
+    # the window ending at week 13 has 8 of 12 weeks traded in column 1
+    assert np.isnan(rolled["sharpe"][13, 1]) and not np.isnan(rolled["sharpe"][13, 0])
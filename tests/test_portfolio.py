@@ -0,0 +1,124 @@
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from src.eval.portfolio import align, backtest_portfolio, market_signals, run_portfolio, target_weights
+from src.eval.vector_backtest import backtest_matrix
+
+
+def _market(seed, weeks, vol=0.02):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "week": weeks,
+        "etf_close": 100 * np.exp(np.cumsum(rng.normal(0, vol, len(weeks)))),
+        "signal": rng.choice([-1, 0, 1], len(weeks)),
+        "vol_26w": np.full(len(weeks), vol),
+    })
+
+
+def test_single_market_matches_vector_backtest():
+    weeks = pd.date_range("2020-01-07", periods=60, freq="W-TUE")
+    df = _market(0, weeks)
+    result = backtest_portfolio({"gc": df}, commission=0.0)
+    expected = backtest_matrix(df["etf_close"], df["signal"].to_numpy(), 0.0)
+    np.testing.assert_allclose(result.returns[:-1], expected.returns[:-1, 0])
+    assert result.equity[-2] == pytest.approx(expected.cum_return[0])
+    assert np.isnan(result.returns[-1])
+
+
+def test_align_uses_union_calendar():
+    weeks = pd.date_range("2020-01-07", periods=10, freq="W-TUE")
+    frames = {"gc": _market(0, weeks[:8]), "cl": _market(1, weeks[3:])}
+    calendar, markets, arrays = align(frames)
+    assert list(calendar) == list(weeks) and markets == ["gc", "cl"]
+    assert arrays["etf_close"].shape == (10, 2)
+    assert np.isnan(arrays["etf_close"][8:, 0]).all() and np.isnan(arrays["etf_close"][:3, 1]).all()
+
+    result = backtest_portfolio(frames)
+    # a market is only sized in weeks it has an entry and exit price
+    assert (result.weights[7:, 0] == 0).all() and (result.weights[:3, 1] == 0).all()
+
+
+def test_sizing_rules_and_gross_cap():
+    signals = np.array([[1.0, -1.0, 1.0], [1.0, 0.0, np.nan]])
+    returns = np.zeros((2, 3))
+    vol = np.array([[0.01, 0.02, 0.04], [0.01, 0.02, 0.04]])
+
+    equal = target_weights(signals, returns, sizing="equal")
+    np.testing.assert_allclose(equal, [[1 / 3, -1 / 3, 1 / 3], [0.5, 0.0, 0.0]])
+
+    inv = target_weights(signals, returns, vol, sizing="inverse_vol")
+    np.testing.assert_allclose(inv[0], np.array([4, -2, 1]) / 7)
+    np.testing.assert_allclose(np.abs(inv[0]) * vol[0], np.abs(inv[0, 0]) * vol[0, 0])
+
+    capped = target_weights(signals, returns, sizing="equal", leverage=3.0, max_gross=1.5)
+    np.testing.assert_allclose(np.abs(capped).sum(axis=1), [1.5, 1.5])
+    with pytest.raises(ValueError):
+        target_weights(signals, returns, sizing="kelly")
+
+
+def test_costs_and_attribution_add_up():
+    weeks = pd.date_range("2018-01-02", periods=80, freq="W-TUE")
+    frames = {f"m{i}": _market(i, weeks, vol=0.01 * (i + 1)) for i in range(5)}
+    result = backtest_portfolio(frames, sizing="inverse_vol", leverage=2.0, max_gross=1.5, commission=0.001)
+    assert np.abs(result.weights).sum(axis=1).max() <= 1.5 + 1e-12
+
+    turnover = np.abs(np.diff(result.weights, axis=0, prepend=0.0))
+    np.testing.assert_allclose(result.costs, 0.001 * turnover)
+    table = result.attribution()
+    # one turnover definition for the summary and the attribution
+    assert result.summary()["turnover"] == pytest.approx(table["turnover"].sum() / len(weeks))
+    assert table["contribution"].sum() == pytest.approx(np.nansum(result.returns))
+    assert table["share"].sum() == pytest.approx(1.0)
+    # the last week only pays to close out the book
+    assert result.returns[-1] == pytest.approx(-result.costs[-1].sum())
+    frame = result.frame()
+    assert frame["cum_return"].iloc[-1] == pytest.approx(np.prod(1 + result.returns))
+    assert result.summary()["n_periods"] == len(weeks)
+
+
+def test_run_portfolio_from_files(tmp_path):
+    weeks = pd.date_range("2015-01-06", periods=120, freq="W-TUE")
+    features, models = {}, {}
+    model_path = tmp_path / "model.pkl"
+    joblib.dump(RandomForestClassifier(n_estimators=5, random_state=0), model_path)
+    for i, market in enumerate(["gc", "cl"]):
+        rng = np.random.default_rng(i)
+        df = pd.DataFrame({
+            "week": weeks,
+            "f0": rng.normal(size=len(weeks)),
+            "etf_close": 50 + np.cumsum(rng.normal(0, 1, len(weeks))),
+            "target_dir": rng.integers(0, 2, len(weeks)),
+        })
+        features[market] = str(tmp_path / f"{market}.csv")
+        df.to_csv(features[market], index=False)
+        models[market] = str(model_path)
+
+    result = run_portfolio(features, models, "2016-06-01", allow_shorts=True, sizing="inverse_vol")
+    assert result.markets == ["gc", "cl"]
+    assert result.weights.shape == (len(weeks[weeks >= "2016-06-01"]), 2)
+    assert (np.abs(result.weights[:-1]).sum(axis=1) == pytest.approx(1.0))
+
+
+def test_market_signals_joins_volatility_on_week(tmp_path):
+    weeks = pd.date_range("2015-01-06", periods=60, freq="W-TUE")
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "week": weeks,
+        "f0": rng.normal(size=len(weeks)),
+        "etf_close": 50 + np.cumsum(rng.normal(0, 1, len(weeks))),
+        "vol_26w": np.arange(len(weeks)) / 100,
+        "target_dir": rng.integers(0, 2, len(weeks)),
+    })
+    # a row without a week is in neither split
+    df = pd.concat([df.iloc[:40], df.iloc[[0]].assign(week=pd.NaT), df.iloc[40:]])
+    path = tmp_path / "gc.csv"
+    df.to_csv(path, index=False)
+    model_path = tmp_path / "model.pkl"
+    joblib.dump(RandomForestClassifier(n_estimators=5, random_state=0), model_path)
+
+    out = market_signals(str(path), str(model_path), str(weeks[30].date()))
+    assert out["week"].tolist() == weeks[30:].tolist()
+    np.testing.assert_array_equal(out["vol_26w"], np.arange(30, len(weeks)) / 100)
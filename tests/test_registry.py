@@ -0,0 +1,91 @@
+import os
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from src.api.registry import DEFAULT_VERSION, ModelRegistry, scan_models
+
+
+def _fit(path, sign=1.0):
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(100, 2)), columns=['a', 'b'])
+    y = (sign * X['a'] > 0).astype(int)
+    pipe = Pipeline([('scaler', StandardScaler()), ('clf', LogisticRegression())]).fit(X, y)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    joblib.dump(pipe, path)
+    return pipe
+
+
+def _backdate(path, seconds=60):
+    # distinct mtime even on filesystems with coarse timestamps
+    stamp = time.time_ns() - int(seconds * 1e9)
+    os.utime(path, ns=(stamp, stamp))
+
+
+def test_registry_versions_and_swap(tmp_path):
+    _fit(tmp_path / 'model_gc.joblib')
+    _fit(tmp_path / 'cl' / '2025-01-03.joblib')
+    _fit(tmp_path / 'cl' / '2025-01-10.joblib', sign=-1.0)
+    assert set(scan_models(str(tmp_path))) == {
+        ('gc', DEFAULT_VERSION), ('cl', '2025-01-03'), ('cl', '2025-01-10'),
+    }
+
+    reg = ModelRegistry(str(tmp_path), settle_seconds=0)
+    swaps = []
+    reg.on_swap(swaps.append)
+    assert len(reg.refresh()) == 3
+    assert reg.markets() == {'gc': DEFAULT_VERSION, 'cl': '2025-01-10'}
+    assert reg.get('cl').feature_names == ('a', 'b')
+    assert reg.get('cl', '2025-01-03').version == '2025-01-03'
+    with pytest.raises(KeyError):
+        reg.get('zz')
+
+    held = reg.get('gc')
+    assert reg.refresh() == []
+    _fit(tmp_path / 'model_gc.joblib', sign=-1.0)
+    _backdate(tmp_path / 'model_gc.joblib')
+    assert reg.refresh() == [('gc', DEFAULT_VERSION)]
+    assert reg.get('gc') is not held
+    # a request that resolved the old entry keeps its model
+    assert held.model.predict_proba(pd.DataFrame({'a': [1.0], 'b': [0.0]}))[0, 1] > 0.5
+    assert len(swaps) == 2
+
+    (tmp_path / 'cl' / '2025-01-10.joblib').unlink()
+    reg.refresh()
+    assert reg.markets()['cl'] == '2025-01-03'
+
+
+def test_registry_keeps_old_model_on_bad_artifact(tmp_path):
+    _fit(tmp_path / 'model_gc.joblib')
+    reg = ModelRegistry(str(tmp_path), settle_seconds=0)
+    reg.refresh()
+    held = reg.get('gc')
+    (tmp_path / 'model_gc.joblib').write_bytes(b'not a pickle')
+    _backdate(tmp_path / 'model_gc.joblib')
+    assert reg.refresh() == []
+    assert reg.get('gc') is held
+
+
+def test_predict_endpoint_selects_market(tmp_path):
+    pytest.importorskip('httpx')
+    from fastapi.testclient import TestClient
+    from src.api import app as app_module
+
+    _fit(tmp_path / 'model_gc.joblib')
+    _fit(tmp_path / 'model_cl.joblib', sign=-1.0)
+    app_module.registry.models_dir = str(tmp_path)
+    app_module.registry.settle_seconds = 0
+    with TestClient(app_module.app) as client:
+        up = client.post('/predict?market=gc', json={'a': 2.0, 'b': 0.0}).json()
+        down = client.post('/predict?market=cl', json={'a': 2.0, 'b': 0.0}).json()
+        assert up['market'] == 'gc' and up['probability_up'] > 0.5
+        assert down['probability_up'] < 0.5
+        assert client.post('/predict?market=zz', json={'a': 1.0, 'b': 0.0}).status_code == 404
+        assert client.post('/predict?market=gc', json={'a': 1.0}).status_code == 422
+        assert {m['market'] for m in client.get('/models').json()['models']} == {'gc', 'cl'}
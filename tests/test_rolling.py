@@ -0,0 +1,89 @@
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+from src.eval import rolling
+
+
+@pytest.fixture
+def inputs(tmp_path):
+    rng = np.random.default_rng(0)
+    paths = {}
+    for market in ["gc", "cl"]:
+        n = 40
+        df = pd.DataFrame({
+            "week": pd.date_range("2020-01-07", periods=n, freq="W-TUE"),
+            "feature1": rng.normal(size=n),
+            "target_dir": rng.integers(0, 2, size=n),
+            "etf_close": 100 + rng.normal(size=n).cumsum(),
+            "mm_net_pct_oi": rng.uniform(size=n),
+        })
+        paths[market] = str(tmp_path / f"features_{market}.csv")
+        df.to_csv(paths[market], index=False)
+    model_path = str(tmp_path / "model.pkl")
+    joblib.dump(LogisticRegression(), model_path)
+    return paths, {m: model_path for m in paths}
+
+
+GRID = dict(thresholds=[0.8, 0.9], test_starts=["2020-05-05", "2020-07-07"], commissions=[0.0, 0.001])
+
+
+def _run(inputs, tmp_path, **kwargs):
+    features, models = inputs
+    return rolling.run_grid(
+        features, models, GRID["thresholds"], GRID["test_starts"], GRID["commissions"],
+        str(tmp_path / "cells.jsonl"), out_dir=str(tmp_path / "reports"), min_periods=4, n_jobs=1,
+        **kwargs,
+    )
+
+
+def test_grid_reports_per_market(inputs, tmp_path):
+    paths = _run(inputs, tmp_path)
+    assert sorted(paths) == ["cl", "gc"]
+    report = pd.read_csv(paths["gc"])
+    assert list(report.columns) == rolling.REPORT_COLUMNS
+    assert len(report) == 8
+    assert report[["threshold", "test_start", "commission"]].values.tolist()[:2] == [
+        [0.8, "2020-05-05", 0.0], [0.8, "2020-05-05", 0.001],
+    ]
+    # commission only shifts the weekly returns
+    assert (report["cum_return"].iloc[0] > report["cum_return"].iloc[1])
+
+
+def test_resume_skips_finished_cells(inputs, tmp_path, monkeypatch):
+    first = pd.read_csv(_run(inputs, tmp_path)["gc"])
+    store = tmp_path / "cells.jsonl"
+    lines = store.read_text().splitlines()
+    assert len(lines) == 16
+
+    # simulate a crash: drop some cells and leave a torn last line
+    store.write_text("\n".join(lines[:5]) + "\n" + lines[5][:20])
+    calls = []
+    real = rolling._run_job
+    monkeypatch.setattr(rolling, "_run_job", lambda *job: calls.append(job) or real(*job))
+    resumed = pd.read_csv(_run(inputs, tmp_path)["gc"])
+    assert sum(len(job[-1]) for job in calls) == 11
+    pd.testing.assert_frame_equal(first, resumed)
+
+    calls.clear()
+    _run(inputs, tmp_path)
+    assert calls == []
+
+
+def test_changed_inputs_invalidate_cells(inputs, tmp_path):
+    _run(inputs, tmp_path)
+    features, _ = inputs
+    df = pd.read_csv(features["gc"])
+    df.loc[0, "feature1"] += 1
+    df.to_csv(features["gc"], index=False)
+    _run(inputs, tmp_path)
+    assert len((tmp_path / "cells.jsonl").read_text().splitlines()) == 24
+
+
+def test_parse_paths():
+    assert rolling.parse_paths(["f.csv"], ["gc"]) == {"gc": "f.csv"}
+    assert rolling.parse_paths(["gc=a.csv", "cl=b.csv"]) == {"gc": "a.csv", "cl": "b.csv"}
+    with pytest.raises(ValueError):
+        rolling.parse_paths(["gc=a.csv", "b.csv"])
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+from src.models.search import rung_schedule, sample_candidates, search
+from src.models.train_classifier import _DESIGNS
+
+
+def test_rung_schedule_ends_on_full_history():
+    schedule = rung_schedule(n_candidates=100, n_splits=5, n_rows=1000, eta=3)
+    assert len(schedule) == 5
+    assert schedule[-1] == (5, None)
+    folds = [f for f, _ in schedule]
+    windows = [w for _, w in schedule[:-1]]
+    assert folds == sorted(folds)
+    assert windows == sorted(windows)
+
+
+def test_search_writes_leaderboard(tmp_path):
+    rng = np.random.default_rng(0)
+    n = 200
+    df = pd.DataFrame(rng.normal(size=(n, 3)), columns=['a', 'b', 'c'])
+    df['target_dir'] = (df['a'] + rng.normal(scale=0.5, size=n) > 0).astype(int)
+    features = tmp_path / 'class.csv'
+    df.to_csv(features, index=False)
+
+    board = search(str(features), str(tmp_path / 'board.csv'), str(tmp_path / 'best.pkl'),
+                   n_candidates=6, eta=3, n_splits=3, min_train_size=20)
+
+    assert (tmp_path / 'board.csv').exists()
+    assert (tmp_path / 'best.pkl').exists()
+    # every candidate is scored in rung 0, only survivors reach the last rung
+    assert board[board.rung == 0].candidate.nunique() == 6
+    assert board[board.rung == board.rung.max()].candidate.nunique() == 2
+    assert len(sample_candidates(6)) == 6
+    # the serial run's memmap of the deleted design file is released
+    assert not _DESIGNS
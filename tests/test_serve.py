@@ -0,0 +1,53 @@
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='needs os.fork')
+def test_prefork_workers_serve_and_stop(tmp_path):
+    httpx = pytest.importorskip('httpx')
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(50, 2)), columns=['a', 'b'])
+    pipe = Pipeline([('s', StandardScaler()), ('c', LogisticRegression())]).fit(X, X['a'] > 0)
+    joblib.dump(pipe, tmp_path / 'model_gc.joblib')
+    stamp = time.time_ns() - 60 * 10**9
+    os.utime(tmp_path / 'model_gc.joblib', ns=(stamp, stamp))
+
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+    env = {**os.environ, 'MODELS_DIR': str(tmp_path), 'PYTHONPATH': str(ROOT)}
+    proc = subprocess.Popen(
+        [sys.executable, '-m', 'src.api.serve', '--port', str(port), '--workers', '2'],
+        cwd=ROOT, env=env,
+    )
+    try:
+        deadline = time.time() + 60
+        while True:
+            try:
+                resp = httpx.post(f'http://127.0.0.1:{port}/predict?market=gc',
+                                  json={'a': 1.0, 'b': 0.0}, timeout=5)
+                break
+            except httpx.HTTPError:
+                if time.time() > deadline:
+                    raise
+                time.sleep(0.2)
+        assert resp.status_code == 200
+        assert resp.json()['probability_up'] > 0.5
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        assert proc.wait(timeout=30) == 0
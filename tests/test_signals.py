@@ -0,0 +1,97 @@
+import os
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from src.api.signals import SignalStore, build_snapshot
+
+
+def _setup(tmp_path):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(size=(60, 2)), columns=['a', 'b'])
+    df.insert(0, 'week', pd.date_range('2024-01-05', periods=60, freq='W-FRI'))
+    df['extreme_spec_long'] = 0
+    df.loc[58, ['a', 'extreme_spec_long']] = [5.0, 1]
+    df.loc[59, 'b'] = np.nan
+    pipe = Pipeline([('scaler', StandardScaler()), ('clf', LogisticRegression())])
+    pipe.fit(df[['a', 'b']].iloc[:58], (df['a'].iloc[:58] > 0).astype(int))
+    models = tmp_path / 'models'
+    models.mkdir()
+    joblib.dump(pipe, models / 'model_gc.joblib')
+    joblib.dump(pipe, models / 'model_contrarian_gc.joblib')
+    df.to_csv(tmp_path / 'class_features_gc.csv', index=False)
+    return df, pipe
+
+
+def test_snapshot_scores_latest_complete_week(tmp_path):
+    df, pipe = _setup(tmp_path)
+    out = tmp_path / 'signals.npy'
+    snap = build_snapshot(str(tmp_path / 'models'), str(tmp_path), str(out))
+
+    assert sorted(snap['market']) == ['contrarian_gc', 'gc']
+    row = snap[snap['market'] == 'gc'][0]
+    assert str(row['week']) == '2025-02-14'
+    assert row['probability'] == pytest.approx(pipe.predict_proba(df[['a', 'b']].iloc[[58]])[0, 1])
+    # bullish model output inverted by the contrarian overlay
+    assert row['contrarian'] == 1 and row['signal'] == -1
+
+    store = SignalStore(str(out))
+    assert b'"contrarian_gc"' in store.latest()
+    assert store.market('zz') is None
+
+    build_snapshot(str(tmp_path / 'models'), str(tmp_path), str(out), threshold=1.1)
+    stamp = time.time_ns() + 10**9
+    os.utime(out, ns=(stamp, stamp))
+    assert b'"signal": 0' in store.market('gc')
+
+
+def test_signals_endpoints(tmp_path):
+    pytest.importorskip('httpx')
+    from fastapi.testclient import TestClient
+    from src.api import app as app_module
+
+    _setup(tmp_path)
+    app_module.registry.models_dir = str(tmp_path / 'models')
+    app_module.registry.settle_seconds = 0
+    app_module.signals = SignalStore(str(tmp_path / 'signals.npy'))
+    with TestClient(app_module.app) as client:
+        assert client.get('/signals/latest').status_code == 404
+        build_snapshot(str(tmp_path / 'models'), str(tmp_path), str(tmp_path / 'signals.npy'))
+        assert len(client.get('/signals/latest').json()) == 2
+        gc = client.get('/signals/gc').json()
+        assert gc[0]['market'] == 'gc' and gc[0]['week'] == '2025-02-14'
+        assert client.get('/signals/cl').status_code == 404
+
+
+def test_snapshot_keeps_long_market_names(tmp_path):
+    df, pipe = _setup(tmp_path)
+    long_name = 'contrarian_' + 'x' * 40 + '_gc'
+    joblib.dump(pipe, tmp_path / 'models' / f'model_{long_name}.joblib')
+    snap = build_snapshot(str(tmp_path / 'models'), str(tmp_path), str(tmp_path / 'signals.npy'))
+    assert long_name in set(snap['market'])
+    assert long_name.encode() in SignalStore(str(tmp_path / 'signals.npy')).latest()
+
+
+def test_online_models_score_their_market_features(tmp_path):
+    from src.models.online import run_update
+    from src.models.train_model import FEATURE_COLS
+
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame(rng.normal(size=(80, len(FEATURE_COLS))), columns=FEATURE_COLS)
+    df.insert(0, 'week', pd.date_range('2024-01-05', periods=80, freq='W-FRI'))
+    df['return_1w'] = 0.01 * df[FEATURE_COLS[0]]
+    features = tmp_path / 'class_features_gc.csv'
+    df.to_csv(features, index=False)
+    models = tmp_path / 'models'
+    models.mkdir()
+    run_update(str(features), str(tmp_path / 'gc.state'), 'gc', export_dir=str(models))
+
+    snap = build_snapshot(str(models), str(tmp_path), str(tmp_path / 'signals.npy'))
+    assert list(snap['market']) == ['gc_online']
+    assert str(snap['week'][0]) == str(df['week'].iloc[-1].date())
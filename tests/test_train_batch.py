@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+from src.models.train_batch import load_panel, train_batch
+from src.models.train_model import FEATURE_COLS
+
+
+def _features(seed, n=80):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(rng.normal(size=(n, len(FEATURE_COLS))), columns=FEATURE_COLS)
+    df['week'] = pd.date_range('2020-01-03', periods=n, freq='W-FRI')
+    df['return_1w'] = rng.normal(scale=0.02, size=n)
+    return df
+
+
+def test_train_batch(tmp_path):
+    paths = {}
+    for i, market in enumerate(['gc', 'cl']):
+        paths[market] = tmp_path / f'features_{market}.csv'
+        _features(i).to_csv(paths[market], index=False)
+
+    panel = load_panel({m: str(p) for m, p in paths.items()})
+    metrics = train_batch(panel, str(tmp_path / 'models'), str(tmp_path / 'metrics.csv'),
+                          pooled=True, n_jobs=2)
+
+    assert set(metrics['market']) == {'gc', 'cl', 'pooled'}
+    assert metrics.loc[metrics.market == 'pooled', 'n_rows'].item() == 160
+    for market in ['gc', 'cl', 'pooled']:
+        assert (tmp_path / 'models' / f'model_{market}.joblib').exists()
+    assert (tmp_path / 'metrics.csv').exists()
@@ -1,4 +1,5 @@
 import pandas as pd
+import pytest
 import subprocess
 from src.features.build_features import build_features
 from src.data.build_classification_features import build_classification_features
@@ -36,3 +37,49 @@ def test_train_classifier(tmp_path):
     assert 'F1' in result.stdout
 
     model_path.unlink()
+
+
+def test_parallel_folds_match_serial(tmp_path, capsys):
+    from src.models.train_classifier import _DESIGNS, train_and_evaluate
+
+    periods = 60
+    merged = pd.DataFrame({
+        'week': pd.date_range('2024-01-05', periods=periods, freq='W-FRI'),
+        'mm_long': range(10, 10 + periods),
+        'mm_short': range(5, 5 + periods),
+        'pm_long': range(8, 8 + periods),
+        'pm_short': range(3, 3 + periods),
+        'sd_long': range(6, 6 + periods),
+        'sd_short': range(2, 2 + periods),
+        'open_interest': [100] * periods,
+        'etf_close': [50 + (-1)**i * i for i in range(periods)]
+    })
+    merged_path = tmp_path / 'merged.csv'
+    merged.to_csv(merged_path, index=False)
+    features_path = tmp_path / 'features.csv'
+    build_features(str(merged_path), str(features_path))
+    class_path = tmp_path / 'class.csv'
+    build_classification_features(str(features_path), str(class_path), th=0.0)
+
+    train_and_evaluate(str(class_path), str(tmp_path / 'serial.pkl'), n_jobs=1)
+    # the in-process design cache does not outlive the temp file
+    assert not _DESIGNS
+    serial = [l for l in capsys.readouterr().out.splitlines() if 'saved' not in l]
+    train_and_evaluate(str(class_path), str(tmp_path / 'parallel.pkl'), n_jobs=2)
+    parallel = [l for l in capsys.readouterr().out.splitlines() if 'saved' not in l]
+    assert serial == parallel
+
+
+def test_attach_target_rejects_ternary_labels(tmp_path):
+    from src.models.train_classifier import _attach_target
+
+    weeks = pd.date_range('2024-01-05', periods=4, freq='W-FRI').astype(str)
+    features = pd.DataFrame({'week': weeks, 'x': [1.0, 2.0, 3.0, 4.0], 'target_dir': [0, 1, 0, 1]})
+    labels = pd.DataFrame({'week': weeks, 'bin': [1, 0, 1, None], 'tern': [1, -1, 0, 1]})
+    labels_path = tmp_path / 'labels.csv'
+    labels.to_csv(labels_path, index=False)
+
+    out = _attach_target(features, str(labels_path), 'bin')
+    assert out['target_dir'].tolist() == [1, 0, 1]
+    with pytest.raises(ValueError, match='not a binary label'):
+        _attach_target(features, str(labels_path), 'tern')
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+
+from src.eval.vector_backtest import backtest_matrix, run_grid, signal_matrix, strategy_grid
+
+
+def _pandas_backtest(prices, predictions, extreme, allow_shorts, overlay, commission):
+    df = pd.DataFrame({"etf_close": prices, "extreme_spec_long": extreme})
+    df["signal"] = [1 if s == 1 else -1 for s in predictions] if allow_shorts else predictions
+    if overlay:
+        mask = df["extreme_spec_long"] == 1
+        df.loc[mask, "signal"] = -df.loc[mask, "signal"]
+    raw = (df["etf_close"].shift(-1) - df["etf_close"]) / df["etf_close"]
+    ret = (raw * df["signal"] - 2 * commission).dropna()
+    cum = (1 + ret).cumprod()
+    return cum.iloc[-1], ((cum.cummax() - cum) / cum.cummax()).max(), ret
+
+
+def test_signal_matrix_options():
+    pred = np.array([1, 0, 1, 0])
+    extreme = np.array([0, 0, 1, 1])
+    signals = signal_matrix(pred, extreme, allow_shorts=[False, True, False, True], overlay=[False, False, True, True])
+    assert signals.tolist() == [
+        [1, 1, 1, 1],
+        [0, -1, 0, -1],
+        [1, 1, -1, -1],
+        [0, -1, 0, 1],
+    ]
+
+
+def test_grid_matches_pandas_per_strategy():
+    rng = np.random.default_rng(0)
+    weeks = 120
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, weeks)))
+    prices[[0, 40]] = np.nan  # leading and interior missing prices
+    pred = rng.integers(0, 2, weeks)
+    extreme = (rng.uniform(size=weeks) > 0.8).astype(int)
+    strategies = strategy_grid(commissions=[0.0, 0.001])
+
+    summary, result = run_grid(prices, pred, extreme, strategies)
+    assert len(summary) == 8 and result.returns.shape == (weeks, 8)
+    for i, row in strategies.iterrows():
+        cum, maxdd, ret = _pandas_backtest(
+            prices, pred, extreme, row.allow_shorts, row.overlay, row.commission
+        )
+        assert summary["cum_return"].iat[i] == cum
+        assert summary["max_drawdown"].iat[i] == maxdd
+        np.testing.assert_allclose(summary["sharpe"].iat[i], ret.mean() / ret.std() * 52 ** 0.5)
+        np.testing.assert_array_equal(result.returns[ret.index, i], ret.to_numpy())
+        assert np.isnan(result.equity[[0, 40, weeks - 1], i]).all()
+
+
+def test_wide_matrix_uses_same_math():
+    rng = np.random.default_rng(1)
+    prices = 100 + rng.normal(size=60).cumsum()
+    signals = rng.integers(-1, 2, size=(60, 100))
+    wide = backtest_matrix(prices, signals, 0.0005)
+    narrow = backtest_matrix(prices, signals[:, :3], 0.0005)
+    np.testing.assert_array_equal(wide.equity[:, :3], narrow.equity)
+    np.testing.assert_array_equal(wide.drawdown[:, :3], narrow.drawdown)
+
+
+def test_no_trades():
+    result = backtest_matrix([100.0], np.ones((1, 2)))
+    assert result.cum_return.tolist() == [1.0, 1.0]
+    assert result.max_drawdown.tolist() == [0.0, 0.0]
+    assert result.summary()["sharpe"].isna().all()
@@ -0,0 +1,63 @@
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from src.eval.backtest import run_backtest
+from src.eval.walk_forward import WalkForward
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    n = 60
+    return pd.DataFrame({
+        "week": pd.date_range("2020-01-07", periods=n, freq="W-TUE"),
+        "feature1": rng.normal(size=n),
+        "target_dir": rng.integers(0, 2, size=n),
+        "etf_close": 100 + rng.normal(size=n).cumsum(),
+        "extreme_spec_long": (rng.uniform(size=n) > 0.8).astype(int),
+    })
+
+
+def test_matches_run_backtest(tmp_path, frame):
+    model = RandomForestClassifier(n_estimators=10, random_state=42)
+    model_path = tmp_path / "model.pkl"
+    joblib.dump(model, model_path)
+    csv_path = tmp_path / "features.csv"
+    frame.to_csv(csv_path, index=False)
+    engine = WalkForward.from_path(str(model_path))
+
+    for ts in ["2020-06-02", "2020-09-01"]:
+        expected = run_backtest(str(csv_path), str(model_path), ts, 0.001)
+        result = engine.backtest(frame, ts, 0.001)
+        assert list(result.columns) == list(expected.columns)
+        assert (result["signal"].to_numpy() == expected["signal"].to_numpy()).all()
+        # only CSV float parsing separates the two
+        np.testing.assert_allclose(result["cum_return"], expected["cum_return"], rtol=1e-12)
+
+
+def test_shared_training_inputs_fit_once(frame):
+    engine = WalkForward(RandomForestClassifier(n_estimators=5, random_state=0))
+    a = engine.backtest(frame, "2020-06-02", 0.0)
+    b = engine.backtest(frame, "2020-06-02", 0.001)
+    assert engine.stats()["fits"] == 1 and engine.stats()["cache_hits"] == 1
+    assert (a["signal"] == b["signal"]).all()
+
+    # different training data under the same window is a new fit
+    changed = frame.copy()
+    changed.loc[0, "feature1"] += 1
+    engine.backtest(changed, "2020-06-02", 0.0)
+    # test rows only change the scoring, not the fit
+    later = frame.copy()
+    later.loc[len(frame) - 1, "feature1"] += 1
+    engine.backtest(later, "2020-06-02", 0.0)
+    assert engine.stats()["fits"] == 2 and engine.stats()["cache_hits"] == 2
+
+
+def test_cache_evicts_oldest(frame):
+    engine = WalkForward(RandomForestClassifier(n_estimators=2, random_state=0), cache_size=2)
+    for ts in ["2020-04-07", "2020-05-05", "2020-06-02", "2020-04-07"]:
+        engine.backtest(frame, ts, 0.0)
+    assert engine.stats() == {"fits": 4, "cache_hits": 0, "cached": 2}
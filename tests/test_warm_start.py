@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import TimeSeriesSplit
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+from src.models.warm_start import warm_start_predictions
+
+
+def _data(n=300):
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(n, 3)), columns=['a', 'b', 'c'])
+    y = pd.Series((X['a'] + rng.normal(scale=0.5, size=n) > 0).astype(int))
+    return X, y
+
+
+def test_warm_start_logistic_close_to_cold():
+    X, y = _data()
+    splits = list(TimeSeriesSplit(n_splits=4).split(X))
+    pipe = Pipeline([('scaler', StandardScaler()), ('clf', LogisticRegression(max_iter=1000))])
+    preds = warm_start_predictions(pipe, X, y, splits)
+
+    assert [len(p) for p in preds] == [len(t) for _, t in splits]
+    for (train_idx, test_idx), p in zip(splits, preds):
+        cold = pipe.fit(X.iloc[train_idx], y.iloc[train_idx]).predict(X.iloc[test_idx])
+        assert (cold == p).mean() > 0.9
+
+
+def test_warm_start_forest_keeps_trees(monkeypatch):
+    import src.models.warm_start as warm_start
+
+    cloned = []
+
+    def recording_clone(est):
+        cloned.append(clone(est))
+        return cloned[-1]
+
+    monkeypatch.setattr(warm_start, 'clone', recording_clone)
+    X, y = _data()
+    pipe = Pipeline([('scaler', StandardScaler()),
+                     ('clf', RandomForestClassifier(n_estimators=10, random_state=0))])
+
+    forests = []
+
+    def splits():
+        # resumed after each fold is fitted, so the forest can be inspected
+        for split in TimeSeriesSplit(n_splits=3).split(X):
+            yield split
+            forests.append(list(cloned[0].named_steps['clf'].estimators_))
+
+    preds = warm_start_predictions(pipe, X, y, splits())
+    assert len(preds) == 3
+    assert [len(f) for f in forests] == [10, 12, 14]
+    # earlier folds' trees are kept (same objects), new ones are appended
+    for before, after in zip(forests, forests[1:]):
+        assert all(a is b for a, b in zip(before, after[:len(before)]))
+    # the template itself is left untouched
+    assert pipe.named_steps['clf'].n_estimators == 10
@@ -99,6 +99,12 @@ def test_weekly_etl(tmp_path, monkeypatch):
     assert any(
         "build_features" in " ".join(c) if isinstance(c, list) else False for c in calls
     )
+    # one class-features run per market; other targets come from build_labels
+    assert sum("src.data.build_classification_features" in c for c in calls if isinstance(c, list)) == 2
+    assert sum("src.data.build_labels" in c for c in calls if isinstance(c, list)) == 2
+    # the snapshot goes to the CLI's default SIGNALS_PATH, which the API reads
+    snapshot = [c for c in calls if isinstance(c, list) and "src.api.signals" in c]
+    assert snapshot and "--out" not in snapshot[0]
 
 
 def test_weekly_etl_upload(tmp_path, monkeypatch):